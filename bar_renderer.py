@@ -0,0 +1,249 @@
+"""
+Módulo para renderizar a barra fora da tela e gerar imagens PNG.
+
+A barra é rasterizada em um buffer de pixels em memória (fundo, borda,
+linha de destaque e rótulos com uma fonte bitmap 5x7) e codificada como
+PNG com zlib. Não depende do Tk nem de um servidor gráfico.
+"""
+
+import struct
+import unicodedata
+import zlib
+from typing import Dict, Any, List, Optional, Tuple
+
+from label_templates import compile_label
+from preview_layout import SECTIONS, layout_sections
+from preview_ticker import SampleDataProvider
+
+Color = Tuple[int, int, int]
+
+# Fonte bitmap 5x7 (ASCII 0x20-0x7E), uma coluna por byte, bit 0 no topo
+FONT_5X7 = bytes.fromhex(
+    "0000000000" "00005f0000" "0007000700" "147f147f14" "242a7f2a12"
+    "2313086462" "3649552250" "0005030000" "001c224100" "0041221c00"
+    "082a1c2a08" "08083e0808" "0050300000" "0808080808" "0060600000"
+    "2010080402" "3e5149453e" "00427f4000" "4261514946" "2141454b31"
+    "1814127f10" "2745454539" "3c4a494930" "0171090503" "3649494936"
+    "064949291e" "0036360000" "0056360000" "0008142241" "1414141414"
+    "4122140800" "0201510906" "3249794136" "7e1111117e" "7f49494936"
+    "3e41414122" "7f4141221c" "7f49494941" "7f09090101" "3e41415132"
+    "7f0808087f" "00417f4100" "2040413f01" "7f08142241" "7f40404040"
+    "7f0204027f" "7f0408107f" "3e4141413e" "7f09090906" "3e4151215e"
+    "7f09192946" "4649494931" "01017f0101" "3f4040403f" "1f2040201f"
+    "7f2018207f" "6314081463" "0304780403" "6151494543" "00007f4141"
+    "0204081020" "41417f0000" "0402010204" "4040404040" "0001020400"
+    "2054545478" "7f48444438" "3844444420" "384444487f" "3854545418"
+    "087e090102" "081454543c" "7f08040478" "00447d4000" "2040443d00"
+    "007f102844" "00417f4000" "7c04180478" "7c08040478" "3844444438"
+    "7c14141408" "081414187c" "7c08040408" "4854545420" "043f444020"
+    "3c4040207c" "1c2040201c" "3c4030403c" "4428102844" "0c5050503c"
+    "4464544c44" "0008364100" "00007f0000" "0041360800" "08082a1c08"
+)
+
+# Glifo usado para caracteres sem representação na fonte
+MISSING_GLYPH = bytes.fromhex("7f4141417f")
+
+GLYPH_WIDTH = 5
+GLYPH_HEIGHT = 7
+GLYPH_ADVANCE = 6
+
+DEFAULT_STYLE = {
+    'background_color': '#1e1e1e',
+    'text_color': '#ffffff',
+    'accent_color': '#007acc',
+    'border_color': '#333333',
+    'font_size': 12
+}
+
+
+def parse_color(value: Any, default: str = '#000000') -> Color:
+    """Converte '#rgb' ou '#rrggbb' em uma tupla RGB."""
+    text = str(value or '').strip().lstrip('#')
+    if len(text) == 3:
+        text = ''.join(char * 2 for char in text)
+    try:
+        if len(text) != 6:
+            raise ValueError(text)
+        return (int(text[0:2], 16), int(text[2:4], 16), int(text[4:6], 16))
+    except ValueError:
+        return parse_color(default) if value != default else (0, 0, 0)
+
+
+def glyph(char: str) -> bytes:
+    """Retorna as colunas do glifo de um caractere."""
+    code = ord(char)
+    if 0x20 <= code <= 0x7E:
+        offset = (code - 0x20) * GLYPH_WIDTH
+        return FONT_5X7[offset:offset + GLYPH_WIDTH]
+    # Remover acentos (ã -> a) antes de desistir do caractere
+    base = unicodedata.normalize('NFKD', char)[:1]
+    if base and base != char and 0x20 <= ord(base) <= 0x7E:
+        return glyph(base)
+    return MISSING_GLYPH
+
+
+def font_scale(font_size: Any) -> int:
+    """Escala inteira da fonte bitmap para um tamanho de fonte em pontos."""
+    try:
+        return max(1, round(int(font_size) / 6))
+    except (TypeError, ValueError):
+        return 2
+
+
+def measure_bitmap_text(text: str, scale: int) -> int:
+    """Largura em pixels de um texto na fonte bitmap."""
+    if not text:
+        return 0
+    return (len(text) * GLYPH_ADVANCE - 1) * scale
+
+
+class PixelBuffer:
+    """Imagem RGB em memória, uma linha por bytearray."""
+
+    def __init__(self, width: int, height: int, color: Color = (0, 0, 0)):
+        self.width = width
+        self.height = height
+        row = bytes(color) * width
+        self.rows = [bytearray(row) for _ in range(height)]
+
+    def fill_rect(self, x0: int, y0: int, x1: int, y1: int, color: Color):
+        """Preenche o retângulo [x0, x1) x [y0, y1), recortado à imagem."""
+        x0, x1 = max(0, x0), min(self.width, x1)
+        y0, y1 = max(0, y0), min(self.height, y1)
+        if x0 >= x1 or y0 >= y1:
+            return
+        span = bytes(color) * (x1 - x0)
+        for y in range(y0, y1):
+            self.rows[y][x0 * 3:x1 * 3] = span
+
+    def stroke_rect(self, x0: int, y0: int, x1: int, y1: int, color: Color, width: int = 1):
+        """Desenha o contorno de um retângulo."""
+        self.fill_rect(x0, y0, x1, y0 + width, color)
+        self.fill_rect(x0, y1 - width, x1, y1, color)
+        self.fill_rect(x0, y0, x0 + width, y1, color)
+        self.fill_rect(x1 - width, y0, x1, y1, color)
+
+    def draw_text(self, x: int, y: int, text: str, color: Color, scale: int = 1):
+        """Desenha um texto com a fonte bitmap, com o topo em y."""
+        for char in text:
+            if x >= self.width:
+                break
+            for column, bits in enumerate(glyph(char)):
+                if not bits:
+                    continue
+                px = x + column * scale
+                for row in range(GLYPH_HEIGHT):
+                    if bits & (1 << row):
+                        py = y + row * scale
+                        self.fill_rect(px, py, px + scale, py + scale, color)
+            x += GLYPH_ADVANCE * scale
+
+    def blit_rows(self, data: bytes, width: int, height: int, x: int, y: int):
+        """Copia uma imagem RGB (linhas concatenadas) para a posição (x, y)."""
+        stride = width * 3
+        visible = min(width, self.width - x)
+        if visible <= 0:
+            return
+        for row_index in range(height):
+            target_y = y + row_index
+            if 0 <= target_y < self.height:
+                start = row_index * stride
+                self.rows[target_y][x * 3:(x + visible) * 3] = data[start:start + visible * 3]
+
+    def to_bytes(self) -> bytes:
+        """Retorna todas as linhas concatenadas (para enviar entre processos)."""
+        return b''.join(self.rows)
+
+    def to_png(self, level: int = 6) -> bytes:
+        """Codifica a imagem como PNG (RGB de 8 bits, sem filtros)."""
+        return encode_png(self.width, self.height, self.rows, level)
+
+
+def _png_chunk(kind: bytes, data: bytes) -> bytes:
+    return (struct.pack(">I", len(data)) + kind + data +
+            struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF))
+
+
+def encode_png(width: int, height: int, rows: List[bytearray], level: int = 6) -> bytes:
+    """Codifica linhas RGB em um arquivo PNG."""
+    compressor = zlib.compressobj(level)
+    parts = []
+    for row in rows:
+        # Cada linha começa com o tipo de filtro (0 = nenhum)
+        parts.append(compressor.compress(b'\x00'))
+        parts.append(compressor.compress(bytes(row)))
+    parts.append(compressor.flush())
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return (b'\x89PNG\r\n\x1a\n' + _png_chunk(b'IHDR', header) +
+            _png_chunk(b'IDAT', b''.join(parts)) + _png_chunk(b'IEND', b''))
+
+
+def bar_height(bar_config: Dict[str, Any], default: int = 30) -> int:
+    """Altura da barra configurada, em pixels."""
+    try:
+        return max(8, int(bar_config.get('dimensions', {}).get('height', default)))
+    except (TypeError, ValueError):
+        return default
+
+
+def render_bar(config_data: Dict[str, Any], width: int, bar_name: str = 'yasb-bar',
+               theme: Optional[Dict[str, Any]] = None, seed: int = 0) -> PixelBuffer:
+    """Rasteriza a barra configurada com a largura informada.
+
+    theme pode sobrescrever os valores de styles.default (mesmo formato
+    dos temas salvos em JSON pelo painel). Os rótulos são renderizados com
+    dados simulados determinísticos (seed).
+    """
+    bar_config = config_data.get('bars', {}).get(bar_name, {})
+    style = dict(DEFAULT_STYLE)
+    style.update(config_data.get('styles', {}).get('default', {}) or {})
+    if theme:
+        style.update(theme)
+
+    height = bar_height(bar_config)
+    background = parse_color(style.get('background_color'), DEFAULT_STYLE['background_color'])
+    text_color = parse_color(style.get('text_color'), DEFAULT_STYLE['text_color'])
+    accent = parse_color(style.get('accent_color'), DEFAULT_STYLE['accent_color'])
+    border = parse_color(style.get('border_color'), DEFAULT_STYLE['border_color'])
+    scale = font_scale(style.get('font_size'))
+
+    image = PixelBuffer(width, height, background)
+    image.stroke_rect(0, 0, width, height, border)
+
+    # Linha de destaque no lado da barra voltado para a tela
+    accent_height = max(1, height // 15)
+    if bar_config.get('alignment', {}).get('position', 'top') == 'bottom':
+        image.fill_rect(1, 1, width - 1, 1 + accent_height, accent)
+    else:
+        image.fill_rect(1, height - 1 - accent_height, width - 1, height - 1, accent)
+
+    # Renderizar os rótulos visíveis de cada seção
+    widgets = config_data.get('widgets', {})
+    sample = SampleDataProvider(seed)
+    sections: Dict[str, list] = {}
+    texts: Dict[str, str] = {}
+    for section in SECTIONS:
+        names = []
+        for widget_name in bar_config.get('widgets', {}).get(section, []):
+            widget_config = widgets.get(widget_name)
+            if not isinstance(widget_config, dict) or not widget_config.get('enabled', True):
+                continue
+            options = widget_config.get('options') or {}
+            label = compile_label(str(options.get('label', widget_name)))
+            texts[widget_name] = label.render(sample.values_for(label.fields))
+            names.append(widget_name)
+        sections[section] = names
+
+    _, placed = layout_sections(sections, texts, lambda text: measure_bitmap_text(text, scale), width)
+    text_y = (height - GLYPH_HEIGHT * scale) // 2
+    for widget_name, x, _ in placed:
+        image.draw_text(x, text_y, texts[widget_name], text_color, scale)
+
+    return image
+
+
+def render_bar_png(config_data: Dict[str, Any], width: int, bar_name: str = 'yasb-bar',
+                   theme: Optional[Dict[str, Any]] = None) -> bytes:
+    """Rasteriza a barra e retorna o conteúdo do arquivo PNG."""
+    return render_bar(config_data, width, bar_name, theme).to_png()
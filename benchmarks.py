@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Benchmarks das partes críticas de desempenho do painel de controle YASB.
+
+Não dependem de uma tela: operações do Tk são simuladas por objetos falsos.
+"""
+
+import os
+import tempfile
+import time
+import tracemalloc
+
+from config_io import atomic_write, chunked, dump_yaml, iter_yaml
+from config_store import ConfigStore
+from preview_canvas import CanvasItemCache, PreviewEntry, RecordingCanvas
+
+
+def build_bar_layout(count: int, width: int = 3840):
+    """Gera um layout grande e artificial de widgets do preview."""
+    step = max(1, width // max(count, 1))
+    return [PreviewEntry(f"widget_{i}", 10 + i * step, 25, f"W{i}: {i % 100}%", "#ffffff", 'w')
+            for i in range(count)]
+
+
+def benchmark_preview_canvas(count: int = 2000, frames: int = 50):
+    """Compara recriar todos os itens do canvas com reaproveitá-los."""
+    print(f"=== Preview com {count} widgets, {frames} atualizações ===")
+    layout = build_bar_layout(count)
+
+    # Caminho antigo: delete("all") e create_text para cada widget
+    canvas = RecordingCanvas()
+    start = time.perf_counter()
+    for _ in range(frames):
+        canvas.delete("all")
+        for entry in layout:
+            canvas.create_text(entry.x, entry.y, text=entry.text, fill=entry.fill, anchor=entry.anchor)
+    recreate_time = time.perf_counter() - start
+    recreate_calls = canvas.total_calls()
+
+    # Caminho novo: sincronizar apenas o que mudou (um widget por quadro)
+    canvas = RecordingCanvas()
+    cache = CanvasItemCache(canvas)
+    cache.sync(layout)
+    start = time.perf_counter()
+    for frame in range(frames):
+        changed = list(layout)
+        index = frame % count
+        changed[index] = changed[index]._replace(text=f"W{index}: {frame}%")
+        cache.sync(changed)
+    reuse_time = time.perf_counter() - start
+    reuse_calls = canvas.total_calls()
+
+    print(f"   - Recriando: {recreate_time * 1000:.1f} ms, {recreate_calls} operações no canvas")
+    print(f"   - Reaproveitando: {reuse_time * 1000:.1f} ms, {reuse_calls} operações no canvas")
+
+
+def build_large_config(count: int):
+    """Gera uma configuração artificial com muitos widgets."""
+    names = [f"widget_{i}" for i in range(count)]
+    return {
+        'bars': {'yasb-bar': {'enabled': True, 'widgets': {'left': names, 'center': [], 'right': []}}},
+        'widgets': {name: {'type': 'yasb.custom.CustomWidget', 'enabled': True,
+                           'options': {'label': f"{{data}} {name}", 'update_interval': 1000,
+                                       'callbacks': {'on_left': 'toggle_label'}}}
+                    for name in names}
+    }
+
+
+def measure(function):
+    """Executa function e retorna (tempo em s, pico de memória em bytes)."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    function()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def benchmark_yaml_emit(count: int = 5000):
+    """Compara gerar o YAML inteiro de uma vez com emiti-lo em partes."""
+    print(f"=== YAML com {count} widgets ===")
+    config = build_large_config(count)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, 'config.yaml')
+
+        def dump_whole():
+            with open(path, 'w', encoding='utf-8') as file:
+                dump_yaml(config, file)
+
+        def dump_streaming():
+            atomic_write(path, (chunk.encode('utf-8') for chunk in chunked(iter_yaml(config))))
+
+        whole_time, whole_peak = measure(dump_whole)
+        stream_time, stream_peak = measure(dump_streaming)
+        size = os.path.getsize(path)
+
+    editor_time, editor_peak = measure(lambda: dump_yaml(config))
+    chunks_time, chunks_peak = measure(lambda: sum(1 for _ in chunked(iter_yaml(config))))
+
+    print(f"   - Arquivo de {size / 1024:.0f} KB")
+    print(f"   - Gravação com yaml.dump: {whole_time * 1000:.0f} ms, pico {whole_peak / 1024:.0f} KB")
+    print(f"   - Gravação em partes: {stream_time * 1000:.0f} ms, pico {stream_peak / 1024:.0f} KB")
+    print(f"   - Editor com yaml.dump: {editor_time * 1000:.0f} ms, pico {editor_peak / 1024:.0f} KB")
+    print(f"   - Editor em blocos: {chunks_time * 1000:.0f} ms, pico {chunks_peak / 1024:.0f} KB")
+
+
+def benchmark_config_store(count: int = 5000, edits: int = 1000):
+    """Mede as alterações do ConfigStore e quantas vistas cada uma atualiza."""
+    print(f"=== ConfigStore com {count} widgets, {edits} alterações ===")
+    store = ConfigStore(build_large_config(count))
+    calls = {}
+    views = {'árvore': (('widgets',), ('bars',)), 'preview': (('widgets',), ('bars',), ('styles',)),
+             'controles': (('system',), ('bars',), ('styles',)), 'editor YAML': ((),)}
+    for view, prefixes in views.items():
+        calls[view] = 0
+        for prefix in prefixes:
+            store.subscribe(prefix, lambda event, view=view: calls.__setitem__(view, calls[view] + 1))
+
+    start = time.perf_counter()
+    for i in range(edits):
+        store.toggle_widgets([f"widget_{i % count}"])
+    toggle_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(edits):
+        store.set(('system', 'debug_mode'), i % 2 == 0)
+    set_time = time.perf_counter() - start
+
+    print(f"   - Ativar/desativar: {toggle_time / edits * 1e6:.1f} µs por alteração")
+    print(f"   - Opção do sistema: {set_time / edits * 1e6:.1f} µs por alteração")
+    print("   - Atualizações por vista (antes: todas as vistas a cada alteração): " +
+          ", ".join(f"{view} {total}" for view, total in calls.items()))
+
+
+def run_all_benchmarks():
+    """Executa todos os benchmarks."""
+    benchmark_preview_canvas()
+    benchmark_yaml_emit()
+    benchmark_config_store()
+
+
+if __name__ == "__main__":
+    run_all_benchmarks()
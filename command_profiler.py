@@ -0,0 +1,222 @@
+"""
+Módulo para perfilar os comandos dos widgets yasb.custom.CustomWidget.
+
+Cada comando configurado é executado algumas vezes em um pool limitado de
+subprocessos, isolado em um diretório temporário, com ambiente reduzido e
+tempo máximo de execução. São medidos o tempo de parede, o tempo de CPU e o
+tamanho da saída de cada execução.
+"""
+
+import os
+import sys
+import signal
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Any, List, Optional, Tuple
+
+CUSTOM_WIDGET_TYPE = "yasb.custom.CustomWidget"
+
+# Intervalo padrão do CustomWidget (mesmo valor do diálogo de widgets)
+DEFAULT_UPDATE_INTERVAL = 5000
+
+# Variáveis de ambiente repassadas aos comandos perfilados
+SAFE_ENV_KEYS = (
+    "PATH", "PATHEXT", "SYSTEMROOT", "SYSTEMDRIVE", "COMSPEC", "WINDIR",
+    "TEMP", "TMP", "HOME", "USERPROFILE", "LANG", "LC_ALL"
+)
+
+
+def collect_custom_commands(config_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Retorna os comandos de todos os CustomWidget configurados."""
+    commands = []
+    for widget_name, widget_config in config_data.get('widgets', {}).items():
+        if not isinstance(widget_config, dict) or widget_config.get('type') != CUSTOM_WIDGET_TYPE:
+            continue
+        options = widget_config.get('options') or {}
+        command = str(options.get('command', '') or '').strip()
+        if not command:
+            continue
+        try:
+            interval = int(options.get('update_interval', DEFAULT_UPDATE_INTERVAL))
+        except (TypeError, ValueError):
+            interval = DEFAULT_UPDATE_INTERVAL
+        commands.append({
+            'name': widget_name,
+            'command': command,
+            'update_interval': interval,
+            'enabled': widget_config.get('enabled', True)
+        })
+    return commands
+
+
+def _sandbox_env() -> Dict[str, str]:
+    """Monta um ambiente mínimo para os comandos."""
+    return {key: os.environ[key] for key in SAFE_ENV_KEYS if key in os.environ}
+
+
+def _popen_kwargs() -> Dict[str, Any]:
+    """Opções de isolamento específicas da plataforma."""
+    if sys.platform == "win32":
+        return {'creationflags': subprocess.CREATE_NEW_PROCESS_GROUP}
+    return {'start_new_session': True}
+
+
+def _limited_command(command: str, timeout: float) -> str:
+    """Limita o tempo de CPU do comando e de seus filhos.
+
+    O limite é aplicado pelo próprio shell (ulimit), e não com preexec_fn,
+    que não é seguro quando há threads (o perfil roda em um pool).
+    """
+    if sys.platform == "win32":
+        return command
+    cpu_limit = max(1, int(timeout + 1))
+    return f"ulimit -t {cpu_limit} 2>/dev/null; {command}"
+
+
+def _kill_process(proc: subprocess.Popen, killed: threading.Event, lock: threading.Lock):
+    """Encerra o processo (e seu grupo) quando o tempo limite é atingido."""
+    with lock:
+        if proc.returncode is not None:
+            return
+        killed.set()
+        try:
+            if sys.platform == "win32":
+                proc.kill()
+            else:
+                os.killpg(proc.pid, signal.SIGKILL)
+        except OSError:
+            pass
+
+
+def _drain_output(stream, max_output: int) -> Tuple[int, bytes]:
+    """Lê toda a saída, guardando no máximo max_output bytes."""
+    total = 0
+    kept = bytearray()
+    while True:
+        chunk = stream.read(65536)
+        if not chunk:
+            break
+        total += len(chunk)
+        if len(kept) < max_output:
+            kept.extend(chunk[:max_output - len(kept)])
+    stream.close()
+    return total, bytes(kept)
+
+
+def _wait_with_usage(proc: subprocess.Popen, lock: threading.Lock) -> Tuple[int, Optional[float]]:
+    """Aguarda o processo e retorna o código de saída e o tempo de CPU."""
+    if hasattr(os, 'wait4') and hasattr(os, 'waitid'):
+        # Esperar o fim sem recolher o processo; recolher sob a mesma trava
+        # do _kill_process, para que ele nunca sinalize um pid reutilizado
+        os.waitid(os.P_PID, proc.pid, os.WEXITED | os.WNOWAIT)
+        with lock:
+            _, status, usage = os.wait4(proc.pid, 0)
+            proc.returncode = os.waitstatus_to_exitcode(status)
+        return proc.returncode, usage.ru_utime + usage.ru_stime
+
+    # Sem wait4 (Windows) o tempo de CPU não está disponível
+    proc.wait()
+    return proc.returncode, None
+
+
+def run_command_once(command: str, timeout: float = 5.0, max_output: int = 65536) -> Dict[str, Any]:
+    """Executa um comando uma vez no sandbox e mede seu custo."""
+    killed = threading.Event()
+    lock = threading.Lock()
+
+    with tempfile.TemporaryDirectory(prefix="yasb_profile_") as workdir:
+        start = time.perf_counter()
+        try:
+            proc = subprocess.Popen(_limited_command(command, timeout), shell=True, cwd=workdir,
+                                    env=_sandbox_env(), stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                                    stderr=subprocess.STDOUT, **_popen_kwargs())
+        except OSError as e:
+            return {'wall_time': 0.0, 'cpu_time': None, 'output_bytes': 0, 'output': b'',
+                    'returncode': None, 'timed_out': False, 'error': str(e)}
+
+        timer = threading.Timer(timeout, _kill_process, args=(proc, killed, lock))
+        timer.daemon = True
+        timer.start()
+        try:
+            output_bytes, output = _drain_output(proc.stdout, max_output)
+            returncode, cpu_time = _wait_with_usage(proc, lock)
+        finally:
+            timer.cancel()
+        wall_time = time.perf_counter() - start
+
+    return {
+        'wall_time': wall_time,
+        'cpu_time': cpu_time,
+        'output_bytes': output_bytes,
+        'output': output,
+        'returncode': returncode,
+        'timed_out': killed.is_set(),
+        'error': None
+    }
+
+
+def profile_command(entry: Dict[str, Any], runs: int = 3, timeout: float = 5.0,
+                    max_output: int = 65536, threshold: float = 0.25) -> Dict[str, Any]:
+    """Executa o comando de um widget várias vezes e resume as medições."""
+    samples = []
+    for _ in range(max(1, runs)):
+        sample = run_command_once(entry['command'], timeout, max_output)
+        samples.append(sample)
+        if sample['error'] or sample['timed_out']:
+            # Não insistir em comandos quebrados ou travados
+            break
+
+    wall_times = [s['wall_time'] for s in samples]
+    cpu_times = [s['cpu_time'] for s in samples if s['cpu_time'] is not None]
+    interval_s = max(entry['update_interval'], 1) / 1000.0
+    wall_mean = sum(wall_times) / len(wall_times)
+    timeouts = sum(1 for s in samples if s['timed_out'])
+    failures = sum(1 for s in samples if s['error'] or (s['returncode'] not in (0, None) and not s['timed_out']))
+    ratio = max(wall_times) / interval_s
+
+    return {
+        'name': entry['name'],
+        'command': entry['command'],
+        'update_interval': entry['update_interval'],
+        'runs': len(samples),
+        'wall_mean': wall_mean,
+        'wall_max': max(wall_times),
+        'cpu_mean': sum(cpu_times) / len(cpu_times) if cpu_times else None,
+        'output_bytes': max(s['output_bytes'] for s in samples),
+        'timeouts': timeouts,
+        'failures': failures,
+        'error': next((s['error'] for s in samples if s['error']), None),
+        'interval_ratio': ratio,
+        'flagged': bool(timeouts or ratio >= threshold)
+    }
+
+
+def profile_custom_widgets(config_data: Dict[str, Any], runs: int = 3, timeout: float = 5.0,
+                           max_workers: int = 4, max_output: int = 65536,
+                           threshold: float = 0.25,
+                           progress: Optional[Callable[[], None]] = None) -> List[Dict[str, Any]]:
+    """Perfila todos os comandos de CustomWidget em um pool limitado.
+
+    Um comando é sinalizado quando expira ou quando seu pior tempo de
+    execução ocupa uma fração do update_interval maior que threshold.
+    progress, se dado, é chamado a cada comando perfilado.
+    """
+    entries = collect_custom_commands(config_data)
+    if not entries:
+        return []
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(entries)))) as pool:
+        futures = [pool.submit(profile_command, entry, runs, timeout, max_output, threshold)
+                   for entry in entries]
+        results = []
+        for future in as_completed(futures):
+            results.append(future.result())
+            if progress is not None:
+                progress()
+
+    # Comandos mais caros primeiro
+    results.sort(key=lambda r: r['interval_ratio'], reverse=True)
+    return results
@@ -0,0 +1,163 @@
+"""
+Módulo com o salvamento automático da configuração.
+
+O AutoSaver é avisado a cada alteração registrada e dispara a gravação
+depois de um período sem alterações, ou ao atingir o atraso máximo desde a
+primeira alteração pendente (o que vier antes), para que uma edição longa
+não adie a gravação indefinidamente. A gravação em si acontece no
+BackgroundWriter, uma thread que serializa e grava o arquivo sem bloquear
+a interface.
+"""
+
+import queue
+import threading
+import time
+from typing import Any, Callable, NamedTuple, Optional
+
+from config_history import thaw
+from config_io import save_config
+from config_journal import content_hash
+
+# Tempo sem alterações antes de salvar e atraso máximo (ms)
+DEFAULT_QUIET_PERIOD = 2000
+DEFAULT_MAX_DELAY = 10000
+
+
+class AutoSaver:
+    """Agenda gravações automáticas após as alterações.
+
+    schedule(delay_ms, callback) deve retornar um identificador aceito por
+    cancel(); no painel são root.after e root.after_cancel. save() grava
+    (ou enfileira a gravação) e retorna False se não havia nada a salvar.
+    """
+
+    def __init__(self, schedule: Callable, cancel: Callable, save: Callable[[], bool],
+                 quiet_period: int = DEFAULT_QUIET_PERIOD, max_delay: int = DEFAULT_MAX_DELAY,
+                 clock: Callable[[], float] = time.monotonic):
+        self.schedule = schedule
+        self.cancel = cancel
+        self.save = save
+        self.quiet_period = quiet_period
+        self.max_delay = max_delay
+        self.clock = clock
+        self.enabled = False
+        self.pending = None
+        self.first_change: Optional[float] = None
+        self.saves = 0
+        self.skipped = 0
+        self.last_delay: Optional[float] = None
+
+    def set_enabled(self, enabled: bool):
+        """Liga ou desliga o salvamento automático (desligar descarta o agendado)."""
+        self.enabled = enabled
+        if not enabled:
+            self.reset()
+
+    def notify(self):
+        """Avisa que a configuração mudou."""
+        if not self.enabled:
+            return
+        now = self.clock()
+        if self.first_change is None:
+            self.first_change = now
+        remaining = self.first_change + self.max_delay / 1000.0 - now
+        delay_ms = max(0, min(self.quiet_period, int(remaining * 1000)))
+        self._disarm()
+        self.pending = self.schedule(delay_ms, self._fire)
+
+    def reset(self):
+        """Descarta a gravação agendada (por exemplo, após salvar manualmente)."""
+        self._disarm()
+        self.first_change = None
+
+    def flush(self):
+        """Grava imediatamente se houver uma gravação agendada."""
+        if self.pending is not None:
+            self._disarm()
+            self._fire()
+
+    def _disarm(self):
+        if self.pending is not None:
+            self.cancel(self.pending)
+        self.pending = None
+
+    def _fire(self):
+        self.pending = None
+        if self.first_change is not None:
+            self.last_delay = self.clock() - self.first_change
+        self.first_change = None
+        if not self.save():
+            self.skipped += 1
+
+    def record_result(self, written: bool):
+        """Contabiliza o resultado de uma gravação concluída."""
+        if written:
+            self.saves += 1
+        else:
+            self.skipped += 1
+
+
+class WriteResult(NamedTuple):
+    """Resultado de uma gravação do BackgroundWriter."""
+    path: str
+    tree: Any
+    written: bool
+    saved_hash: Optional[str]
+    elapsed: float
+    error: Optional[str]
+
+
+class BackgroundWriter:
+    """Thread que grava árvores congeladas da configuração.
+
+    Pedidos ainda não atendidos para o mesmo arquivo são substituídos pelo
+    mais recente; os resultados vão para a fila results, consumida pela
+    interface.
+    """
+
+    def __init__(self):
+        self.jobs: "queue.Queue[tuple]" = queue.Queue()
+        self.results: "queue.Queue[WriteResult]" = queue.Queue()
+        self.thread: Optional[threading.Thread] = None
+
+    def submit(self, path: str, tree: Any):
+        """Enfileira a gravação de tree (imutável) em path."""
+        if self.thread is None or not self.thread.is_alive():
+            self.thread = threading.Thread(target=self._run, daemon=True)
+            self.thread.start()
+        self.jobs.put((path, tree))
+
+    def busy(self) -> bool:
+        """Se há gravações enfileiradas ou em andamento."""
+        return self.jobs.unfinished_tasks > 0
+
+    def wait_idle(self):
+        """Espera terminar as gravações enfileiradas."""
+        self.jobs.join()
+
+    def _run(self):
+        while True:
+            jobs = [self.jobs.get()]
+            while True:
+                try:
+                    jobs.append(self.jobs.get_nowait())
+                except queue.Empty:
+                    break
+
+            latest = {}
+            for path, tree in jobs:
+                latest[path] = tree
+            for path, tree in latest.items():
+                self.results.put(self._write(path, tree))
+            for _ in jobs:
+                self.jobs.task_done()
+
+    def _write(self, path: str, tree: Any) -> WriteResult:
+        start = time.perf_counter()
+        try:
+            written = save_config(path, thaw(tree))
+            with open(path, 'rb') as file:
+                saved_hash = content_hash(file.read())
+        except Exception as e:
+            return WriteResult(path, tree, False, None, time.perf_counter() - start, str(e))
+        return WriteResult(path, tree, written, saved_hash, time.perf_counter() - start, None)
@@ -0,0 +1,139 @@
+"""
+Módulo com ligações de mão dupla entre variáveis da interface e a configuração.
+
+Cada variável (StringVar, BooleanVar...) é ligada a um caminho do
+ConfigStore. Uma escrita na variável (observada com trace_add) grava só
+aquele caminho, e só se o valor mudou; uma alteração na configuração
+atualiza só as variáveis cujos caminhos foram alterados, e só se o texto
+exibido for diferente. Travas de reentrada impedem que uma direção
+dispare a outra de volta.
+
+O módulo não depende do Tk: qualquer objeto com get, set, trace_add e
+trace_remove serve como variável.
+"""
+
+from typing import Any, Callable, List, Optional, Tuple, Union
+
+from config_store import ChangeEvent, ConfigStore, paths_overlap
+
+_MISSING = object()
+
+PathSpec = Union[Tuple, Callable[[], Tuple]]
+
+
+class VariableBinding:
+    """Ligação entre uma variável e um caminho da configuração.
+
+    path pode ser uma função, para caminhos que dependem do estado da
+    interface (como a barra selecionada). parse converte o valor da
+    variável para a configuração (um ValueError rejeita a entrada) e display
+    faz o caminho inverso.
+    """
+
+    def __init__(self, variable: Any, path: PathSpec, parse: Callable[[Any], Any] = str,
+                 display: Callable[[Any], Any] = str, default: Any = None, label: str = ""):
+        self.variable = variable
+        self.path_spec = path
+        self.parse = parse
+        self.display = display
+        self.default = default
+        self.label = label
+        self.trace_name: Optional[str] = None
+
+    def path(self) -> Tuple:
+        """Caminho atual da ligação."""
+        return tuple(self.path_spec() if callable(self.path_spec) else self.path_spec)
+
+
+class BindingSet:
+    """Conjunto de ligações entre variáveis e um ConfigStore.
+
+    on_error(binding, text) é chamado quando a variável tem um valor que
+    parse rejeita; a configuração mantém o último valor válido.
+    """
+
+    def __init__(self, store: ConfigStore, on_error: Optional[Callable[[VariableBinding, Any], None]] = None):
+        self.store = store
+        self.on_error = on_error
+        self.bindings: List[VariableBinding] = []
+        self.invalid: List[VariableBinding] = []
+        self.loading = False
+        self.writing: Optional[VariableBinding] = None
+        self.writes = 0
+        self.loads = 0
+        self.token = store.subscribe((), self.on_store_changed)
+
+    def bind(self, variable: Any, path: PathSpec, parse: Callable[[Any], Any] = str,
+             display: Callable[[Any], Any] = str, default: Any = None, label: str = "") -> VariableBinding:
+        """Liga variable a path e carrega o valor atual da configuração."""
+        binding = VariableBinding(variable, path, parse, display, default, label)
+        binding.trace_name = variable.trace_add(
+            'write', lambda *args, binding=binding: self.on_variable_written(binding))
+        self.bindings.append(binding)
+        self.load(binding)
+        return binding
+
+    def close(self):
+        """Desfaz todas as ligações."""
+        self.store.unsubscribe(self.token)
+        for binding in self.bindings:
+            if binding.trace_name is not None:
+                binding.variable.trace_remove('write', binding.trace_name)
+        self.bindings = []
+        self.invalid = []
+
+    # Interface -> configuração
+
+    def on_variable_written(self, binding: VariableBinding):
+        """Grava na configuração o novo valor de uma variável."""
+        if self.loading:
+            return  # A escrita veio da própria configuração
+        text = binding.variable.get()
+        try:
+            value = binding.parse(text)
+        except (TypeError, ValueError):
+            if binding not in self.invalid:
+                self.invalid.append(binding)
+            if self.on_error:
+                self.on_error(binding, text)
+            return
+        if binding in self.invalid:
+            self.invalid.remove(binding)
+
+        self.writing = binding
+        try:
+            if self.store.set(binding.path(), value, binding.label, coalesce=True):
+                self.writes += 1
+        finally:
+            self.writing = None
+
+    # Configuração -> interface
+
+    def on_store_changed(self, event: ChangeEvent):
+        """Recarrega as variáveis cujos caminhos foram alterados."""
+        for binding in self.bindings:
+            if binding is self.writing:
+                continue  # Não reescrever o campo em que o usuário está digitando
+            path = binding.path()
+            if any(paths_overlap(path, changed) for changed in event.paths):
+                self.load(binding)
+
+    def load(self, binding: VariableBinding):
+        """Mostra na variável o valor da configuração, se ele for diferente."""
+        value = self.store.get(binding.path(), _MISSING)
+        shown = binding.display(binding.default if value is _MISSING else value)
+        if binding in self.invalid:
+            self.invalid.remove(binding)
+        elif binding.variable.get() == shown:
+            return
+        self.loading = True
+        try:
+            binding.variable.set(shown)
+            self.loads += 1
+        finally:
+            self.loading = False
+
+    def refresh(self):
+        """Recarrega todas as variáveis (por exemplo, após trocar a barra selecionada)."""
+        for binding in self.bindings:
+            self.load(binding)
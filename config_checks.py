@@ -0,0 +1,80 @@
+"""
+Módulo com as verificações da configuração do YASB, sem interface.
+
+validate_config reúne os erros que impedem a barra de funcionar (usados
+pelo botão "Testar Configuração" e pela linha de comando); lint_config
+aponta inconsistências que não quebram a barra, mas provavelmente são
+enganos (widgets sem posição, posições de widgets inexistentes, cores
+inválidas).
+"""
+
+import re
+from typing import Any, Dict, List
+
+from label_templates import WIDGETS_NOT_MAPPING, validate_widget_labels
+from preview_layout import SECTIONS
+
+COLOR_PATTERN = re.compile(r'^#(?:[0-9a-fA-F]{3}|[0-9a-fA-F]{6}|[0-9a-fA-F]{8})$')
+
+
+def validate_config(config_data: Dict[str, Any]) -> List[str]:
+    """Lista os erros da configuração (vazia se ela é válida)."""
+    if not isinstance(config_data, dict):
+        return ["A configuração não é um mapeamento YAML"]
+
+    errors = []
+    widgets = config_data.get('widgets') or {}
+    if not isinstance(widgets, dict):
+        return [WIDGETS_NOT_MAPPING]
+    if not widgets:
+        errors.append("Nenhum widget configurado")
+
+    active_widgets = [widget for widget in widgets.values()
+                      if not isinstance(widget, dict) or widget.get('enabled', True)]
+    if not active_widgets:
+        errors.append("Nenhum widget ativo")
+
+    if not config_data.get('bars'):
+        errors.append("Configuração da barra não encontrada")
+
+    errors.extend(validate_widget_labels(config_data))
+    return errors
+
+
+def lint_config(config_data: Dict[str, Any]) -> List[str]:
+    """Lista avisos sobre inconsistências da configuração."""
+    if not isinstance(config_data, dict):
+        return []
+
+    warnings = []
+    widgets = config_data.get('widgets') or {}
+    if not isinstance(widgets, dict):
+        widgets = {}  # Já é um erro de validate_config
+    for widget_name, widget_config in widgets.items():
+        if not isinstance(widget_config, dict) or not widget_config.get('type'):
+            warnings.append(f"Widget '{widget_name}' sem tipo")
+
+    placed = set()
+    for bar_name, bar_config in (config_data.get('bars') or {}).items():
+        sections = (bar_config or {}).get('widgets') or {}
+        for section, names in sections.items():
+            if section not in SECTIONS:
+                warnings.append(f"Barra '{bar_name}': seção desconhecida '{section}'")
+            seen = set()
+            for widget_name in names or []:
+                if widget_name in seen:
+                    warnings.append(f"Barra '{bar_name}': widget '{widget_name}' repetido em '{section}'")
+                seen.add(widget_name)
+                if widget_name not in widgets:
+                    warnings.append(f"Barra '{bar_name}': widget '{widget_name}' não está definido")
+            placed |= seen
+
+    for widget_name in widgets:
+        if widget_name not in placed:
+            warnings.append(f"Widget '{widget_name}' não está em nenhuma barra")
+
+    styles = (config_data.get('styles') or {}).get('default') or {}
+    for option, value in styles.items():
+        if option.endswith('_color') and not COLOR_PATTERN.match(str(value)):
+            warnings.append(f"Estilo '{option}': cor inválida '{value}'")
+    return warnings
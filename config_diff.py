@@ -0,0 +1,191 @@
+"""
+Módulo para comparar estruturalmente duas versões da configuração.
+
+Cada subárvore recebe um hash (calculado uma única vez, de baixo para
+cima), e a comparação desce apenas pelos ramos cujos hashes diferem. Para
+listas, como as posições dos widgets nas barras, é usado o diff de Myers
+(menor sequência de remoções e inserções, equivalente ao LCS).
+"""
+
+import hashlib
+import json
+from typing import Any, Dict, List, NamedTuple, Sequence, Tuple
+
+from config_merge import describe_path
+
+# Acima desta distância de edição, listas são mostradas como substituídas
+MAX_LIST_EDIT_DISTANCE = 2000
+
+# Tamanho máximo de um valor exibido no painel de diferenças
+MAX_VALUE_LENGTH = 200
+
+
+class DiffEntry(NamedTuple):
+    """Diferença em um caminho da configuração.
+
+    kind é 'added', 'removed', 'changed' ou 'list'. Em 'list', new traz as
+    operações (tag, posição, item) com tag '-' (removido) ou '+' (inserido).
+    """
+    kind: str
+    path: Tuple
+    old: Any
+    new: Any
+
+
+def subtree_hash(value: Any, cache: Dict[int, bytes]) -> bytes:
+    """Hash de uma subárvore, independente da ordem das chaves dos dicionários."""
+    key = id(value)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+
+    if isinstance(value, dict):
+        pairs = sorted(hashlib.blake2b(repr(child_key).encode() + subtree_hash(child, cache),
+                                       digest_size=16).digest()
+                       for child_key, child in value.items())
+        digest = hashlib.blake2b(b'd' + b''.join(pairs), digest_size=16).digest()
+    elif isinstance(value, (list, tuple)):
+        digest = hashlib.blake2b(b'l' + b''.join(subtree_hash(child, cache) for child in value),
+                                 digest_size=16).digest()
+    else:
+        digest = hashlib.blake2b(repr((type(value).__name__, value)).encode(), digest_size=16).digest()
+    # Só objetos que ficam vivos durante a comparação podem ser guardados por id
+    if isinstance(value, (dict, list, tuple)):
+        cache[key] = digest
+    return digest
+
+
+def diff_configs(old: Any, new: Any) -> List[DiffEntry]:
+    """Lista as diferenças de old (ex.: o disco) para new (ex.: o painel)."""
+    cache: Dict[int, bytes] = {}
+    entries: List[DiffEntry] = []
+    _diff(old, new, (), cache, entries)
+    return entries
+
+
+def _diff(old: Any, new: Any, path: Tuple, cache: Dict[int, bytes], entries: List[DiffEntry]):
+    if old is new or subtree_hash(old, cache) == subtree_hash(new, cache):
+        return
+
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key, value in old.items():
+            if key not in new:
+                entries.append(DiffEntry('removed', path + (key,), value, None))
+        for key, value in new.items():
+            if key not in old:
+                entries.append(DiffEntry('added', path + (key,), None, value))
+            else:
+                _diff(old[key], value, path + (key,), cache, entries)
+        return
+
+    if isinstance(old, list) and isinstance(new, list):
+        old_hashes = [subtree_hash(item, cache) for item in old]
+        new_hashes = [subtree_hash(item, cache) for item in new]
+        operations = []
+        for tag, old_index, new_index in edit_script(old_hashes, new_hashes):
+            if tag == '-':
+                operations.append(('-', old_index, old[old_index]))
+            else:
+                operations.append(('+', new_index, new[new_index]))
+        entries.append(DiffEntry('list', path, old, operations))
+        return
+
+    entries.append(DiffEntry('changed', path, old, new))
+
+
+def edit_script(a: Sequence, b: Sequence,
+                max_distance: int = MAX_LIST_EDIT_DISTANCE) -> List[Tuple[str, int, int]]:
+    """Menor sequência de remoções ('-', i, j) e inserções ('+', i, j) de a para b (Myers).
+
+    i e j são as posições em a e b. Prefixo e sufixo comuns são removidos
+    antes; se a distância passar de max_distance, a lista inteira é trocada.
+    """
+    start = 0
+    while start < len(a) and start < len(b) and a[start] == b[start]:
+        start += 1
+    end_a, end_b = len(a), len(b)
+    while end_a > start and end_b > start and a[end_a - 1] == b[end_b - 1]:
+        end_a -= 1
+        end_b -= 1
+    a_mid, b_mid = a[start:end_a], b[start:end_b]
+    n, m = len(a_mid), len(b_mid)
+
+    replace_all = ([('-', start + i, start) for i in range(n)] +
+                   [('+', start + n, start + j) for j in range(m)])
+    if n == 0 or m == 0:
+        return replace_all
+
+    frontier = {1: 0}
+    trace = []
+    for distance in range(min(n + m, max_distance) + 1):
+        trace.append(dict(frontier))
+        for k in range(-distance, distance + 1, 2):
+            if k == -distance or (k != distance and frontier[k - 1] < frontier[k + 1]):
+                x = frontier[k + 1]
+            else:
+                x = frontier[k - 1] + 1
+            y = x - k
+            while x < n and y < m and a_mid[x] == b_mid[y]:
+                x += 1
+                y += 1
+            frontier[k] = x
+            if x >= n and y >= m:
+                return _backtrack(trace, n, m, start)
+    return replace_all
+
+
+def _backtrack(trace: List[Dict[int, int]], n: int, m: int, offset: int) -> List[Tuple[str, int, int]]:
+    script = []
+    x, y = n, m
+    for distance in range(len(trace) - 1, 0, -1):
+        frontier = trace[distance]
+        k = x - y
+        if k == -distance or (k != distance and frontier[k - 1] < frontier[k + 1]):
+            previous_k = k + 1
+        else:
+            previous_k = k - 1
+        previous_x = frontier[previous_k]
+        previous_y = previous_x - previous_k
+        if previous_k == k + 1:
+            script.append(('+', offset + previous_x, offset + previous_y))
+        else:
+            script.append(('-', offset + previous_x, offset + previous_y))
+        x, y = previous_x, previous_y
+    script.reverse()
+    return script
+
+
+def format_value(value: Any) -> str:
+    """Representação curta de um valor para o painel de diferenças."""
+    if isinstance(value, (dict, list)):
+        text = json.dumps(value, ensure_ascii=False, default=str)
+    else:
+        text = str(value)
+    if len(text) > MAX_VALUE_LENGTH:
+        text = text[:MAX_VALUE_LENGTH - 3] + "..."
+    return text
+
+
+def format_entry(entry: DiffEntry) -> List[Tuple[str, str]]:
+    """Linhas (texto, tag) de uma diferença."""
+    path = describe_path(entry.path)
+    if entry.kind == 'added':
+        return [(f"+ {path}: {format_value(entry.new)}\n", 'added')]
+    if entry.kind == 'removed':
+        return [(f"- {path}: {format_value(entry.old)}\n", 'removed')]
+    if entry.kind == 'changed':
+        return [(f"~ {path}: {format_value(entry.old)} → {format_value(entry.new)}\n", 'changed')]
+
+    lines = [(f"~ {path}:\n", 'changed')]
+    for tag, index, item in entry.new:
+        lines.append((f"    {tag} [{index}] {format_value(item)}\n", 'added' if tag == '+' else 'removed'))
+    return lines
+
+
+def summarize(entries: List[DiffEntry]) -> str:
+    """Resumo da quantidade de diferenças por tipo."""
+    counts = {'added': 0, 'removed': 0, 'changed': 0}
+    for entry in entries:
+        counts['changed' if entry.kind == 'list' else entry.kind] += 1
+    return (f"{len(entries)} diferença(s): {counts['added']} adição(ões), "
+            f"{counts['removed']} remoção(ões), {counts['changed']} alteração(ões)")
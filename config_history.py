@@ -0,0 +1,246 @@
+"""
+Módulo com o histórico de desfazer/refazer da configuração.
+
+Cada estado é guardado como uma árvore imutável (FrozenMap para
+dicionários, tuplas para listas). Ao registrar uma edição, a nova árvore
+reaproveita todos os nós que não mudaram em relação ao estado anterior,
+então cada entrada custa memória proporcional ao que foi alterado. O
+histórico descarta as entradas mais antigas quando passa do orçamento.
+"""
+
+import sys
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+# Orçamento padrão de memória do histórico (bytes)
+DEFAULT_HISTORY_BUDGET = 16 * 1024 * 1024
+
+_MISSING = object()
+
+
+class FrozenMap:
+    """Dicionário imutável de uma árvore de configuração congelada."""
+
+    __slots__ = ('items',)
+
+    def __init__(self, items: Dict[str, Any]):
+        self.items = items
+
+    def __repr__(self):
+        return f"FrozenMap({self.items!r})"
+
+
+def freeze(value: Any, previous: Any = _MISSING) -> Tuple[Any, int]:
+    """Congela value reaproveitando os nós iguais de previous.
+
+    Retorna a árvore congelada e o custo em bytes dos nós novos. Se nada
+    mudou, a própria previous é retornada, com custo zero.
+    """
+    cost = [0]
+    return _freeze(value, previous, cost), cost[0]
+
+
+def _freeze(value: Any, previous: Any, cost: List[int]) -> Any:
+    if isinstance(value, dict):
+        previous_items = previous.items if isinstance(previous, FrozenMap) else None
+        changed = previous_items is None or len(previous_items) != len(value)
+        items = {}
+        for key, child in value.items():
+            previous_child = _MISSING if previous_items is None else previous_items.get(key, _MISSING)
+            frozen = _freeze(child, previous_child, cost)
+            changed = changed or frozen is not previous_child
+            items[key] = frozen
+        # A ordem das chaves também faz parte do estado (é a ordem do YAML)
+        if not changed and list(items) == list(previous_items):
+            return previous
+        cost[0] += sys.getsizeof(items) + sys.getsizeof(FrozenMap)
+        return FrozenMap(items)
+
+    if isinstance(value, (list, tuple)):
+        previous_children = previous if type(previous) is tuple else None
+        changed = previous_children is None or len(previous_children) != len(value)
+        children = []
+        for position, child in enumerate(value):
+            if previous_children is not None and position < len(previous_children):
+                previous_child = previous_children[position]
+            else:
+                previous_child = _MISSING
+            frozen = _freeze(child, previous_child, cost)
+            changed = changed or frozen is not previous_child
+            children.append(frozen)
+        if not changed:
+            return previous
+        frozen_list = tuple(children)
+        cost[0] += sys.getsizeof(frozen_list)
+        return frozen_list
+
+    if previous is not _MISSING and type(previous) is type(value) and previous == value:
+        return previous
+    cost[0] += sys.getsizeof(value)
+    return value
+
+
+def thaw(frozen: Any) -> Any:
+    """Cria uma cópia mutável (dicts e listas) de uma árvore congelada."""
+    if isinstance(frozen, FrozenMap):
+        return {key: thaw(value) for key, value in frozen.items.items()}
+    if type(frozen) is tuple:
+        return [thaw(value) for value in frozen]
+    return frozen
+
+
+def tree_size(frozen: Any) -> int:
+    """Tamanho total em bytes de uma árvore congelada (nós compartilhados uma vez)."""
+    seen = set()
+    total = 0
+    stack = [frozen]
+    while stack:
+        node = stack.pop()
+        if id(node) in seen:
+            continue
+        seen.add(id(node))
+        if isinstance(node, FrozenMap):
+            total += sys.getsizeof(node.items) + sys.getsizeof(FrozenMap)
+            stack.extend(node.items.values())
+        elif type(node) is tuple:
+            total += sys.getsizeof(node)
+            stack.extend(node)
+        else:
+            total += sys.getsizeof(node)
+    return total
+
+
+def diff_trees(old: Any, new: Any, path: Tuple = ()) -> List[tuple]:
+    """Lista as operações que transformam a árvore old na árvore new.
+
+    As operações são ('set', caminho, valor) e ('del', caminho). Nós
+    compartilhados (idênticos) são pulados sem percorrê-los, então o custo
+    é proporcional às partes alteradas. Listas são substituídas inteiras.
+    """
+    if old is new:
+        return []
+    if not (isinstance(old, FrozenMap) and isinstance(new, FrozenMap)):
+        return [('set', path, thaw(new))]
+
+    old_items, new_items = old.items, new.items
+    kept = [key for key in new_items if key in old_items]
+    # Chaves novas só podem ser acrescentadas ao fim sem mudar a ordem do YAML
+    if kept != [key for key in old_items if key in new_items] or list(new_items)[:len(kept)] != kept:
+        return [('set', path, thaw(new))]
+
+    operations = [('del', path + (key,)) for key in old_items if key not in new_items]
+    for key, value in new_items.items():
+        if key in old_items:
+            operations.extend(diff_trees(old_items[key], value, path + (key,)))
+        else:
+            operations.append(('set', path + (key,), thaw(value)))
+    return operations
+
+
+def apply_operations(config_data: Dict[str, Any], operations: List[tuple]) -> Dict[str, Any]:
+    """Aplica operações de diff_trees à configuração. Retorna a configuração."""
+    for operation in operations:
+        kind, path = operation[0], tuple(operation[1])
+        if not path:
+            if kind == 'set':
+                config_data = operation[2]
+            continue
+        parent = config_data
+        for key in path[:-1]:
+            child = parent.get(key)
+            if not isinstance(child, dict):
+                child = parent[key] = {}
+            parent = child
+        if kind == 'set':
+            parent[path[-1]] = operation[2]
+        else:
+            parent.pop(path[-1], None)
+    return config_data
+
+
+class HistoryEntry(NamedTuple):
+    """Estado da configuração após uma edição."""
+    label: str
+    tree: Any
+    cost: int
+
+
+class ConfigHistory:
+    """Pilha de desfazer/refazer com limite de memória."""
+
+    def __init__(self, budget_bytes: int = DEFAULT_HISTORY_BUDGET):
+        self.budget = budget_bytes
+        self.entries: List[HistoryEntry] = []
+        self.position = -1
+
+    def reset(self, config_data: Dict[str, Any], label: str = "Configuração carregada"):
+        """Descarta o histórico e usa config_data como estado inicial."""
+        tree, _ = freeze(config_data)
+        self.entries = [HistoryEntry(label, tree, tree_size(tree))]
+        self.position = 0
+
+    def record(self, label: str, config_data: Dict[str, Any], coalesce: bool = False) -> bool:
+        """Registra o estado atual após uma edição.
+
+        Com coalesce, uma edição com o mesmo rótulo da última entrada (como
+        digitar em um campo) substitui essa entrada em vez de criar outra.
+        Retorna False (sem criar entrada) quando nada mudou.
+        """
+        if not self.entries:
+            self.reset(config_data)
+            return False
+
+        previous = self.entries[self.position].tree
+        tree, cost = freeze(config_data, previous)
+        if tree is previous:
+            return False
+
+        if (coalesce and 0 < self.position == len(self.entries) - 1 and
+                self.entries[self.position].label == label):
+            self.entries[self.position] = HistoryEntry(label, tree, self.entries[self.position].cost + cost)
+            self._trim()
+            return True
+
+        # Uma edição nova descarta o que poderia ser refeito
+        del self.entries[self.position + 1:]
+        self.entries.append(HistoryEntry(label, tree, cost))
+        self.position = len(self.entries) - 1
+        self._trim()
+        return True
+
+    def _trim(self):
+        while len(self.entries) > 1 and self.memory_usage() > self.budget:
+            self.entries.pop(0)
+            self.position -= 1
+            # O novo estado mais antigo passa a responder pela árvore inteira
+            base = self.entries[0]
+            self.entries[0] = base._replace(cost=tree_size(base.tree))
+
+    def current(self) -> Any:
+        """Árvore congelada do estado atual."""
+        return self.entries[self.position].tree if self.entries else None
+
+    def memory_usage(self) -> int:
+        """Memória estimada ocupada pelo histórico, em bytes."""
+        return sum(entry.cost for entry in self.entries)
+
+    def can_undo(self) -> bool:
+        return self.position > 0
+
+    def can_redo(self) -> bool:
+        return self.position < len(self.entries) - 1
+
+    def undo(self) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """Volta um estado. Retorna (rótulo desfeito, configuração) ou None."""
+        if not self.can_undo():
+            return None
+        label = self.entries[self.position].label
+        self.position -= 1
+        return label, thaw(self.entries[self.position].tree)
+
+    def redo(self) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """Avança um estado. Retorna (rótulo refeito, configuração) ou None."""
+        if not self.can_redo():
+            return None
+        self.position += 1
+        entry = self.entries[self.position]
+        return entry.label, thaw(entry.tree)
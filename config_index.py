@@ -0,0 +1,126 @@
+"""
+Módulo com índices sobre a configuração do YASB.
+
+O BarIndex guarda, para cada widget, as barras e seções em que ele está
+posicionado, evitando percorrer todas as barras a cada consulta.
+"""
+
+import copy
+from typing import Dict, Any, Iterable, List, Optional
+
+from preview_layout import SECTIONS
+
+DEFAULT_BAR_NAME = "yasb-bar"
+
+
+def empty_bar_widgets() -> Dict[str, list]:
+    """Retorna as seções de widgets vazias de uma barra."""
+    return {section: [] for section in SECTIONS}
+
+
+class BarIndex:
+    """Índice de posicionamento dos widgets nas barras."""
+
+    def __init__(self, config_data: Optional[Dict[str, Any]] = None):
+        self.bars: List[str] = []
+        self.placements: Dict[str, Dict[str, str]] = {}
+        if config_data is not None:
+            self.rebuild(config_data)
+
+    def rebuild(self, config_data: Dict[str, Any]):
+        """Reconstrói o índice a partir da configuração."""
+        self.config_data = config_data
+        self.bars = list(config_data.get('bars', {}) or {})
+        self.placements = {}
+        for bar_name in self.bars:
+            bar_config = config_data['bars'][bar_name] or {}
+            for section, widgets in (bar_config.get('widgets') or {}).items():
+                for widget_name in widgets or []:
+                    self.placements.setdefault(widget_name, {}).setdefault(bar_name, section)
+
+    def position(self, widget_name: str, bar_name: str) -> str:
+        """Seção do widget na barra, ou 'N/A'."""
+        return self.placements.get(widget_name, {}).get(bar_name, "N/A")
+
+    def bars_of(self, widget_name: str) -> Dict[str, str]:
+        """Barras (e seções) em que o widget está posicionado."""
+        return self.placements.get(widget_name, {})
+
+    def bar_config(self, bar_name: str, create: bool = False) -> Dict[str, Any]:
+        """Retorna a configuração de uma barra, criando-a se pedido."""
+        bars = self.config_data.get('bars')
+        if bars is None:
+            if not create:
+                return {}
+            bars = self.config_data['bars'] = {}
+        if bar_name not in bars:
+            if not create:
+                return {}
+            bars[bar_name] = {'widgets': empty_bar_widgets()}
+            self.bars.append(bar_name)
+        return bars[bar_name]
+
+    def place(self, widget_name: str, bar_name: str, section: str):
+        """Adiciona o widget ao fim de uma seção da barra."""
+        bar_config = self.bar_config(bar_name, create=True)
+        widgets = bar_config.setdefault('widgets', empty_bar_widgets())
+        widgets.setdefault(section, []).append(widget_name)
+        self.placements.setdefault(widget_name, {}).setdefault(bar_name, section)
+
+    def add_bar(self, bar_name: str, template: Optional[Dict[str, Any]] = None):
+        """Cria uma barra nova, copiando as opções (não os widgets) de template."""
+        bar_config = {key: copy.deepcopy(value) for key, value in (template or {}).items()
+                      if key != 'widgets'}
+        bar_config['widgets'] = empty_bar_widgets()
+        self.config_data.setdefault('bars', {})[bar_name] = bar_config
+        if bar_name not in self.bars:
+            self.bars.append(bar_name)
+
+    def remove_bar(self, bar_name: str):
+        """Remove uma barra e suas posições do índice."""
+        bar_config = self.config_data.get('bars', {}).pop(bar_name, None) or {}
+        if bar_name in self.bars:
+            self.bars.remove(bar_name)
+        for names in (bar_config.get('widgets') or {}).values():
+            for widget_name in names or []:
+                self.placements.get(widget_name, {}).pop(bar_name, None)
+
+    def unplace_many(self, widget_names: Iterable[str]) -> int:
+        """Remove vários widgets de todas as barras em uma única passada.
+
+        Cada lista de seção afetada é filtrada uma só vez, então o custo é
+        linear no tamanho das seções, e não no número de widgets removidos
+        vezes o tamanho das seções.
+        """
+        names = set(widget_names)
+        affected = set()
+        for widget_name in names:
+            affected.update(self.placements.pop(widget_name, {}))
+
+        removed = 0
+        for bar_name in affected:
+            widgets = self.bar_config(bar_name).get('widgets') or {}
+            for section, section_names in widgets.items():
+                if not section_names:
+                    continue
+                kept = [name for name in section_names if name not in names]
+                removed += len(section_names) - len(kept)
+                section_names[:] = kept
+        return removed
+
+    def move_many(self, widget_names: List[str], bar_name: str, section: str):
+        """Move vários widgets, na ordem dada, para o fim de uma seção da barra."""
+        widget_names = list(dict.fromkeys(widget_names))
+        names = set(widget_names)
+        bar_config = self.bar_config(bar_name, create=True)
+        widgets = bar_config.setdefault('widgets', empty_bar_widgets())
+        for section_names in widgets.values():
+            if section_names:
+                section_names[:] = [name for name in section_names if name not in names]
+
+        target = widgets.setdefault(section, [])
+        if target is None:
+            target = widgets[section] = []
+        target.extend(widget_names)
+        for widget_name in widget_names:
+            self.placements.setdefault(widget_name, {})[bar_name] = section
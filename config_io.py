@@ -0,0 +1,203 @@
+"""
+Módulo para gravar a configuração do YASB em YAML.
+
+Widgets duplicados compartilham o dicionário de opções com o original
+(cópia na escrita), então o YAML é emitido sem âncoras/aliases: cada
+widget aparece por extenso, como o YASB espera.
+
+A gravação é atômica (arquivo temporário + fsync + os.replace) e é pulada
+quando o conteúdo canônico já é o que está no disco, para não disparar o
+recarregamento do YASB à toa. O YAML é emitido em partes (uma por seção e
+por entrada de cada seção), então o documento inteiro nunca fica em
+memória de uma vez.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from typing import Any, Dict, Iterable, Iterator, Optional, TextIO, Tuple
+
+import yaml
+
+# Hash canônico do conteúdo de cada arquivo, por (mtime_ns, tamanho)
+_disk_hashes: Dict[str, Tuple[int, int, str]] = {}
+
+# Largura de linha padrão do yaml.dump e profundidade das partes emitidas
+YAML_WIDTH = 80
+STREAM_DEPTH = 2
+
+# Tamanho aproximado dos blocos gravados no disco ou inseridos no editor
+CHUNK_SIZE = 64 * 1024
+
+
+class NoAliasDumper(yaml.SafeDumper):
+    """Dumper que nunca gera âncoras (&id001) para objetos repetidos."""
+
+    def ignore_aliases(self, data: Any) -> bool:
+        return True
+
+
+# Tuplas (ex.: valores vindos da interface) são gravadas como listas
+NoAliasDumper.add_representer(tuple, yaml.SafeDumper.represent_list)
+
+
+def dump_yaml(data: Any, stream: Optional[TextIO] = None) -> Optional[str]:
+    """Serializa a configuração no formato usado pelo painel."""
+    return yaml.dump(data, stream, Dumper=NoAliasDumper, default_flow_style=False,
+                     allow_unicode=True, indent=2)
+
+
+def _sorted_items(mapping: Dict[Any, Any]):
+    # Mesma ordem do yaml.dump (sort_keys=True), inclusive para chaves não ordenáveis
+    try:
+        return sorted(mapping.items())
+    except TypeError:
+        return list(mapping.items())
+
+
+def iter_yaml(data: Any, prefix: str = "", depth: int = STREAM_DEPTH) -> Iterator[str]:
+    """Emite o mesmo texto de dump_yaml(data), em partes.
+
+    Mapeamentos não vazios são abertos até depth níveis: cada chave vira
+    um cabeçalho e cada valor é serializado separadamente, com a indentação
+    como prefixo e a largura reduzida do mesmo tanto, o que reproduz as
+    quebras de linha do documento inteiro.
+    """
+    if depth <= 0 or not isinstance(data, dict) or not data:
+        yield _dump_prefixed(data, prefix)
+        return
+
+    for key, value in _sorted_items(data):
+        if not isinstance(value, dict) or not value:
+            yield _dump_prefixed({key: value}, prefix)
+            continue
+        header = _dump_prefixed({key: None}, prefix)
+        if not header.endswith(": null\n") or "\n" in header[:-1]:
+            # Chave complexa: serializar a entrada inteira
+            yield _dump_prefixed({key: value}, prefix)
+            continue
+        yield header[:-len(" null\n")] + "\n"
+        yield from iter_yaml(value, prefix + "  ", depth - 1)
+
+
+def _dump_prefixed(data: Any, prefix: str) -> str:
+    text = yaml.dump(data, Dumper=NoAliasDumper, default_flow_style=False,
+                     allow_unicode=True, indent=2, width=YAML_WIDTH - len(prefix))
+    if not prefix:
+        return text
+    return "".join(prefix + line if line.strip() else line
+                   for line in text.splitlines(keepends=True))
+
+
+def chunked(parts: Iterable[str], size: int = CHUNK_SIZE) -> Iterator[str]:
+    """Agrupa partes pequenas em blocos de aproximadamente size caracteres."""
+    buffer = []
+    length = 0
+    for part in parts:
+        buffer.append(part)
+        length += len(part)
+        if length >= size:
+            yield "".join(buffer)
+            buffer, length = [], 0
+    if buffer:
+        yield "".join(buffer)
+
+
+def canonical_hash(data: Any) -> str:
+    """Hash do conteúdo da configuração, independente de formatação e ordem das chaves.
+
+    O JSON canônico é gerado em partes direto para o hash.
+    """
+    options = {'ensure_ascii': False, 'separators': (',', ':'), 'default': str}
+    try:
+        return _hash_parts(json.JSONEncoder(sort_keys=True, **options).iterencode(data))
+    except TypeError:
+        # Chaves de tipos misturados não podem ser ordenadas
+        return _hash_parts(json.JSONEncoder(**options).iterencode(data))
+
+
+def _hash_parts(parts: Iterable[str]) -> str:
+    digest = hashlib.sha256()
+    for part in chunked(parts):
+        digest.update(part.encode('utf-8'))
+    return digest.hexdigest()
+
+
+def file_canonical_hash(path: str) -> Optional[str]:
+    """Hash canônico do arquivo no disco (None se ausente ou inválido).
+
+    O resultado fica em cache enquanto mtime e tamanho não mudarem, então o
+    arquivo só é lido e interpretado de novo se alguém o alterou.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    cached = _disk_hashes.get(path)
+    if cached and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+        return cached[2]
+
+    try:
+        with open(path, 'rb') as file:
+            data = yaml.safe_load(file)
+    except (OSError, yaml.YAMLError):
+        return None
+    digest = canonical_hash(data)
+    _disk_hashes[path] = (stat.st_mtime_ns, stat.st_size, digest)
+    return digest
+
+
+def atomic_write(path: str, data: Iterable[bytes]):
+    """Grava data (bytes ou blocos de bytes) em path sem nunca deixar o arquivo pela metade.
+
+    O conteúdo vai para um temporário no mesmo diretório, é enviado ao
+    disco com fsync e só então substitui o arquivo com os.replace.
+    """
+    if isinstance(data, (bytes, bytearray)):
+        data = [data]
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as file:
+            for block in data:
+                file.write(block)
+            file.flush()
+            os.fsync(file.fileno())
+        try:
+            # Manter as permissões do arquivo original
+            os.chmod(temp_path, os.stat(path).st_mode & 0o7777)
+        except OSError:
+            pass
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+    # Garantir que a renomeação também chegou ao disco (POSIX)
+    if hasattr(os, 'O_DIRECTORY'):
+        try:
+            dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        except OSError:
+            return
+        try:
+            os.fsync(dir_fd)
+        except OSError:
+            pass
+        finally:
+            os.close(dir_fd)
+
+
+def save_config(path: str, config_data: Dict[str, Any]) -> bool:
+    """Salva a configuração se ela difere do disco. Retorna se o arquivo foi gravado."""
+    digest = canonical_hash(config_data)
+    if file_canonical_hash(path) == digest:
+        return False
+
+    atomic_write(path, (chunk.encode('utf-8') for chunk in chunked(iter_yaml(config_data))))
+    stat = os.stat(path)
+    _disk_hashes[path] = (stat.st_mtime_ns, stat.st_size, digest)
+    return True
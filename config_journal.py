@@ -0,0 +1,144 @@
+"""
+Módulo com o diário (journal) de alterações para recuperação após falhas.
+
+Cada alteração da configuração é anexada como uma linha JSON compacta ao
+arquivo "<config>.journal". As linhas ficam em memória e são gravadas (com
+fsync) em lote por um temporizador, não a cada edição. A primeira linha
+guarda o hash do arquivo salvo sobre o qual as operações se aplicam; ao
+salvar, o diário é compactado de volta a apenas esse cabeçalho.
+"""
+
+import hashlib
+import json
+import os
+from typing import Callable, List, Optional, Tuple
+
+JOURNAL_SUFFIX = ".journal"
+JOURNAL_VERSION = 1
+
+# Intervalo entre gravações do diário (ms)
+DEFAULT_FLUSH_INTERVAL = 1000
+
+
+def journal_path(config_path: str) -> str:
+    """Caminho do diário de um arquivo de configuração."""
+    return config_path + JOURNAL_SUFFIX
+
+
+def content_hash(data: bytes) -> str:
+    """Hash do conteúdo do arquivo salvo."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def encode_operation(operation: tuple) -> str:
+    """Codifica uma operação como uma linha JSON compacta."""
+    kind, path = operation[0], list(operation[1])
+    record = ["s", path, operation[2]] if kind == 'set' else ["d", path]
+    return json.dumps(record, ensure_ascii=False, separators=(',', ':'), default=str)
+
+
+def decode_operation(line: str) -> tuple:
+    """Decodifica uma linha do diário."""
+    record = json.loads(line)
+    if record[0] == "s":
+        return ('set', tuple(record[1]), record[2])
+    if record[0] == "d":
+        return ('del', tuple(record[1]))
+    raise ValueError(f"Operação desconhecida: {record[0]!r}")
+
+
+def read_journal(path: str) -> Tuple[Optional[str], List[tuple]]:
+    """Lê o diário. Retorna (hash base, operações).
+
+    Uma última linha incompleta (falha no meio da gravação) é ignorada.
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as file:
+            lines = file.read().splitlines()
+    except OSError:
+        return None, []
+
+    try:
+        header = json.loads(lines[0])
+        base_hash = header['base']
+    except (IndexError, ValueError, KeyError, TypeError):
+        return None, []
+
+    operations = []
+    for line in lines[1:]:
+        try:
+            operations.append(decode_operation(line))
+        except (ValueError, IndexError, TypeError):
+            break
+    return base_hash, operations
+
+
+class ChangeJournal:
+    """Diário de alterações com gravação em lote.
+
+    schedule(delay_ms, callback) agenda a próxima gravação (root.after no
+    painel); sem ele, cada append é gravado imediatamente.
+    """
+
+    def __init__(self, schedule: Optional[Callable] = None,
+                 flush_interval: int = DEFAULT_FLUSH_INTERVAL):
+        self.schedule = schedule
+        self.flush_interval = flush_interval
+        self.path: Optional[str] = None
+        self.pending: List[str] = []
+        self.flush_scheduled = False
+        self.records_written = 0
+
+    def start(self, config_path: str, base_hash: str, keep_existing: bool = False) -> bool:
+        """Começa um diário sobre o arquivo salvo com hash base_hash.
+
+        Sem keep_existing o diário é truncado (compactado) para o cabeçalho.
+        Retorna False (diário desativado) se o arquivo não puder ser escrito.
+        """
+        self.path = journal_path(config_path)
+        self.pending = []
+        if keep_existing and os.path.exists(self.path):
+            return True
+        header = json.dumps({'version': JOURNAL_VERSION, 'base': base_hash})
+        try:
+            self._write(header + "\n", mode='w')
+        except OSError:
+            self.path = None
+            return False
+        return True
+
+    def stop(self):
+        """Grava o que estiver pendente e deixa de registrar."""
+        self.flush()
+        self.path = None
+
+    def append(self, operations: List[tuple]):
+        """Enfileira operações; a gravação acontece no próximo flush."""
+        if not self.path or not operations:
+            return
+        self.pending.extend(encode_operation(operation) for operation in operations)
+        if self.schedule is None:
+            self.flush()
+        elif not self.flush_scheduled:
+            self.flush_scheduled = True
+            self.schedule(self.flush_interval, self.flush)
+
+    def flush(self):
+        """Grava as operações pendentes e força a ida ao disco."""
+        self.flush_scheduled = False
+        if not self.path or not self.pending:
+            return
+        lines, self.pending = self.pending, []
+        try:
+            self._write("".join(line + "\n" for line in lines), mode='a')
+        except OSError:
+            # Manter as linhas para a próxima tentativa
+            self.pending = lines + self.pending
+            return
+        self.records_written += len(lines)
+
+    def _write(self, text: str, mode: str):
+        with open(self.path, mode, encoding='utf-8') as file:
+            file.write(text)
+            file.flush()
+            os.fsync(file.fileno())
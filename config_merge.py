@@ -0,0 +1,125 @@
+"""
+Módulo para mesclar (three-way merge) alterações do painel e do disco.
+
+A mesclagem trabalha sobre as árvores congeladas do config_history: a base
+(última versão carregada ou salva), a nossa (memória do painel) e a deles
+(o arquivo no disco, congelado contra a base). Como as partes inalteradas
+são os mesmos objetos nas três árvores, um teste de identidade basta para
+saber que um lado não mexeu em um ramo, e cada nó é visitado no máximo uma
+vez: o tempo cresce linearmente com o tamanho da configuração.
+"""
+
+from typing import Any, Dict, List, NamedTuple, Tuple
+
+from config_history import FrozenMap, thaw
+
+MISSING = object()
+
+
+class MergeConflict(NamedTuple):
+    """Chave alterada de formas diferentes nos dois lados."""
+    path: Tuple
+    base: Any
+    ours: Any
+    theirs: Any
+
+
+def describe_path(path: Tuple) -> str:
+    """Caminho legível de uma chave (ex.: widgets.clock.options.label)."""
+    return ".".join(str(key) for key in path) or "(raiz)"
+
+
+def merge_trees(base: Any, ours: Any, theirs: Any) -> Tuple[Any, List[MergeConflict]]:
+    """Mescla as árvores congeladas. Retorna (árvore mesclada, conflitos).
+
+    Alterações em chaves diferentes são combinadas; listas de valores
+    simples (como as seções de widgets das barras) são mescladas item a
+    item. Em um conflito a árvore mesclada mantém o nosso valor.
+    """
+    conflicts: List[MergeConflict] = []
+    merged = _merge(base, ours, theirs, (), conflicts)
+    return merged, conflicts
+
+
+def _merge(base: Any, ours: Any, theirs: Any, path: Tuple, conflicts: List[MergeConflict]) -> Any:
+    if ours is theirs or theirs is base:
+        return ours
+    if ours is base:
+        return theirs
+
+    if isinstance(ours, FrozenMap) and isinstance(theirs, FrozenMap):
+        return _merge_maps(base if isinstance(base, FrozenMap) else None, ours, theirs, path, conflicts)
+    if type(ours) is tuple and type(theirs) is tuple:
+        merged = _merge_lists(base if type(base) is tuple else (), ours, theirs)
+        if merged is not None:
+            return merged
+    elif not isinstance(ours, (FrozenMap, tuple)) and ours is not MISSING and type(ours) is type(theirs) \
+            and ours == theirs:
+        return ours  # Mesma alteração dos dois lados
+
+    conflicts.append(MergeConflict(path, _thaw(base), _thaw(ours), _thaw(theirs)))
+    return ours
+
+
+def _merge_maps(base, ours: FrozenMap, theirs: FrozenMap, path: Tuple,
+                conflicts: List[MergeConflict]) -> Any:
+    base_items = base.items if base is not None else {}
+    items: Dict[Any, Any] = {}
+
+    # Nossa ordem de chaves, seguida das chaves novas do disco
+    keys = list(ours.items)
+    keys.extend(key for key in theirs.items if key not in ours.items)
+    for key in keys:
+        merged = _merge(base_items.get(key, MISSING), ours.items.get(key, MISSING),
+                        theirs.items.get(key, MISSING), path + (key,), conflicts)
+        if merged is not MISSING:
+            items[key] = merged
+    return FrozenMap(items)
+
+
+def _merge_lists(base: tuple, ours: tuple, theirs: tuple):
+    """Mescla listas de valores simples por conjuntos. None se não for possível.
+
+    A ordem vem do lado que reordenou os itens mantidos pelos dois (a
+    ordem dos widgets define o layout); se os dois reordenaram de formas
+    diferentes, é um conflito.
+    """
+    try:
+        base_set, ours_set, theirs_set = set(base), set(ours), set(theirs)
+    except TypeError:
+        return None  # Itens não hasheáveis (dicionários): tratar como conflito
+
+    removed = (base_set - ours_set) | (base_set - theirs_set)
+    kept = base_set - removed
+    base_order = [item for item in base if item in kept]
+    ours_order = [item for item in ours if item in kept]
+    theirs_order = [item for item in theirs if item in kept]
+    if ours_order != base_order and theirs_order != base_order and ours_order != theirs_order:
+        return None  # Reordenado dos dois lados
+
+    # O lado que reordenou dá a ordem; os itens novos do outro vão ao fim
+    first, second = (theirs, ours) if theirs_order != base_order else (ours, theirs)
+    merged = [item for item in first if item not in removed]
+    present = set(merged)
+    for item in second:
+        if item not in base_set and item not in present:
+            merged.append(item)
+            present.add(item)
+    return tuple(merged)
+
+
+def _thaw(value: Any) -> Any:
+    return value if value is MISSING else thaw(value)
+
+
+def resolution_operations(conflicts: List[MergeConflict], use_theirs: List[bool]) -> List[tuple]:
+    """Operações (formato de diff_trees) que aplicam as escolhas pelo disco."""
+    operations = []
+    for conflict, theirs in zip(conflicts, use_theirs):
+        if not theirs:
+            continue
+        if conflict.theirs is MISSING:
+            operations.append(('del', conflict.path))
+        else:
+            operations.append(('set', conflict.path, conflict.theirs))
+    return operations
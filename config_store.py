@@ -0,0 +1,308 @@
+"""
+Módulo com o modelo da configuração do painel, sem interface.
+
+O ConfigStore é dono da configuração e do BarIndex, e toda alteração passa
+pelos seus métodos. Cada alteração gera um ChangeEvent com os caminhos
+alterados (por exemplo ('widgets', 'cpu', 'enabled')), entregue apenas aos
+inscritos em um prefixo desses caminhos: a árvore de widgets não precisa
+ser refeita quando um estilo muda, e o preview não é redesenhado quando só
+as opções do sistema mudam.
+"""
+
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from config_history import apply_operations
+from config_index import BarIndex
+from widget_ops import (NameAllocator, duplicate_widgets, existing_widgets, move_widgets,
+                        remove_widgets, toggle_widgets)
+
+_MISSING = object()
+
+
+class ChangeEvent(NamedTuple):
+    """Alteração da configuração.
+
+    paths são os caminhos alterados; () significa a configuração inteira.
+    record indica se a alteração deve entrar no histórico de desfazer, e
+    coalesce se ela pode se juntar à última entrada de mesmo rótulo.
+    """
+    label: str
+    paths: Tuple[Tuple, ...]
+    record: bool
+    coalesce: bool = False
+
+
+def paths_overlap(a: Tuple, b: Tuple) -> bool:
+    """Se um dos caminhos contém o outro (um é prefixo do outro)."""
+    size = min(len(a), len(b))
+    return a[:size] == b[:size]
+
+
+def normalize_paths(paths: Iterable[Tuple]) -> Tuple[Tuple, ...]:
+    """Remove caminhos repetidos e os já cobertos por um prefixo da lista."""
+    kept = set()
+    result = []
+    for path in sorted(set(map(tuple, paths)), key=len):
+        if any(path[:size] in kept for size in range(len(path))):
+            continue
+        kept.add(path)
+        result.append(path)
+    return tuple(result)
+
+
+def operation_paths(operations: Iterable[tuple]) -> List[Tuple]:
+    """Caminhos alterados por operações de diff_trees."""
+    return [tuple(operation[1]) for operation in operations]
+
+
+def own_tree(value: Any) -> Any:
+    """Cópia dos dicionários e listas de value, sem nenhum nó compartilhado.
+
+    Diferente de copy.deepcopy, nós repetidos (como âncoras do YAML) viram
+    cópias separadas: alterar um caminho nunca altera outro.
+    """
+    if isinstance(value, dict):
+        return {key: own_tree(child) for key, child in value.items()}
+    if isinstance(value, list):
+        return [own_tree(child) for child in value]
+    return value
+
+
+def _changes_placements(path: Tuple) -> bool:
+    """Se alterar o caminho pode mudar as barras ou as posições dos widgets."""
+    if not path:
+        return True
+    if path[0] != 'bars':
+        return False
+    return len(path) <= 2 or path[2] == 'widgets'
+
+
+class ConfigStore:
+    """Dono da configuração, com alterações tipadas e eventos por caminho.
+
+    Os inscritos recebem o evento só com os caminhos que se sobrepõem ao
+    prefixo em que se inscreveram. Alterações dentro de transaction() são
+    agrupadas em um único evento ao final da transação mais externa.
+
+    Os valores recebidos são copiados (own_tree): a árvore é só do
+    ConfigStore, e cada caminho alterado é o único notificado.
+    """
+
+    def __init__(self, config_data: Optional[Dict[str, Any]] = None):
+        self.data: Dict[str, Any] = own_tree(config_data) if config_data is not None else {}
+        self.index = BarIndex(self.data)
+        self.subscribers: Dict[int, Tuple[Tuple, Callable[[ChangeEvent], None]]] = {}
+        self.next_token = 0
+        self.depth = 0
+        self.pending: List[Tuple] = []
+        self.pending_label = ""
+        self.pending_record = True
+        self.events = 0
+        self.notifications = 0
+
+    # Inscrições
+
+    def subscribe(self, prefix: Tuple, callback: Callable[[ChangeEvent], None]) -> int:
+        """Inscreve callback nas alterações sob prefix. Retorna o identificador."""
+        self.next_token += 1
+        self.subscribers[self.next_token] = (tuple(prefix), callback)
+        return self.next_token
+
+    def unsubscribe(self, token: int):
+        """Cancela uma inscrição."""
+        self.subscribers.pop(token, None)
+
+    @contextmanager
+    def transaction(self, label: str, record: bool = True) -> Iterator["ConfigStore"]:
+        """Agrupa as alterações em um único evento (com o rótulo da mais externa).
+
+        As alterações feitas antes de uma exceção são notificadas mesmo assim.
+        """
+        if self.depth == 0:
+            self.pending = []
+            self.pending_label = label
+            self.pending_record = record
+        self.depth += 1
+        try:
+            yield self
+        finally:
+            self.depth -= 1
+            if self.depth == 0 and self.pending:
+                paths, self.pending = self.pending, []
+                self._emit(ChangeEvent(self.pending_label, normalize_paths(paths), self.pending_record))
+
+    def _changed(self, paths: Iterable[Tuple], label: str, record: bool = True, coalesce: bool = False):
+        if self.depth:
+            self.pending.extend(paths)
+            return
+        paths = normalize_paths(paths)
+        if paths:
+            self._emit(ChangeEvent(label, paths, record, coalesce))
+
+    def _emit(self, event: ChangeEvent):
+        self.events += 1
+        for prefix, callback in list(self.subscribers.values()):
+            paths = tuple(path for path in event.paths if paths_overlap(prefix, path))
+            if paths:
+                self.notifications += 1
+                callback(event._replace(paths=paths))
+
+    # Leitura
+
+    def get(self, path: Tuple, default: Any = None) -> Any:
+        """Valor em path, ou default se algum nível não existir."""
+        value = self.data
+        for key in path:
+            if not isinstance(value, dict) or key not in value:
+                return default
+            value = value[key]
+        return value
+
+    # Alterações genéricas
+
+    def replace(self, config_data: Dict[str, Any], label: str = "", record: bool = False,
+                paths: Optional[Iterable[Tuple]] = None):
+        """Troca a configuração inteira (carregar, desfazer, alteração externa).
+
+        paths, se conhecidos (de diff_trees), limitam o que é notificado.
+        """
+        self.data = own_tree(config_data)
+        self.index.rebuild(self.data)
+        self._changed([()] if paths is None else paths, label, record)
+
+    def set(self, path: Tuple, value: Any, label: str = "", coalesce: bool = False) -> bool:
+        """Define o valor em path, criando os níveis. Retorna False se já era igual.
+
+        coalesce junta alterações seguidas de mesmo rótulo em uma única
+        entrada do histórico (fora de transações).
+        """
+        path = tuple(path)
+        if not path:
+            self.replace(value, label, record=True)
+            return True
+        parent = self.data
+        for key in path[:-1]:
+            child = parent.get(key)
+            if not isinstance(child, dict):
+                child = parent[key] = {}
+            parent = child
+        if parent.get(path[-1], _MISSING) == value:
+            return False
+        value = own_tree(value)
+        new_bar = path[0] == 'bars' and len(path) > 1 and path[1] not in self.index.bars
+        parent[path[-1]] = value
+        if new_bar or _changes_placements(path):
+            self.index.rebuild(self.data)
+        # Uma barra criada pelo caminho é notificada como barra nova
+        self._changed([path[:2] if new_bar else path], label, coalesce=coalesce)
+        return True
+
+    def delete(self, path: Tuple, label: str = "") -> bool:
+        """Remove o valor em path. Retorna False se ele não existia."""
+        path = tuple(path)
+        parent = self.get(path[:-1])
+        if not path or not isinstance(parent, dict) or path[-1] not in parent:
+            return False
+        del parent[path[-1]]
+        if _changes_placements(path):
+            self.index.rebuild(self.data)
+        self._changed([path], label)
+        return True
+
+    def update(self, path: Tuple, values: Dict[str, Any], label: str = "") -> List[str]:
+        """Define várias chaves sob path. Retorna as chaves que mudaram."""
+        with self.transaction(label):
+            return [key for key, value in values.items() if self.set(tuple(path) + (key,), value)]
+
+    def apply_operations(self, operations: List[tuple], label: str = "", record: bool = True):
+        """Aplica operações de diff_trees (por exemplo, do diário ou de uma mesclagem)."""
+        paths = operation_paths(operations)
+        if not paths:
+            return
+        self.data = apply_operations(self.data, [operation[:2] + tuple(map(own_tree, operation[2:]))
+                                                 for operation in operations])
+        if any(_changes_placements(path) for path in paths):
+            self.index.rebuild(self.data)
+        self._changed(paths, label, record)
+
+    # Widgets
+
+    def _placement_paths(self, widget_names: Iterable[str]) -> List[Tuple]:
+        return [('bars', bar_name, 'widgets')
+                for bar_name in {bar for name in widget_names for bar in self.index.bars_of(name)}]
+
+    def add_widget(self, widget_name: str, widget_config: Dict[str, Any], bar_name: str,
+                   section: str, label: str = "") -> None:
+        """Adiciona um widget ao fim de uma seção da barra."""
+        widgets = self.data.setdefault('widgets', {})
+        if widget_name in widgets:
+            raise ValueError(f"Widget '{widget_name}' já existe.")
+        new_bar = bar_name not in self.index.bars
+        widgets[widget_name] = own_tree(widget_config)
+        self.index.place(widget_name, bar_name, section)
+        bar_path = ('bars', bar_name) if new_bar else ('bars', bar_name, 'widgets')
+        self._changed([('widgets', widget_name), bar_path], label or f"Adicionar widget '{widget_name}'")
+
+    def replace_widget(self, widget_name: str, widget_config: Dict[str, Any], label: str = ""):
+        """Substitui a configuração inteira de um widget existente."""
+        if widget_name not in (self.data.get('widgets') or {}):
+            raise KeyError(f"Widget '{widget_name}' não encontrado")
+        self.data['widgets'][widget_name] = own_tree(widget_config)
+        self._changed([('widgets', widget_name)], label or f"Editar widget '{widget_name}'")
+
+    def remove_widgets(self, widget_names: Iterable[str], label: str = "") -> List[str]:
+        """Remove os widgets da configuração e de todas as barras."""
+        names = existing_widgets(self.data, widget_names)
+        bar_paths = self._placement_paths(names)
+        removed = remove_widgets(self.data, self.index, names)
+        self._changed([('widgets', name) for name in removed] + bar_paths,
+                      label or f"Remover {len(removed)} widget(s)")
+        return removed
+
+    def toggle_widgets(self, widget_names: Iterable[str], label: str = "") -> bool:
+        """Ativa ou desativa os widgets em conjunto. Retorna o novo estado."""
+        names = existing_widgets(self.data, widget_names)
+        enabled = toggle_widgets(self.data, names)
+        self._changed([('widgets', name, 'enabled') for name in names],
+                      label or f"Ativar/desativar {len(names)} widget(s)")
+        return enabled
+
+    def duplicate_widgets(self, widget_names: Iterable[str], allocator: Optional[NameAllocator] = None,
+                          label: str = "") -> List[str]:
+        """Duplica os widgets nas mesmas barras e seções. Retorna os novos nomes."""
+        names = existing_widgets(self.data, widget_names)
+        new_names = duplicate_widgets(self.data, self.index, names, allocator)
+        self._changed([('widgets', name) for name in new_names] + self._placement_paths(new_names),
+                      label or f"Duplicar {len(new_names)} widget(s)")
+        return new_names
+
+    def move_widgets(self, widget_names: Iterable[str], bar_name: str, section: str,
+                     label: str = "") -> List[str]:
+        """Move os widgets para uma seção da barra, mantendo a ordem dada."""
+        new_bar = bar_name not in self.index.bars
+        moved = move_widgets(self.data, self.index, widget_names, bar_name, section)
+        if moved:
+            bar_path = ('bars', bar_name) if new_bar else ('bars', bar_name, 'widgets')
+            self._changed([bar_path], label or f"Mover {len(moved)} widget(s) para '{section}'")
+        return moved
+
+    # Barras
+
+    def add_bar(self, bar_name: str, template: Optional[Dict[str, Any]] = None, label: str = ""):
+        """Cria uma barra com as opções (não os widgets) de template."""
+        if bar_name in self.index.bars:
+            raise ValueError(f"Barra '{bar_name}' já existe.")
+        self.index.add_bar(bar_name, template)
+        bar_config = self.data['bars'][bar_name]
+        if 'class_name' in bar_config:
+            bar_config['class_name'] = bar_name
+        self._changed([('bars', bar_name)], label or f"Criar barra '{bar_name}'")
+
+    def remove_bar(self, bar_name: str, label: str = "") -> bool:
+        """Remove uma barra. Retorna False se ela não existia."""
+        if bar_name not in self.index.bars:
+            return False
+        self.index.remove_bar(bar_name)
+        self._changed([('bars', bar_name)], label or f"Remover barra '{bar_name}'")
+        return True
@@ -0,0 +1,179 @@
+"""
+Módulo para observar alterações externas no arquivo de configuração.
+
+O FileWatcher roda em uma thread própria: no Linux usa inotify (via
+ctypes) no diretório do arquivo, para também perceber substituições
+atômicas; nos demais sistemas, ou se o inotify falhar, compara mtime,
+tamanho e inode periodicamente. Rajadas de gravações são agrupadas em um
+único aviso, e o arquivo é lido e interpretado ainda na thread, antes de
+o resultado ir para a fila consumida pela interface.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import queue
+import select
+import struct
+import sys
+import threading
+import time
+from typing import Any, Optional, Tuple
+
+import yaml
+
+# Eventos do inotify que indicam conteúdo novo no arquivo
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_CLOEXEC = 0o2000000
+IN_NONBLOCK = 0o4000
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+EVENT_HEADER = struct.Struct("iIII")
+
+# Espera após a última gravação antes de recarregar (s) e intervalo do polling (s)
+DEFAULT_DEBOUNCE = 0.3
+DEFAULT_POLL_INTERVAL = 1.0
+
+
+def file_signature(path: str) -> Optional[Tuple[int, int, int]]:
+    """(mtime_ns, tamanho, inode) do arquivo, ou None se ele não existir."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+
+class InotifySource:
+    """Eventos do inotify para um arquivo (observando o diretório)."""
+
+    def __init__(self, path: str):
+        if not sys.platform.startswith('linux'):
+            raise OSError("inotify só está disponível no Linux")
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or None, use_errno=True)
+        self.name = os.path.basename(path).encode()
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 falhou")
+        directory = os.path.dirname(os.path.abspath(path)).encode()
+        if libc.inotify_add_watch(self.fd, directory, WATCH_MASK) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, "inotify_add_watch falhou")
+
+    def wait(self, timeout: float) -> bool:
+        """Espera até timeout segundos. Retorna se o arquivo foi tocado."""
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return False
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return False
+
+        touched = False
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(data):
+            _, _, _, length = EVENT_HEADER.unpack_from(data, offset)
+            start = offset + EVENT_HEADER.size
+            name = data[start:start + length].rstrip(b'\0')
+            touched = touched or name == self.name
+            offset = start + length
+        return touched
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingSource:
+    """Comparação periódica de mtime/tamanho/inode (alternativa ao inotify)."""
+
+    def __init__(self, path: str, interval: float = DEFAULT_POLL_INTERVAL):
+        self.path = path
+        self.interval = interval
+        self.signature = file_signature(path)
+
+    def wait(self, timeout: float) -> bool:
+        time.sleep(min(timeout, self.interval))
+        signature = file_signature(self.path)
+        if signature == self.signature:
+            return False
+        self.signature = signature
+        return True
+
+    def close(self):
+        pass
+
+
+class FileWatcher:
+    """Observa um arquivo e entrega o conteúdo novo em uma fila.
+
+    Cada item da fila é (bytes lidos, dados interpretados, erro). O erro é
+    a mensagem de um YAML inválido (por exemplo, salvo pela metade), e
+    nesse caso os dados são None.
+    """
+
+    def __init__(self, path: str, debounce: float = DEFAULT_DEBOUNCE,
+                 poll_interval: float = DEFAULT_POLL_INTERVAL, use_inotify: bool = True):
+        self.path = path
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.use_inotify = use_inotify
+        self.changes: "queue.Queue[Tuple[bytes, Any, Optional[str]]]" = queue.Queue()
+        self.backend = None
+        self.stop_event = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Inicia a thread de observação."""
+        source = None
+        if self.use_inotify:
+            try:
+                source = InotifySource(self.path)
+            except (OSError, AttributeError):
+                source = None
+        if source is None:
+            source = PollingSource(self.path, self.poll_interval)
+        self.backend = 'inotify' if isinstance(source, InotifySource) else 'polling'
+
+        self.thread = threading.Thread(target=self._run, args=(source,), daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Encerra a thread (espera no máximo um intervalo)."""
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join(timeout=self.poll_interval + 1)
+            self.thread = None
+
+    def _run(self, source):
+        last_event = None
+        try:
+            while not self.stop_event.is_set():
+                if last_event is None:
+                    timeout = self.poll_interval
+                else:
+                    timeout = max(0.0, last_event + self.debounce - time.monotonic())
+                if source.wait(timeout):
+                    last_event = time.monotonic()
+                elif last_event is not None and time.monotonic() - last_event >= self.debounce:
+                    # Rajada terminou: um único recarregamento
+                    last_event = None
+                    self._emit()
+        finally:
+            source.close()
+
+    def _emit(self):
+        try:
+            with open(self.path, 'rb') as file:
+                raw = file.read()
+        except OSError:
+            return  # Arquivo removido; espera ser recriado
+        try:
+            self.changes.put((raw, yaml.safe_load(raw) or {}, None))
+        except yaml.YAMLError as e:
+            self.changes.put((raw, None, str(e)))
@@ -0,0 +1,106 @@
+"""
+Módulo para gerar uma folha de contatos com variações do preview da barra.
+
+Cada combinação de largura de tela e tema é renderizada como um bloco
+independente em um pool de processos, e os blocos são montados em uma
+única imagem em grade com legendas.
+"""
+
+import os
+import json
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Any, List, Optional, Sequence, Tuple
+
+from bar_renderer import PixelBuffer, render_bar, GLYPH_HEIGHT
+
+# Larguras comuns de monitores
+DEFAULT_SCREEN_WIDTHS = (1280, 1920, 2560, 3840)
+
+SHEET_BACKGROUND = (40, 40, 40)
+CAPTION_COLOR = (220, 220, 220)
+SHEET_MARGIN = 10
+CAPTION_HEIGHT = GLYPH_HEIGHT + 6
+
+
+def render_tile(job: Tuple[Dict[str, Any], int, str, Optional[Dict[str, Any]]]) -> Tuple[int, int, bytes]:
+    """Renderiza um bloco da folha (executado nos processos do pool)."""
+    config_data, width, bar_name, theme = job
+    image = render_bar(config_data, width, bar_name, theme)
+    return image.width, image.height, image.to_bytes()
+
+
+def render_tiles(config_data: Dict[str, Any], jobs: List[Tuple[int, Optional[Dict[str, Any]]]],
+                 bar_name: str = 'yasb-bar', max_workers: Optional[int] = None,
+                 progress: Optional[Callable[[], None]] = None) -> List[Tuple[int, int, bytes]]:
+    """Renderiza os blocos, em paralelo quando houver mais de um.
+
+    progress, se dado, é chamado a cada bloco pronto.
+    """
+    payload = [(config_data, width, bar_name, theme) for width, theme in jobs]
+    if max_workers is None:
+        max_workers = min(len(payload), os.cpu_count() or 1)
+    if len(payload) <= 1 or max_workers <= 1:
+        return [_counted(render_tile(job), progress) for job in payload]
+
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        # Agrupar os blocos para reduzir o custo de comunicação entre processos
+        chunksize = max(1, len(payload) // (max_workers * 4))
+        return [_counted(tile, progress) for tile in pool.map(render_tile, payload, chunksize=chunksize)]
+
+
+def _counted(tile: Tuple[int, int, bytes], progress: Optional[Callable[[], None]]) -> Tuple[int, int, bytes]:
+    if progress is not None:
+        progress()
+    return tile
+
+
+def build_contact_sheet(config_data: Dict[str, Any], widths: Sequence[int] = DEFAULT_SCREEN_WIDTHS,
+                        themes: Optional[Dict[str, Optional[Dict[str, Any]]]] = None,
+                        bar_name: str = 'yasb-bar', max_workers: Optional[int] = None,
+                        progress: Optional[Callable[[], None]] = None) -> PixelBuffer:
+    """Monta a folha de contatos: uma linha por tema, uma coluna por largura.
+
+    themes mapeia o nome exibido na legenda para os valores de estilo
+    que sobrescrevem styles.default (None usa o estilo da configuração).
+    progress é chamado a cada bloco renderizado.
+    """
+    if not themes:
+        themes = {"Atual": None}
+    widths = [int(width) for width in widths if int(width) > 0]
+    if not widths:
+        raise ValueError("Nenhuma largura de tela informada")
+
+    jobs = [(width, theme) for theme in themes.values() for width in widths]
+    tiles = render_tiles(config_data, jobs, bar_name, max_workers, progress)
+
+    tile_height = max(height for _, height, _ in tiles)
+    cell_height = CAPTION_HEIGHT + tile_height + SHEET_MARGIN
+    sheet_width = SHEET_MARGIN + sum(width + SHEET_MARGIN for width in widths)
+    sheet_height = SHEET_MARGIN + cell_height * len(themes)
+
+    sheet = PixelBuffer(sheet_width, sheet_height, SHEET_BACKGROUND)
+    tile_index = 0
+    for row, theme_name in enumerate(themes):
+        y = SHEET_MARGIN + row * cell_height
+        x = SHEET_MARGIN
+        for width in widths:
+            tile_width, height, data = tiles[tile_index]
+            tile_index += 1
+            sheet.draw_text(x, y, f"{theme_name} - {width}px", CAPTION_COLOR)
+            sheet.blit_rows(data, tile_width, height, x, y + CAPTION_HEIGHT)
+            x += width + SHEET_MARGIN
+
+    return sheet
+
+
+def load_theme_files(paths: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+    """Carrega temas JSON salvos pelo painel, nomeados pelo arquivo.
+
+    Cores inválidas são ignoradas na renderização (usa-se o padrão).
+    """
+    themes = {}
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as file:
+            theme = json.load(file)
+        themes[os.path.splitext(os.path.basename(path))[0]] = theme
+    return themes
@@ -0,0 +1,181 @@
+"""
+Módulo para compilar e renderizar os rótulos (label/label_alt) dos widgets.
+
+Os rótulos do YASB misturam campos no formato strftime, como {%H:%M:%S},
+com campos de dados do widget, como {cpu_percent}. Cada rótulo é analisado
+uma única vez e convertido em um CompiledLabel guardado em cache, de forma
+que renderizar milhares de rótulos por quadro custe apenas uma chamada a
+str.format por rótulo.
+"""
+
+import re
+import time
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Set, Tuple
+
+FIELD_PATTERN = re.compile(r"\{([^{}]*)\}")
+
+# Opções dos widgets que contêm rótulos
+LABEL_OPTIONS = ("label", "label_alt")
+
+# Erro de uma seção widgets que não é um mapeamento (por exemplo, uma lista)
+WIDGETS_NOT_MAPPING = "A seção 'widgets' deve ser um mapeamento de nome para widget"
+
+# Campos de dados aceitos por tipo de widget (None aceita qualquer campo)
+LABEL_FIELDS: Dict[str, Optional[Set[str]]] = {
+    "yasb.clock.ClockWidget": set(),
+    "yasb.cpu.CpuWidget": {"cpu_percent", "cpu_freq", "cpu_cores"},
+    "yasb.memory.MemoryWidget": {"memory_percent", "memory_used", "memory_free", "memory_total"},
+    "yasb.battery.BatteryWidget": {"battery_percent", "time_remaining", "is_charging"},
+    "yasb.volume.VolumeWidget": {"volume_percent", "is_muted"},
+    "yasb.network.NetworkWidget": {"network_status", "download_speed", "upload_speed", "interface"},
+    "yasb.active_window.ActiveWindowWidget": {"win_title", "win_class", "process_name"},
+    "yasb.weather.WeatherWidget": {"temperature", "condition", "humidity", "location"},
+    "yasb.disk.DiskWidget": {"disk_percent", "disk_used", "disk_free", "disk_total"},
+    "yasb.custom.CustomWidget": None
+}
+
+# Diretivas strftime aceitas nos campos de data/hora
+STRFTIME_DIRECTIVES = set("aAbBcdfHIjmMpSUwWxXyYzZ%")
+
+
+class CompiledLabel:
+    """Rótulo pré-compilado, pronto para ser renderizado."""
+
+    __slots__ = ('template', 'fields', 'time_fields', 'errors', '_format', '_slots')
+
+    def __init__(self, template: str):
+        self.template = template
+        self.errors: List[str] = []
+        fields: List[str] = []
+        time_fields: List[str] = []
+        parts: List[str] = []
+        slots: List[Tuple[bool, str]] = []
+
+        position = 0
+        for match in FIELD_PATTERN.finditer(template):
+            parts.append(self._escape_literal(template[position:match.start()]))
+            field = match.group(1)
+            if field.startswith('%'):
+                self._check_strftime(field)
+                if field not in time_fields:
+                    time_fields.append(field)
+                slots.append((True, field))
+            else:
+                if not field.strip():
+                    self.errors.append("Campo vazio '{}'")
+                elif field not in fields:
+                    fields.append(field)
+                slots.append((False, field))
+            parts.append("{%d}" % (len(slots) - 1))
+            position = match.end()
+        parts.append(self._escape_literal(template[position:]))
+
+        self.fields = tuple(fields)
+        self.time_fields = tuple(time_fields)
+        self._format = "".join(parts)
+        self._slots = tuple(slots)
+
+    def _escape_literal(self, text: str) -> str:
+        """Escapa chaves soltas do texto fixo para str.format."""
+        if '{' in text or '}' in text:
+            self.errors.append(f"Chave sem par em '{text.strip()}'")
+        return text.replace('{', '{{').replace('}', '}}')
+
+    def _check_strftime(self, field: str):
+        """Valida as diretivas de um campo strftime."""
+        index = 0
+        while index < len(field):
+            if field[index] == '%':
+                directive = field[index + 1:index + 2]
+                if directive == '-' or directive == '#':
+                    # Modificadores de plataforma, como %-d ou %#d
+                    directive = field[index + 2:index + 3]
+                    index += 1
+                if directive not in STRFTIME_DIRECTIVES:
+                    self.errors.append(f"Diretiva de data inválida '%{directive}' em '{{{field}}}'")
+                index += 2
+            else:
+                index += 1
+
+    @property
+    def dynamic(self) -> bool:
+        """Indica se o rótulo muda com o tempo ou com os dados."""
+        return bool(self._slots)
+
+    def render(self, values: Dict[str, Any], now: Optional[time.struct_time] = None,
+               time_cache: Optional[Dict[str, str]] = None) -> str:
+        """Renderiza o rótulo.
+
+        time_cache permite compartilhar os campos strftime já formatados entre
+        todos os rótulos de um mesmo quadro do preview.
+        """
+        if not self._slots:
+            return self.template
+        if now is None:
+            now = time.localtime()
+        if time_cache is None:
+            time_cache = {}
+
+        args = []
+        for is_time, field in self._slots:
+            if is_time:
+                text = time_cache.get(field)
+                if text is None:
+                    text = time_cache[field] = time.strftime(field, now)
+                args.append(text)
+            elif field in values:
+                args.append(values[field])
+            else:
+                # Campos sem valor continuam visíveis no rótulo
+                args.append("{" + field + "}")
+        return self._format.format(*args)
+
+    def validate(self, widget_type: Optional[str] = None) -> List[str]:
+        """Retorna os erros do rótulo para o tipo de widget informado."""
+        errors = list(self.errors)
+        if widget_type in LABEL_FIELDS and LABEL_FIELDS[widget_type] is not None:
+            allowed = LABEL_FIELDS[widget_type]
+            for field in self.fields:
+                if field not in allowed:
+                    suggestion = f" (disponíveis: {', '.join(sorted(allowed))})" if allowed else ""
+                    errors.append(f"Campo desconhecido '{{{field}}}'{suggestion}")
+        return errors
+
+
+@lru_cache(maxsize=4096)
+def compile_label(template: str) -> CompiledLabel:
+    """Compila um rótulo, reaproveitando rótulos já compilados."""
+    return CompiledLabel(template)
+
+
+def placeholders(template: str) -> List[str]:
+    """Retorna os campos de dados (não strftime) usados no rótulo."""
+    return list(compile_label(template or "").fields)
+
+
+def render_label(template: str, values: Dict[str, Any], now: Optional[time.struct_time] = None) -> str:
+    """Renderiza um rótulo com os valores informados."""
+    return compile_label(template or "").render(values, now)
+
+
+def validate_label(template: str, widget_type: Optional[str] = None) -> List[str]:
+    """Valida um rótulo contra o esquema do tipo de widget."""
+    return compile_label(template or "").validate(widget_type)
+
+
+def validate_widget_labels(config_data: Dict[str, Any]) -> List[str]:
+    """Valida label/label_alt de todos os widgets da configuração."""
+    widgets = config_data.get('widgets') or {}
+    if not isinstance(widgets, dict):
+        return [WIDGETS_NOT_MAPPING]
+    errors = []
+    for widget_name, widget_config in widgets.items():
+        if not isinstance(widget_config, dict):
+            continue
+        options = widget_config.get('options') or {}
+        for option in LABEL_OPTIONS:
+            if option in options:
+                for error in validate_label(str(options[option]), widget_config.get('type')):
+                    errors.append(f"{widget_name}.{option}: {error}")
+    return errors
@@ -5,23 +5,84 @@ Uma interface gráfica para configurar o YASB (Yet Another Status Bar) no Window
 """
 
 import tkinter as tk
-from tkinter import ttk, messagebox, filedialog, colorchooser
+from tkinter import ttk, messagebox, filedialog, colorchooser, simpledialog
 import yaml
 import os
 import json
+import copy
+import logging
 import subprocess
 import sys
+import threading
+import time
 from pathlib import Path
 from typing import Dict, Any, Optional
 
 # Importar diálogos personalizados
 try:
-    from widget_dialogs import AddWidgetDialog, EditWidgetDialog, StyleEditorDialog
+    from widget_dialogs import (AddWidgetDialog, EditWidgetDialog, StyleEditorDialog, MergeConflictDialog,
+                                ConfigDiffDialog, SnapshotBrowserDialog)
 except ImportError:
     # Fallback se o módulo não estiver disponível
     AddWidgetDialog = None
     EditWidgetDialog = None
     StyleEditorDialog = None
+    MergeConflictDialog = None
+    ConfigDiffDialog = None
+    SnapshotBrowserDialog = None
+
+from bar_renderer import render_bar_png
+from command_profiler import profile_custom_widgets, collect_custom_commands
+from config_history import ConfigHistory, apply_operations, diff_trees, freeze, thaw
+from config_autosave import AutoSaver, BackgroundWriter
+from config_bindings import BindingSet
+from config_checks import validate_config
+from config_diff import diff_configs, summarize
+from config_index import BarIndex, DEFAULT_BAR_NAME
+from config_io import chunked, dump_yaml, iter_yaml, save_config
+from config_store import ConfigStore, operation_paths
+from config_journal import ChangeJournal, content_hash, journal_path, read_journal
+from config_merge import merge_trees, resolution_operations
+from config_watcher import FileWatcher, file_signature
+from contact_sheet import DEFAULT_SCREEN_WIDTHS, build_contact_sheet, load_theme_files
+from label_templates import compile_label
+from preview_canvas import CanvasItemCache, PreviewEntry
+from preview_layout import SECTIONS, TextMeasurer, layout_sections, describe_problems
+from preview_ticker import PreviewTicker, RedrawScheduler, SampleDataProvider, DEFAULT_TICK_INTERVAL
+from snapshot_store import SnapshotStore, snapshot_dir
+from status_queue import StatusQueue
+from tab_refresh import ALL, TabRefresher
+from widget_ops import NameAllocator
+
+logger = logging.getLogger(__name__)
+
+# Temas predefinidos da aba de estilos
+PREDEFINED_THEMES = {
+    "Escuro": {
+        "background_color": "#1e1e1e",
+        "text_color": "#ffffff",
+        "accent_color": "#007acc",
+        "border_color": "#333333"
+    },
+    "Claro": {
+        "background_color": "#ffffff",
+        "text_color": "#000000",
+        "accent_color": "#0078d4",
+        "border_color": "#cccccc"
+    },
+    "Azul": {
+        "background_color": "#0f1419",
+        "text_color": "#e6e6e6",
+        "accent_color": "#00d4ff",
+        "border_color": "#1e3a5f"
+    },
+    "Verde": {
+        "background_color": "#0d1117",
+        "text_color": "#c9d1d9",
+        "accent_color": "#00ff88",
+        "border_color": "#21262d"
+    }
+}
 
 
 class YASBControlPanel:
@@ -38,17 +99,71 @@ class YASBControlPanel:
         self.style.theme_use('clam')
         self.configure_styles()
         
-        # Variáveis de configuração
-        self.config_data = {}
+        # Variáveis de configuração (o ConfigStore é dono dos dados)
+        self.store = ConfigStore()
         self.config_file_path = ""
         self.yasb_path = self.find_yasb_installation()
+        self.bindings = None
+        self.name_allocator = NameAllocator()
+        self.history = ConfigHistory()
+        self.journal = ChangeJournal(self.root.after)
+        self.journal_tree = None
+        self.saved_tree = None
+        self.saved_signature = None
+        self.file_watcher = None
+        self.snapshot_store = None
+        self.writer = BackgroundWriter()
+        self.autosave = AutoSaver(self.root.after, self.root.after_cancel, self.autosave_config)
+        self.autosave_var = tk.BooleanVar(value=False)
+        self.widget_rows = {}
+        
+        # Estado do preview animado
+        self.preview_items = {}
+        self.preview_labels = {}
+        self.preview_rendered = {}
+        self.preview_texts = {}
+        self.preview_widths = {}
+        self.preview_sections = {}
+        self.preview_hidden = []
+        self.preview_frame_title = "Preview da Barra"
+        self.text_measurer = TextMeasurer(self.root)
+        self.preview_size = None
+        self.preview_redraw = RedrawScheduler(self.root.after, self.on_preview_redraw)
+        self.config_info_text = None
+        self.sample_data = SampleDataProvider()
+        self.preview_ticker = PreviewTicker(self.root.after, self.root.after_cancel, self.on_preview_tick)
+        
+        # Abas com atualização pendente (só a visível é atualizada na hora)
+        self.tab_frames = {}
+        self.tab_refresher = TabRefresher(self.visible_tab)
+        
+        # Mensagens de status agrupadas por quadro, com histórico
+        self.status = StatusQueue(self.root.after, self.show_status)
+        self.status_history_list = None
         
         # Configurar a interface
         self.setup_ui()
+        self.subscribe_views()
+        self.bind_controls()
+        
+        # Atalhos de desfazer/refazer
+        self.root.bind('<Control-z>', self.undo)
+        self.root.bind('<Control-y>', self.redo)
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
         
         # Carregar configuração padrão se existir
         self.load_default_config()
     
+    @property
+    def config_data(self) -> Dict[str, Any]:
+        """Configuração atual (altere-a pelos métodos do ConfigStore)."""
+        return self.store.data
+    
+    @property
+    def bar_index(self) -> BarIndex:
+        """Índice de posições dos widgets, mantido pelo ConfigStore."""
+        return self.store.index
+    
     def configure_styles(self):
         """Configura estilos personalizados para a aplicação."""
         # Configurar cores do tema
@@ -95,10 +210,12 @@ class YASBControlPanel:
         self.notebook.grid(row=1, column=0, columnspan=2, sticky=(tk.W, tk.E, tk.N, tk.S), pady=(10, 0))
         
         # Criar as abas
+        self.tab_frames = {}
         self.create_widgets_tab()
         self.create_styles_tab()
         self.create_advanced_tab()
         self.create_preview_tab()
+        self.notebook.bind('<<NotebookTabChanged>>', self.on_tab_changed)
         
         # Barra de status
         self.create_status_bar(main_frame)
@@ -117,14 +234,9 @@ class YASBControlPanel:
                  style='Title.TLabel').pack(anchor=tk.W)
         
         # Status da instalação YASB
-        if self.yasb_path:
-            status_text = f"✅ YASB encontrado em: {self.yasb_path}"
-            style = 'Success.TLabel'
-        else:
-            status_text = "⚠️ YASB não encontrado - Configure o caminho manualmente"
-            style = 'Warning.TLabel'
-        
-        ttk.Label(title_frame, text=status_text, style=style).pack(anchor=tk.W)
+        self.yasb_status_label = ttk.Label(title_frame)
+        self.yasb_status_label.pack(anchor=tk.W)
+        self.update_yasb_status()
         
         # Botões de ação
         buttons_frame = ttk.Frame(header_frame)
@@ -137,19 +249,46 @@ class YASBControlPanel:
         ttk.Button(buttons_frame, text="📂 Definir Caminho YASB", 
                   command=self.set_yasb_path).pack(side=tk.LEFT, padx=(0, 5))
         ttk.Button(buttons_frame, text="🔄 Recarregar YASB", 
-                  command=self.reload_yasb).pack(side=tk.LEFT)
+                  command=self.reload_yasb).pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Button(buttons_frame, text="🔍 Diferenças", 
+                  command=self.show_config_diff).pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Button(buttons_frame, text="🕘 Versões", 
+                  command=self.show_snapshots).pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Button(buttons_frame, text="↩️ Desfazer", 
+                  command=self.undo).pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Button(buttons_frame, text="↪️ Refazer", 
+                  command=self.redo).pack(side=tk.LEFT)
+        
+        # Seletor de barra (uma barra por monitor, por exemplo)
+        bar_frame = ttk.Frame(header_frame)
+        bar_frame.grid(row=1, column=1, sticky=tk.E, pady=(5, 0))
+        
+        ttk.Checkbutton(bar_frame, text="Salvar automaticamente", variable=self.autosave_var, 
+                       command=self.toggle_autosave).pack(side=tk.LEFT, padx=(0, 15))
+        ttk.Label(bar_frame, text="Barra:").pack(side=tk.LEFT, padx=(0, 5))
+        self.current_bar_var = tk.StringVar(value=DEFAULT_BAR_NAME)
+        self.bar_combo = ttk.Combobox(bar_frame, textvariable=self.current_bar_var, 
+                                      state='readonly', width=20)
+        self.bar_combo.pack(side=tk.LEFT, padx=(0, 5))
+        self.bar_combo.bind('<<ComboboxSelected>>', self.on_bar_selected)
+        ttk.Button(bar_frame, text="➕ Nova Barra", 
+                  command=self.add_bar).pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Button(bar_frame, text="🗑️ Remover Barra", 
+                  command=self.remove_bar).pack(side=tk.LEFT)
     
     def create_widgets_tab(self):
         """Cria a aba de gerenciamento de widgets."""
         widgets_frame = ttk.Frame(self.notebook, padding="10")
         self.notebook.add(widgets_frame, text="🧩 Widgets")
+        self.tab_frames['widgets'] = widgets_frame
         
         # Frame esquerdo - Lista de widgets
         left_frame = ttk.LabelFrame(widgets_frame, text="Widgets Configurados", padding="10")
         left_frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S), padx=(0, 5))
         
         # Treeview para widgets
-        self.widgets_tree = ttk.Treeview(left_frame, columns=('status', 'position'), show='tree headings')
+        self.widgets_tree = ttk.Treeview(left_frame, columns=('status', 'position'), show='tree headings',
+                                         selectmode='extended')
         self.widgets_tree.heading('#0', text='Widget')
         self.widgets_tree.heading('status', text='Status')
         self.widgets_tree.heading('position', text='Posição')
@@ -179,6 +318,17 @@ class YASBControlPanel:
         ttk.Button(widgets_buttons_frame, text="📋 Duplicar", 
                   command=self.duplicate_widget).pack(side=tk.LEFT)
         
+        # Mover os widgets selecionados para outra seção da barra
+        move_frame = ttk.Frame(left_frame)
+        move_frame.grid(row=2, column=0, columnspan=2, pady=(5, 0), sticky=(tk.W, tk.E))
+        
+        ttk.Label(move_frame, text="Mover seleção para:").pack(side=tk.LEFT, padx=(0, 5))
+        self.move_position_var = tk.StringVar(value=SECTIONS[0])
+        ttk.Combobox(move_frame, textvariable=self.move_position_var, values=SECTIONS, 
+                    state='readonly', width=10).pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Button(move_frame, text="↔️ Mover", 
+                  command=self.move_selected_widgets).pack(side=tk.LEFT)
+        
         # Frame direito - Propriedades do widget
         right_frame = ttk.LabelFrame(widgets_frame, text="Propriedades do Widget", padding="10")
         right_frame.grid(row=0, column=1, sticky=(tk.W, tk.E, tk.N, tk.S), padx=(5, 0))
@@ -198,11 +348,14 @@ class YASBControlPanel:
         
         # Bind para seleção de widget
         self.widgets_tree.bind('<<TreeviewSelect>>', self.on_widget_select)
+        self.widgets_tree.bind('<Delete>', lambda e: self.remove_widget())
+        self.widgets_tree.bind('<Control-a>', self.select_all_widgets)
     
     def create_styles_tab(self):
         """Cria a aba de editor de estilos."""
         styles_frame = ttk.Frame(self.notebook, padding="10")
         self.notebook.add(styles_frame, text="🎨 Estilos")
+        self.tab_frames['styles'] = styles_frame
         
         # Frame superior - Temas predefinidos
         themes_frame = ttk.LabelFrame(styles_frame, text="Temas Predefinidos", padding="10")
@@ -303,6 +456,7 @@ class YASBControlPanel:
         """Cria a aba de configurações avançadas."""
         advanced_frame = ttk.Frame(self.notebook, padding="10")
         self.notebook.add(advanced_frame, text="⚙️ Avançado")
+        self.tab_frames['advanced'] = advanced_frame
         
         # Frame superior - Configurações do sistema
         system_frame = ttk.LabelFrame(advanced_frame, text="Configurações do Sistema", padding="10")
@@ -382,17 +536,22 @@ class YASBControlPanel:
         """Cria a aba de preview da configuração."""
         preview_frame = ttk.Frame(self.notebook, padding="10")
         self.notebook.add(preview_frame, text="👁️ Preview")
+        self.tab_frames['preview'] = preview_frame
         
         # Frame superior - Controles
         controls_frame = ttk.Frame(preview_frame)
         controls_frame.grid(row=0, column=0, sticky=(tk.W, tk.E), pady=(0, 10))
         
         ttk.Button(controls_frame, text="🔄 Atualizar Preview", 
-                  command=self.update_preview).pack(side=tk.LEFT, padx=(0, 10))
+                  command=self.request_preview_redraw).pack(side=tk.LEFT, padx=(0, 10))
         ttk.Button(controls_frame, text="📸 Capturar Screenshot", 
                   command=self.capture_screenshot).pack(side=tk.LEFT, padx=(0, 10))
+        ttk.Button(controls_frame, text="🖼️ Folha de Contatos", 
+                  command=self.create_contact_sheet).pack(side=tk.LEFT, padx=(0, 10))
         ttk.Button(controls_frame, text="🚀 Testar Configuração", 
-                  command=self.test_configuration).pack(side=tk.LEFT)
+                  command=self.test_configuration).pack(side=tk.LEFT, padx=(0, 10))
+        ttk.Button(controls_frame, text="⏱️ Perfilar Comandos", 
+                  command=self.profile_custom_commands).pack(side=tk.LEFT)
         
         # Frame de preview
         self.preview_canvas_frame = ttk.LabelFrame(preview_frame, text="Preview da Barra", padding="10")
@@ -400,6 +559,8 @@ class YASBControlPanel:
         
         # Canvas para desenhar o preview
         self.preview_canvas = tk.Canvas(self.preview_canvas_frame, height=50, bg='#1e1e1e')
+        self.preview_cache = CanvasItemCache(self.preview_canvas)
+        self.preview_canvas.bind('<Configure>', self.on_preview_configure)
         self.preview_canvas.grid(row=0, column=0, sticky=(tk.W, tk.E))
         
         # Frame de informações
@@ -422,14 +583,57 @@ class YASBControlPanel:
     
     def create_status_bar(self, parent):
         """Cria a barra de status."""
-        self.status_var = tk.StringVar(value="Pronto")
-        status_bar = ttk.Label(parent, textvariable=self.status_var, relief=tk.SUNKEN, anchor=tk.W)
-        status_bar.grid(row=2, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(10, 0))
+        status_frame = ttk.Frame(parent)
+        status_frame.grid(row=2, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(10, 0))
+        status_frame.columnconfigure(0, weight=1)
+        
+        self.status_var = tk.StringVar(value=self.status.text or "Pronto")
+        status_bar = ttk.Label(status_frame, textvariable=self.status_var, relief=tk.SUNKEN, anchor=tk.W)
+        status_bar.grid(row=0, column=0, sticky=(tk.W, tk.E))
+        ttk.Button(status_frame, text="📜 Histórico", 
+                  command=self.show_status_history).grid(row=0, column=1, padx=(5, 0))
     
     def update_status(self, message: str):
-        """Atualiza a mensagem da barra de status."""
-        self.status_var.set(message)
-        self.root.update_idletasks()
+        """Atualiza a mensagem da barra de status (exibida no próximo quadro)."""
+        self.status.post(message)
+    
+    def show_status(self, text: str, messages):
+        """Exibe o status agrupado e acrescenta as mensagens novas ao histórico aberto."""
+        self.status_var.set(text)
+        if self.status_history_list is not None and messages:
+            for message in messages:
+                self.status_history_list.insert(tk.END, self.format_status_message(message))
+            self.status_history_list.see(tk.END)
+    
+    @staticmethod
+    def format_status_message(message) -> str:
+        return f"{time.strftime('%H:%M:%S', time.localtime(message.time))}  {message.text}"
+    
+    def show_status_history(self):
+        """Mostra as mensagens de status recentes."""
+        if self.status_history_list is not None:
+            self.status_history_list.winfo_toplevel().lift()
+            return
+        window = tk.Toplevel(self.root)
+        window.title("Histórico de Status")
+        window.geometry("600x300")
+        
+        listbox = tk.Listbox(window, font=('Consolas', 9))
+        scrollbar = ttk.Scrollbar(window, orient=tk.VERTICAL, command=listbox.yview)
+        listbox.configure(yscrollcommand=scrollbar.set)
+        listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        
+        for message in self.status.recent():
+            listbox.insert(tk.END, self.format_status_message(message))
+        listbox.see(tk.END)
+        self.status_history_list = listbox
+        
+        def on_close():
+            self.status_history_list = None
+            window.destroy()
+        
+        window.protocol("WM_DELETE_WINDOW", on_close)
     
     # Métodos de manipulação de arquivos
     def open_config_file(self):
@@ -441,14 +645,45 @@ class YASBControlPanel:
         
         if file_path:
             try:
-                with open(file_path, 'r', encoding='utf-8') as file:
-                    self.config_data = yaml.safe_load(file) or {}
-                    self.config_file_path = file_path
-                    self.update_status(f"Configuração carregada: {os.path.basename(file_path)}")
-                    self.refresh_ui()
+                self.load_config_path(file_path)
+                self.update_status(f"Configuração carregada: {os.path.basename(file_path)}")
             except Exception as e:
                 messagebox.showerror("Erro", f"Erro ao carregar arquivo: {str(e)}")
     
+    def load_config_path(self, file_path: str):
+        """Carrega um arquivo de configuração, oferecendo recuperar o diário."""
+        with open(file_path, 'rb') as file:
+            saved_bytes = file.read()
+        
+        config_data = yaml.safe_load(saved_bytes) or {}
+        
+        # Concluir gravações automáticas do arquivo anterior
+        self.autosave.reset()
+        self.writer.wait_idle()
+        self.process_write_results()
+        self.journal.stop()
+        self.config_file_path = file_path
+        self.history.reset(config_data)
+        
+        # Reaplicar alterações não salvas de uma sessão que terminou com falha
+        base_hash = content_hash(saved_bytes)
+        journal_hash, operations = read_journal(journal_path(file_path))
+        recovered = False
+        if operations and journal_hash == base_hash:
+            if messagebox.askyesno("Recuperar Alterações", 
+                                   f"Foram encontradas {len(operations)} alterações não salvas "
+                                   f"de uma sessão anterior.\nDeseja recuperá-las?"):
+                config_data = apply_operations(config_data, operations)
+                self.history.record("Recuperar alterações não salvas", config_data)
+                recovered = True
+        
+        self.journal.start(file_path, base_hash, keep_existing=recovered)
+        self.journal_tree = self.history.current()
+        self.saved_tree = self.history.entries[0].tree
+        self.saved_signature = file_signature(file_path)
+        self.watch_config_file()
+        self.store.replace(config_data)
+    
     def save_config_file(self):
         """Salva a configuração atual em um arquivo YAML."""
         if not self.config_file_path:
@@ -456,15 +691,283 @@ class YASBControlPanel:
             return
         
         try:
-            # Aplicar configurações das abas à estrutura de dados
-            self.apply_ui_to_config()
+            self.autosave.reset()
+            self.writer.wait_idle()
+            self.process_write_results()
+            
+            # Não sobrescrever edições feitas fora do painel: mesclar antes
+            if not self.merge_disk_changes():
+                self.update_status("Gravação cancelada.")
+                return
+            
+            # Gravação atômica, pulada se o disco já tem este conteúdo
+            written = save_config(self.config_file_path, self.config_data)
             
-            with open(self.config_file_path, 'w', encoding='utf-8') as file:
-                yaml.dump(self.config_data, file, default_flow_style=False, allow_unicode=True, indent=2)
-            self.update_status(f"Configuração salva: {os.path.basename(self.config_file_path)}")
+            # Compactar o diário: o arquivo salvo passa a ser a nova base
+            with open(self.config_file_path, 'rb') as file:
+                self.journal.start(self.config_file_path, content_hash(file.read()))
+            self.saved_tree = self.history.current()
+            self.saved_signature = file_signature(self.config_file_path)
+            self.watch_config_file()
+            self.take_snapshot("Salvar configuração")
+            
+            file_name = os.path.basename(self.config_file_path)
+            if written:
+                self.update_status(f"Configuração salva: {file_name}")
+            else:
+                self.update_status(f"Nenhuma alteração para salvar em {file_name}.")
         except Exception as e:
             messagebox.showerror("Erro", f"Erro ao salvar arquivo: {str(e)}")
     
+    def watch_config_file(self):
+        """Passa a observar o arquivo carregado (se mudou) em busca de edições externas."""
+        path = self.config_file_path or None
+        if self.file_watcher is not None:
+            if self.file_watcher.path == path:
+                return
+            self.file_watcher.stop()
+            self.file_watcher = None
+        if path and os.path.exists(path):
+            self.file_watcher = FileWatcher(path)
+            self.file_watcher.start()
+            self.root.after(250, self.poll_file_watcher, self.file_watcher)
+    
+    def poll_file_watcher(self, watcher):
+        """Consome, na thread do Tk, as alterações detectadas pelo observador."""
+        if watcher is not self.file_watcher:
+            return  # Observador substituído ou parado
+        # Gravações do próprio painel primeiro, para não tratá-las como externas
+        self.process_write_results()
+        latest = None
+        while not watcher.changes.empty():
+            latest = watcher.changes.get_nowait()
+        if latest is not None:
+            saved_bytes, new_data, error = latest
+            if error:
+                self.update_status(f"Arquivo alterado externamente com YAML inválido: {error.splitlines()[0]}")
+            else:
+                self.apply_external_change(saved_bytes, new_data)
+        self.root.after(250, self.poll_file_watcher, watcher)
+    
+    def apply_external_change(self, saved_bytes: bytes, new_data: Dict[str, Any]):
+        """Aplica uma alteração externa do arquivo atualizando só o que mudou."""
+        old_tree = self.history.current()
+        new_tree, _ = freeze(new_data, old_tree)
+        if new_tree is old_tree:
+            return  # Mesmo conteúdo (por exemplo, a própria gravação do painel)
+        
+        if old_tree is not self.saved_tree:
+            # Alterações dos dois lados: mesclagem three-way
+            self.merge_with_disk(saved_bytes, new_data)
+            return
+        
+        file_name = os.path.basename(self.config_file_path)
+        self.history.record("Alteração externa do arquivo", new_data)
+        operations = diff_trees(old_tree, self.history.current())
+        self.journal.start(self.config_file_path, content_hash(saved_bytes))
+        self.journal_tree = self.saved_tree = self.history.current()
+        self.saved_signature = file_signature(self.config_file_path)
+        
+        # Só as partes da interface que exibem os caminhos alterados são atualizadas
+        self.store.replace(new_data, "Alteração externa do arquivo", paths=operation_paths(operations))
+        
+        self.update_status(f"Recarregado após alteração externa: {file_name} "
+                           f"({len(operations)} alteração(ões))")
+    
+    def merge_disk_changes(self) -> bool:
+        """Mescla o arquivo no disco se ele mudou desde o último carregamento.
+        
+        Retorna False se o usuário cancelou a mesclagem.
+        """
+        path = self.config_file_path
+        if self.saved_tree is None or file_signature(path) in (None, self.saved_signature):
+            return True
+        
+        try:
+            with open(path, 'rb') as file:
+                saved_bytes = file.read()
+            disk_data = yaml.safe_load(saved_bytes) or {}
+        except yaml.YAMLError:
+            return messagebox.askyesno("Arquivo Alterado", 
+                                       "O arquivo no disco foi alterado e contém YAML inválido.\n"
+                                       "Deseja sobrescrevê-lo?")
+        return self.merge_with_disk(saved_bytes, disk_data)
+    
+    def merge_with_disk(self, saved_bytes: bytes, disk_data: Dict[str, Any]) -> bool:
+        """Mescla (three-way) a versão do disco com as alterações do painel.
+        
+        Retorna False se o usuário cancelou a resolução de conflitos.
+        """
+        base = self.saved_tree
+        theirs, _ = freeze(disk_data, base)
+        if theirs is base:
+            return True
+        
+        ours = self.history.current()
+        merged_tree, conflicts = merge_trees(base, ours, theirs)
+        merged = thaw(merged_tree)
+        if conflicts:
+            choices = [False] * len(conflicts)
+            if MergeConflictDialog:
+                choices = MergeConflictDialog(self.root, conflicts).show()
+                if choices is None:
+                    return False
+            merged = apply_operations(merged, resolution_operations(conflicts, choices))
+        
+        self.history.record("Mesclar alterações do disco", merged)
+        
+        # O arquivo no disco passa a ser a base; o diário guarda o que falta salvar
+        self.saved_tree = self.journal_tree = theirs
+        self.saved_signature = file_signature(self.config_file_path)
+        self.journal.start(self.config_file_path, content_hash(saved_bytes))
+        self.journal_change()
+        self.store.replace(merged, "Mesclar alterações do disco", 
+                           paths=operation_paths(diff_trees(ours, self.history.current())))
+        
+        file_name = os.path.basename(self.config_file_path)
+        self.update_status(f"Alterações externas em {file_name} mescladas "
+                           f"({len(conflicts)} conflito(s)).")
+        return True
+    
+    def show_config_diff(self):
+        """Mostra as diferenças entre o arquivo no disco e o painel."""
+        path = self.config_file_path
+        if not path or not os.path.exists(path):
+            messagebox.showinfo("Diferenças", "A configuração ainda não foi salva em um arquivo.")
+            return
+        
+        self.update_status("Comparando com o arquivo no disco...")
+        config_snapshot = copy.deepcopy(self.config_data)
+        outcome = {}
+        
+        def worker():
+            try:
+                with open(path, 'rb') as file:
+                    disk_data = yaml.safe_load(file) or {}
+                outcome['entries'] = diff_configs(disk_data, config_snapshot)
+            except Exception as e:
+                outcome['error'] = e
+        
+        thread = threading.Thread(target=worker, daemon=True)
+        thread.start()
+        
+        def poll():
+            if thread.is_alive():
+                self.root.after(50, poll)
+            elif 'error' in outcome:
+                messagebox.showerror("Erro", f"Erro ao comparar configurações: {str(outcome['error'])}")
+            else:
+                entries = outcome['entries']
+                self.update_status(summarize(entries))
+                if ConfigDiffDialog:
+                    ConfigDiffDialog(self.root, entries, 
+                                     title=f"Diferenças: {os.path.basename(path)} → painel")
+        
+        self.root.after(50, poll)
+    
+    def toggle_autosave(self):
+        """Liga ou desliga o salvamento automático."""
+        enabled = self.autosave_var.get()
+        self.autosave.set_enabled(enabled)
+        if enabled:
+            if self.history.current() is not self.saved_tree:
+                self.autosave.notify()
+            self.update_status("Salvamento automático ativado.")
+        else:
+            self.update_status("Salvamento automático desativado.")
+    
+    def autosave_config(self) -> bool:
+        """Envia o estado atual para o gravador em segundo plano.
+        
+        Retorna False se não há alterações desde a última gravação.
+        """
+        path = self.config_file_path
+        tree = self.history.current()
+        if not path or tree is None or tree is self.saved_tree:
+            return False
+        if self.saved_tree is not None and file_signature(path) not in (None, self.saved_signature):
+            # A mesclagem com a versão externa fica para o observador ou para o Salvar
+            self.update_status("Salvamento automático adiado: o arquivo foi alterado fora do painel.")
+            return True
+        
+        self.writer.submit(path, tree)
+        self.root.after(50, self.poll_background_writer)
+        return True
+    
+    def poll_background_writer(self):
+        """Acompanha as gravações em segundo plano até terminarem."""
+        self.process_write_results()
+        if self.writer.busy():
+            self.root.after(50, self.poll_background_writer)
+    
+    def process_write_results(self):
+        """Conclui, na thread do Tk, as gravações feitas em segundo plano."""
+        while not self.writer.results.empty():
+            result = self.writer.results.get_nowait()
+            if result.path != self.config_file_path:
+                continue  # Outro arquivo foi carregado nesse meio tempo
+            if result.error:
+                self.update_status(f"Erro no salvamento automático: {result.error}")
+                continue
+            
+            self.autosave.record_result(result.written)
+            # O arquivo gravado passa a ser a base do diário e da mesclagem
+            self.journal.start(result.path, result.saved_hash)
+            current = self.history.current()
+            self.journal.append(diff_trees(result.tree, current))
+            self.journal_tree = current
+            self.saved_tree = result.tree
+            self.saved_signature = file_signature(result.path)
+            if result.written:
+                self.take_snapshot("Salvamento automático", result.tree)
+            
+            delay = ""
+            if self.autosave.last_delay is not None:
+                delay = f", {self.autosave.last_delay:.1f} s após a edição"
+            self.update_status(f"Salvo automaticamente às {time.strftime('%H:%M:%S')} "
+                               f"({result.elapsed * 1000:.0f} ms{delay}; "
+                               f"{self.autosave.saves} gravação(ões), "
+                               f"{self.autosave.skipped} sem alterações)")
+    
+    def get_snapshot_store(self) -> Optional[SnapshotStore]:
+        """Repositório de versões do arquivo atual."""
+        if not self.config_file_path:
+            return None
+        directory = snapshot_dir(self.config_file_path)
+        if self.snapshot_store is None or self.snapshot_store.directory != directory:
+            self.snapshot_store = SnapshotStore(directory)
+        return self.snapshot_store
+    
+    def take_snapshot(self, label: str, tree=None):
+        """Guarda o estado salvo como uma versão, em segundo plano."""
+        store = self.get_snapshot_store()
+        tree = tree if tree is not None else self.history.current()
+        if store is None or tree is None:
+            return
+        
+        def worker():
+            try:
+                store.save(tree, label)
+                store.collect_garbage()
+            except OSError:
+                pass  # Versões são um extra: nunca impedir a gravação
+        
+        threading.Thread(target=worker, daemon=True).start()
+    
+    def show_snapshots(self):
+        """Abre o navegador de versões salvas."""
+        store = self.get_snapshot_store()
+        if store is None or not SnapshotBrowserDialog:
+            messagebox.showinfo("Versões", "A configuração ainda não foi salva em um arquivo.")
+            return
+        
+        result = SnapshotBrowserDialog(self.root, store, copy.deepcopy(self.config_data)).show()
+        if result is None:
+            return
+        snapshot_id, config_data = result
+        self.store.replace(config_data, f"Restaurar versão #{snapshot_id}", record=True)
+        self.update_status(f"Versão #{snapshot_id} restaurada (use Salvar para gravar no arquivo).")
+    
     def save_config_file_as(self):
         """Salva a configuração atual em um novo arquivo YAML."""
         file_path = filedialog.asksaveasfilename(
@@ -474,55 +977,126 @@ class YASBControlPanel:
         )
         
         if file_path:
+            # Novo destino: não há versão base para mesclar
             self.config_file_path = file_path
+            self.saved_tree = None
             self.save_config_file()
     
+    def update_yasb_status(self):
+        """Mostra no cabeçalho se a instalação do YASB foi encontrada."""
+        if self.yasb_path:
+            self.yasb_status_label.configure(text=f"✅ YASB encontrado em: {self.yasb_path}",
+                                             style='Success.TLabel')
+        else:
+            self.yasb_status_label.configure(text="⚠️ YASB não encontrado - Configure o caminho manualmente",
+                                             style='Warning.TLabel')
+    
     def set_yasb_path(self):
         """Define o caminho da instalação do YASB."""
         path = filedialog.askdirectory(title="Selecionar Diretório do YASB")
         if path:
             self.yasb_path = path
             self.update_status(f"Caminho do YASB definido: {path}")
-            # Atualizar o cabeçalho
-            self.setup_ui()
+            # Só o cabeçalho mostra o caminho; a configuração não muda
+            self.update_yasb_status()
     
-    def apply_ui_to_config(self):
-        """Aplica as configurações da interface à estrutura de dados."""
-        # Aplicar configurações do sistema
-        if 'system' not in self.config_data:
-            self.config_data['system'] = {}
-        
-        self.config_data['system']['auto_start'] = self.auto_start_var.get()
-        self.config_data['system']['debug_mode'] = self.debug_mode_var.get()
-        
-        # Aplicar configurações de exibição
-        if 'bars' not in self.config_data:
-            self.config_data['bars'] = {'yasb-bar': {}}
-        
-        bar_config = self.config_data['bars']['yasb-bar']
-        
-        if 'alignment' not in bar_config:
-            bar_config['alignment'] = {}
-        bar_config['alignment']['position'] = self.position_var.get()
-        
-        if 'dimensions' not in bar_config:
-            bar_config['dimensions'] = {}
-        bar_config['dimensions']['width'] = self.width_var.get()
-        bar_config['dimensions']['height'] = int(self.height_var.get())
-        
-        # Aplicar estilos
-        if 'styles' not in self.config_data:
-            self.config_data['styles'] = {'default': {}}
+    @property
+    def current_bar(self) -> str:
+        """Nome da barra selecionada."""
+        return self.current_bar_var.get() or DEFAULT_BAR_NAME
+    
+    def refresh_bar_selector(self):
+        """Atualiza a lista de barras do seletor."""
+        bars = self.bar_index.bars
+        self.bar_combo['values'] = bars
+        if bars and self.current_bar_var.get() not in bars:
+            self.current_bar_var.set(bars[0])
+    
+    def on_bar_selected(self, event=None):
+        """Callback para troca da barra selecionada."""
+        # Os controles de exibição passam a mostrar (e editar) a nova barra
+        self.bindings.refresh()
+        # A coluna de posição depende da barra: atualizar só as linhas que mudam
+        self.tab_refresher.invalidate('widgets', list(self.widget_rows))
+        self.tab_refresher.invalidate('preview')
+        self.tab_refresher.flush()
+        self.update_status(f"Barra selecionada: {self.current_bar}")
+    
+    def add_bar(self):
+        """Cria uma nova barra com as opções da barra selecionada."""
+        bar_name = simpledialog.askstring("Nova Barra", "Nome da nova barra:", parent=self.root)
+        if not bar_name:
+            return
+        bar_name = bar_name.strip()
+        template = self.config_data.get('bars', {}).get(self.current_bar)
+        try:
+            self.store.add_bar(bar_name, template)
+        except ValueError as e:
+            messagebox.showerror("Erro", str(e))
+            return
         
-        style_config = self.config_data['styles']['default']
+        self.current_bar_var.set(bar_name)
+        self.on_bar_selected()
+        self.update_status(f"Barra '{bar_name}' criada.")
+    
+    def remove_bar(self):
+        """Remove a barra selecionada."""
+        bar_name = self.current_bar
+        if bar_name not in self.bar_index.bars:
+            return
+        if len(self.bar_index.bars) == 1:
+            messagebox.showwarning("Aviso", "A configuração precisa de pelo menos uma barra.")
+            return
+        if messagebox.askyesno("Confirmar", f"Deseja remover a barra '{bar_name}'?"):
+            # Trocar de barra antes, para que as vistas não redesenhem a barra removida
+            self.current_bar_var.set(next(bar for bar in self.bar_index.bars if bar != bar_name))
+            self.store.remove_bar(bar_name)
+            self.on_bar_selected()
+            self.update_status(f"Barra '{bar_name}' removida.")
+    
+    def bind_controls(self):
+        """Liga os controles das abas aos caminhos da configuração, nos dois sentidos.
+        
+        Cada edição grava só o caminho do controle alterado, e cada alteração
+        da configuração atualiza só os controles dos caminhos alterados.
+        """
+        if self.bindings is not None:
+            self.bindings.close()
+        self.bindings = BindingSet(self.store, self.on_binding_error)
+        bind = self.bindings.bind
+        
+        def bar_path(*keys):
+            return lambda: ('bars', self.current_bar) + keys
+        
+        # Configurações do sistema
+        bind(self.auto_start_var, ('system', 'auto_start'), bool, bool, True, "Iniciar automaticamente")
+        bind(self.debug_mode_var, ('system', 'debug_mode'), bool, bool, False, "Modo de depuração")
+        
+        # Configurações de exibição da barra selecionada
+        bind(self.position_var, bar_path('alignment', 'position'), default='top', label="Posição da barra")
+        bind(self.width_var, bar_path('dimensions', 'width'), default='100%', label="Largura da barra")
+        bind(self.height_var, bar_path('dimensions', 'height'), int, default=30, label="Altura da barra")
+        
+        # Estilos
+        color_defaults = {
+            'background_color': ('#1e1e1e', "Cor de fundo"),
+            'text_color': ('#ffffff', "Cor do texto"),
+            'accent_color': ('#007acc', "Cor de destaque"),
+            'border_color': ('#333333', "Cor da borda")
+        }
         for var_name, var in self.color_vars.items():
-            style_config[var_name] = var.get()
-        
-        style_config['font_family'] = self.font_family_var.get()
-        style_config['font_size'] = int(self.font_size_var.get())
-        style_config['font_weight'] = self.font_weight_var.get()
-        style_config['padding'] = int(self.padding_var.get())
-        style_config['margin'] = int(self.margin_var.get())
+            default, label = color_defaults[var_name]
+            bind(var, ('styles', 'default', var_name), default=default, label=label)
+        bind(self.font_family_var, ('styles', 'default', 'font_family'), default='Arial', label="Família da fonte")
+        bind(self.font_size_var, ('styles', 'default', 'font_size'), int, default=12, label="Tamanho da fonte")
+        bind(self.font_weight_var, ('styles', 'default', 'font_weight'), default='normal', label="Peso da fonte")
+        bind(self.padding_var, ('styles', 'default', 'padding'), int, default=5, label="Padding")
+        bind(self.margin_var, ('styles', 'default', 'margin'), int, default=2, label="Margin")
+    
+    def on_binding_error(self, binding, text):
+        """Avisa que um controle tem um valor inválido (a configuração mantém o anterior)."""
+        self.update_status(f"Valor inválido em {binding.label}: '{text}' "
+                           f"(mantido o valor anterior da configuração)")
     
     def load_default_config(self):
         """Carrega uma configuração padrão se existir."""
@@ -530,18 +1104,20 @@ class YASBControlPanel:
             config_path = os.path.join(self.yasb_path, "config.yaml")
             if os.path.exists(config_path):
                 try:
-                    with open(config_path, 'r', encoding='utf-8') as file:
-                        self.config_data = yaml.safe_load(file) or {}
-                        self.config_file_path = config_path
-                        self.update_status(f"Configuração padrão carregada: {os.path.basename(config_path)}")
-                        self.refresh_ui()
-                        return
+                    self.load_config_path(config_path)
+                    self.update_status(f"Configuração padrão carregada: {os.path.basename(config_path)}")
+                    return
                 except Exception:
                     pass
         
         # Se não encontrou configuração, criar uma básica
-        self.config_data = self.create_default_config()
-        self.refresh_ui()
+        config_data = self.create_default_config()
+        self.journal.stop()
+        self.history.reset(config_data)
+        self.journal_tree = self.history.current()
+        self.saved_tree = None
+        self.watch_config_file()
+        self.store.replace(config_data)
     
     def create_default_config(self) -> Dict[str, Any]:
         """Cria uma configuração padrão básica."""
@@ -641,94 +1217,265 @@ class YASBControlPanel:
             }
         }
     
+    def record_change(self, label: str, coalesce: bool = False):
+        """Registra o estado atual da configuração no histórico e no diário."""
+        if self.history.record(label, self.config_data, coalesce):
+            self.journal_change()
+    
+    def journal_change(self):
+        """Anexa ao diário a diferença desde o último estado registrado."""
+        tree = self.history.current()
+        self.journal.append(diff_trees(self.journal_tree, tree))
+        self.journal_tree = tree
+        self.autosave.notify()
+    
+    def undo(self, event=None):
+        """Desfaz a última alteração da configuração."""
+        if event is not None and isinstance(event.widget, (tk.Text, tk.Entry)):
+            return  # Deixar o atalho para o próprio campo de texto
+        previous = self.history.current()
+        result = self.history.undo()
+        if result is None:
+            self.update_status("Nada para desfazer.")
+            return
+        label, config_data = result
+        self.journal_change()
+        self.replace_from_history(config_data, previous, f"Desfazer: {label}")
+        self.update_status(f"Desfeito: {label}")
+    
+    def redo(self, event=None):
+        """Refaz a última alteração desfeita."""
+        if event is not None and isinstance(event.widget, (tk.Text, tk.Entry)):
+            return
+        previous = self.history.current()
+        result = self.history.redo()
+        if result is None:
+            self.update_status("Nada para refazer.")
+            return
+        label, config_data = result
+        self.journal_change()
+        self.replace_from_history(config_data, previous, f"Refazer: {label}")
+        self.update_status(f"Refeito: {label}")
+    
+    def replace_from_history(self, config_data: Dict[str, Any], previous, label: str):
+        """Troca a configuração por um estado do histórico, notificando só o que mudou."""
+        operations = diff_trees(previous, self.history.current())
+        self.store.replace(config_data, label, paths=operation_paths(operations))
+    
+    def subscribe_views(self):
+        """Inscreve cada parte da interface nos caminhos da configuração que ela exibe."""
+        # Histórico e diário primeiro, antes de qualquer vista
+        self.store.subscribe((), self.on_config_changed)
+        # Cabeçalho e controles ligados ficam sempre à vista: atualizados na hora
+        self.store.subscribe(('bars',), self.on_bars_changed)
+        # As abas só marcam o que mudou; a visível é atualizada ao final do evento
+        for prefix in (('widgets',), ('bars',)):
+            self.store.subscribe(prefix, self.on_widget_rows_changed)
+        self.store.subscribe((), self.on_yaml_changed)
+        for prefix in (('widgets',), ('bars',), ('styles',)):
+            self.store.subscribe(prefix, self.on_preview_changed)
+        self.store.subscribe((), self.on_views_changed)
+        
+        self.tab_refresher.register('widgets', self.refresh_widgets_tab)
+        self.tab_refresher.register('advanced', lambda keys: self.refresh_yaml_editor())
+        self.tab_refresher.register('preview', self.refresh_preview_tab)
+    
+    def on_config_changed(self, event):
+        """Registra as alterações no histórico e no diário."""
+        if event.record:
+            self.record_change(event.label, event.coalesce)
+        if () in event.paths:
+            self.name_allocator.reset()  # A configuração inteira foi trocada
+    
+    def on_bars_changed(self, event):
+        """Atualiza o seletor quando barras são criadas, removidas ou trocadas."""
+        if any(len(path) <= 2 for path in event.paths):
+            self.refresh_bar_selector()
+    
+    def on_widget_rows_changed(self, event):
+        """Marca as linhas da árvore dos widgets alterados."""
+        if any(path in ((), ('widgets',)) for path in event.paths):
+            self.tab_refresher.invalidate('widgets')
+            return
+        changed = set()
+        for path in event.paths:
+            if path[0] == 'widgets':
+                changed.add(path[1])
+            elif len(path) < 2 or path[1] == self.current_bar:
+                # Posições da barra exibida podem ter mudado para qualquer widget
+                changed.update(self.widget_rows)
+                changed.update(self.config_data.get('widgets') or {})
+        self.tab_refresher.invalidate('widgets', changed)
+    
+    def on_yaml_changed(self, event):
+        """Marca o editor YAML, que exibe a configuração inteira."""
+        self.tab_refresher.invalidate('advanced')
+    
+    def on_preview_changed(self, event):
+        """Marca o preview para redesenho se a barra exibida mudou; senão, só as informações."""
+        shown = set(self.preview_labels) | set(self.preview_hidden)
+        for path in event.paths:
+            if len(path) < 2 or path[0] == 'styles':
+                break
+            if path[0] == 'bars' and path[1] == self.current_bar:
+                break
+            if path[0] == 'widgets' and (path[1] in shown or 
+                                         self.bar_index.position(path[1], self.current_bar) != "N/A"):
+                break
+        else:
+            self.tab_refresher.invalidate('preview', ['info'])
+            return
+        self.tab_refresher.invalidate('preview')
+    
+    def on_views_changed(self, event):
+        """Atualiza a aba visível depois que todas as vistas marcaram o que mudou."""
+        if () in event.paths:
+            self.refresh_ui()
+        else:
+            self.tab_refresher.flush()
+    
+    def visible_tab(self) -> Optional[str]:
+        """Nome da aba selecionada no notebook."""
+        selected = self.notebook.select()
+        for name, frame in self.tab_frames.items():
+            if str(frame) == selected:
+                return name
+        return None
+    
+    def on_tab_changed(self, event=None):
+        """Atualiza a aba recém-selecionada com as alterações que ela perdeu."""
+        tab = self.visible_tab()
+        if tab != 'preview':
+            # Fora de vista o preview não é animado; ele é redesenhado ao voltar
+            self.preview_ticker.stop()
+            self.tab_refresher.invalidate('preview')
+        self.tab_refresher.flush(tab)
+    
     def refresh_ui(self):
-        """Atualiza toda a interface com os dados atuais."""
-        self.refresh_widgets_tree()
-        self.refresh_yaml_editor()
-        self.load_config_to_ui()
-        self.update_preview()
-    
-    def load_config_to_ui(self):
-        """Carrega a configuração atual para os controles da interface."""
-        # Carregar configurações do sistema
-        system_config = self.config_data.get('system', {})
-        self.auto_start_var.set(system_config.get('auto_start', True))
-        self.debug_mode_var.set(system_config.get('debug_mode', False))
-        
-        # Carregar configurações de exibição
-        bar_config = self.config_data.get('bars', {}).get('yasb-bar', {})
-        alignment = bar_config.get('alignment', {})
-        dimensions = bar_config.get('dimensions', {})
-        
-        self.position_var.set(alignment.get('position', 'top'))
-        self.width_var.set(str(dimensions.get('width', '100%')))
-        self.height_var.set(str(dimensions.get('height', 30)))
-        
-        # Carregar estilos
-        style_config = self.config_data.get('styles', {}).get('default', {})
-        
-        color_defaults = {
-            'background_color': '#1e1e1e',
-            'text_color': '#ffffff',
-            'accent_color': '#007acc',
-            'border_color': '#333333'
-        }
-        
-        for var_name, default in color_defaults.items():
-            if var_name in self.color_vars:
-                self.color_vars[var_name].set(style_config.get(var_name, default))
-        
-        self.font_family_var.set(style_config.get('font_family', 'Arial'))
-        self.font_size_var.set(str(style_config.get('font_size', 12)))
-        self.font_weight_var.set(style_config.get('font_weight', 'normal'))
-        self.padding_var.set(str(style_config.get('padding', 5)))
-        self.margin_var.set(str(style_config.get('margin', 2)))
+        """Atualiza toda a interface com os dados atuais.
+        
+        Só a aba visível é atualizada agora; as outras, quando forem selecionadas.
+        """
+        start = time.perf_counter()
+        self.tab_refresher.invalidate_all()
+        tab = self.visible_tab()
+        self.tab_refresher.flush(tab)
+        logger.debug("refresh_ui em %.1f ms (aba atualizada: %s; adiadas: %s)",
+                    (time.perf_counter() - start) * 1000, tab,
+                    ", ".join(sorted(self.tab_refresher.pending_tabs())) or "nenhuma")
+    
+    def refresh_widgets_tab(self, keys):
+        """Atualiza as linhas pendentes da árvore (e as propriedades da seleção)."""
+        selection = set(self.widgets_tree.selection())
+        if ALL in keys:
+            self.refresh_widgets_tree(select=selection)
+            changed = selection
+        else:
+            self.update_widget_rows(keys)
+            changed = keys
+        if selection & changed:
+            self.on_widget_select(None)
     
-    def refresh_widgets_tree(self):
-        """Atualiza a árvore de widgets."""
-        # Limpar árvore atual
-        for item in self.widgets_tree.get_children():
-            self.widgets_tree.delete(item)
+    def refresh_preview_tab(self, keys):
+        """Pede um redesenho do preview (agrupado por quadro), ou atualiza só as informações."""
+        if ALL in keys:
+            self.request_preview_redraw()
+        else:
+            self.update_config_info()
+    
+    def refresh_widgets_tree(self, select: Optional[list] = None):
+        """Atualiza a árvore de widgets, selecionando os nomes em select."""
+        # Limpar árvore atual (uma única chamada ao Tk)
+        self.widgets_tree.delete(*self.widgets_tree.get_children())
+        self.widget_rows = {}
         
         # Adicionar widgets da configuração
         if 'widgets' in self.config_data:
-            for widget_name, widget_config in self.config_data['widgets'].items():
-                enabled = widget_config.get('enabled', True)
-                status = "✅ Ativo" if enabled else "❌ Inativo"
-                position = self.get_widget_position(widget_name)
-                self.widgets_tree.insert('', 'end', iid=widget_name, text=widget_name, 
-                                       values=(status, position))
-    
-    def get_widget_position(self, widget_name: str) -> str:
-        """Obtém a posição de um widget na barra."""
-        if 'bars' in self.config_data:
-            for bar_config in self.config_data['bars'].values():
-                if 'widgets' in bar_config:
-                    for position, widgets in bar_config['widgets'].items():
-                        if widget_name in widgets:
-                            return position
-        return "N/A"
+            for widget_name in self.config_data['widgets']:
+                values = self.widget_row_values(widget_name)
+                self.widgets_tree.insert('', 'end', iid=widget_name, text=widget_name, values=values)
+                self.widget_rows[widget_name] = values
+        
+        if select:
+            widgets = self.config_data.get('widgets', {})
+            self.widgets_tree.selection_set([name for name in select if name in widgets])
+    
+    def widget_row_values(self, widget_name: str) -> tuple:
+        """Valores (status, posição) da linha de um widget na árvore."""
+        enabled = self.config_data['widgets'][widget_name].get('enabled', True)
+        status = "✅ Ativo" if enabled else "❌ Inativo"
+        return (status, self.get_widget_position(widget_name))
+    
+    def update_widget_rows(self, widget_names):
+        """Atualiza apenas as linhas da árvore destes widgets."""
+        widgets = self.config_data.get('widgets') or {}
+        for widget_name in widget_names:
+            if widget_name not in widgets:
+                if self.widget_rows.pop(widget_name, None) is not None:
+                    self.widgets_tree.delete(widget_name)
+                continue
+            values = self.widget_row_values(widget_name)
+            if widget_name not in self.widget_rows:
+                self.widgets_tree.insert('', 'end', iid=widget_name, text=widget_name, values=values)
+            elif self.widget_rows[widget_name] != values:
+                self.widgets_tree.item(widget_name, values=values)
+            self.widget_rows[widget_name] = values
+    
+    def get_widget_position(self, widget_name: str, bar_name: Optional[str] = None) -> str:
+        """Obtém a posição de um widget na barra (a selecionada, por padrão)."""
+        return self.bar_index.position(widget_name, bar_name or self.current_bar)
     
     def refresh_yaml_editor(self):
         """Atualiza o editor YAML com a configuração atual."""
         self.yaml_text.delete(1.0, tk.END)
         if self.config_data:
-            yaml_content = yaml.dump(self.config_data, default_flow_style=False, allow_unicode=True, indent=2)
-            self.yaml_text.insert(1.0, yaml_content)
+            # Inserir em blocos, sem montar o documento inteiro em memória
+            for chunk in chunked(iter_yaml(self.config_data)):
+                self.yaml_text.insert(tk.END, chunk)
     
     # Métodos de manipulação de widgets
     def on_widget_select(self, event):
         """Callback para seleção de widget na árvore."""
         selection = self.widgets_tree.selection()
-        if selection:
-            widget_name = selection[0]
-            self.show_widget_properties(widget_name)
+        if len(selection) == 1:
+            self.show_widget_properties(selection[0])
+        elif selection:
+            self.show_selection_summary(selection)
+        else:
+            self.clear_widget_properties()
+    
+    def select_all_widgets(self, event=None):
+        """Seleciona todos os widgets da árvore."""
+        self.widgets_tree.selection_set(self.widgets_tree.get_children())
+        return "break"
+    
+    def selected_widgets(self, action: str) -> list:
+        """Retorna os widgets selecionados, avisando se não houver nenhum."""
+        selection = list(self.widgets_tree.selection())
+        if not selection:
+            messagebox.showwarning("Aviso", f"Selecione um widget para {action}.")
+        return selection
+    
+    def clear_widget_properties(self):
+        """Limpa o painel de propriedades."""
+        for widget in self.properties_frame.winfo_children():
+            widget.destroy()
+    
+    def show_selection_summary(self, selection):
+        """Mostra um resumo quando vários widgets estão selecionados."""
+        self.clear_widget_properties()
+        widgets = self.config_data.get('widgets', {})
+        enabled = sum(1 for name in selection if widgets.get(name, {}).get('enabled', True))
+        ttk.Label(self.properties_frame, text=f"{len(selection)} widgets selecionados", 
+                 style='Heading.TLabel').grid(row=0, column=0, sticky=tk.W, pady=(0, 10))
+        ttk.Label(self.properties_frame, 
+                 text=f"Ativos: {enabled} | Inativos: {len(selection) - enabled}").grid(
+            row=1, column=0, sticky=tk.W)
     
     def show_widget_properties(self, widget_name: str):
         """Mostra as propriedades de um widget no painel direito."""
         # Limpar frame de propriedades
-        for widget in self.properties_frame.winfo_children():
-            widget.destroy()
+        self.clear_widget_properties()
         
         if widget_name not in self.config_data.get('widgets', {}):
             return
@@ -787,37 +1534,19 @@ class YASBControlPanel:
             
             if result:
                 widget_name = result['name']
-                
-                # Verificar se o widget já existe
-                if widget_name in self.config_data.get('widgets', {}):
-                    messagebox.showerror("Erro", f"Widget '{widget_name}' já existe.")
-                    return
-                
-                # Adicionar widget à configuração
-                if 'widgets' not in self.config_data:
-                    self.config_data['widgets'] = {}
-                
-                self.config_data['widgets'][widget_name] = {
+                widget_config = {
                     'type': result['type'],
                     'enabled': result['enabled'],
                     'options': result['options']
                 }
                 
-                # Adicionar à barra
-                position = result['position']
-                if 'bars' not in self.config_data:
-                    self.config_data['bars'] = {'yasb-bar': {'widgets': {'left': [], 'center': [], 'right': []}}}
-                
-                bar_config = self.config_data['bars']['yasb-bar']
-                if 'widgets' not in bar_config:
-                    bar_config['widgets'] = {'left': [], 'center': [], 'right': []}
-                
-                if position not in bar_config['widgets']:
-                    bar_config['widgets'][position] = []
-                
-                bar_config['widgets'][position].append(widget_name)
+                # Adicionar à barra selecionada (a árvore e o preview se atualizam sozinhos)
+                try:
+                    self.store.add_widget(widget_name, widget_config, self.current_bar, result['position'])
+                except ValueError as e:
+                    messagebox.showerror("Erro", str(e))
+                    return
                 
-                self.refresh_widgets_tree()
                 self.update_status(f"Widget '{widget_name}' adicionado.")
         else:
             messagebox.showinfo("Em Desenvolvimento", "Funcionalidade de adicionar widget em desenvolvimento.")
@@ -840,91 +1569,70 @@ class YASBControlPanel:
             result = dialog.show()
             
             if result:
-                # Atualizar configuração do widget
-                self.config_data['widgets'][widget_name] = {
+                # Substituir a configuração inteira do widget
+                self.store.replace_widget(widget_name, {
                     'type': result['type'],
                     'enabled': result['enabled'],
                     'options': result['options']
-                }
-                
-                self.refresh_widgets_tree()
-                self.show_widget_properties(widget_name)
+                })
                 self.update_status(f"Widget '{widget_name}' editado.")
         else:
             messagebox.showinfo("Em Desenvolvimento", "Funcionalidade de editar widget em desenvolvimento.")
     
     def remove_widget(self):
-        """Remove o widget selecionado."""
-        selection = self.widgets_tree.selection()
+        """Remove os widgets selecionados."""
+        selection = self.selected_widgets("remover")
         if not selection:
-            messagebox.showwarning("Aviso", "Selecione um widget para remover.")
             return
         
-        widget_name = selection[0]
-        if messagebox.askyesno("Confirmar", f"Deseja remover o widget '{widget_name}'?"):
-            # Remover da configuração
-            if 'widgets' in self.config_data and widget_name in self.config_data['widgets']:
-                del self.config_data['widgets'][widget_name]
-            
-            # Remover das barras
-            if 'bars' in self.config_data:
-                for bar_config in self.config_data['bars'].values():
-                    if 'widgets' in bar_config:
-                        for position, widgets in bar_config['widgets'].items():
-                            if widget_name in widgets:
-                                widgets.remove(widget_name)
-            
-            self.refresh_widgets_tree()
-            # Limpar propriedades
-            for widget in self.properties_frame.winfo_children():
-                widget.destroy()
-            self.update_status(f"Widget '{widget_name}' removido.")
+        if len(selection) == 1:
+            question = f"Deseja remover o widget '{selection[0]}'?"
+        else:
+            question = f"Deseja remover os {len(selection)} widgets selecionados?"
+        
+        if messagebox.askyesno("Confirmar", question):
+            removed = self.store.remove_widgets(selection)
+            if len(removed) == 1:
+                self.update_status(f"Widget '{removed[0]}' removido.")
+            else:
+                self.update_status(f"{len(removed)} widgets removidos.")
     
     def toggle_widget(self):
-        """Ativa/desativa o widget selecionado."""
-        selection = self.widgets_tree.selection()
+        """Ativa/desativa os widgets selecionados."""
+        selection = self.selected_widgets("ativar/desativar")
         if not selection:
-            messagebox.showwarning("Aviso", "Selecione um widget para ativar/desativar.")
             return
         
-        widget_name = selection[0]
-        if 'widgets' in self.config_data and widget_name in self.config_data['widgets']:
-            current_status = self.config_data['widgets'][widget_name].get('enabled', True)
-            self.config_data['widgets'][widget_name]['enabled'] = not current_status
-            self.refresh_widgets_tree()
-            self.show_widget_properties(widget_name)
-            status = "ativado" if not current_status else "desativado"
-            self.update_status(f"Widget '{widget_name}' {status}.")
+        enabled = self.store.toggle_widgets(selection)
+        status = "ativado" if enabled else "desativado"
+        if len(selection) == 1:
+            self.update_status(f"Widget '{selection[0]}' {status}.")
+        else:
+            self.update_status(f"{len(selection)} widgets {status}s.")
     
     def duplicate_widget(self):
-        """Duplica o widget selecionado."""
-        selection = self.widgets_tree.selection()
+        """Duplica os widgets selecionados."""
+        selection = self.selected_widgets("duplicar")
         if not selection:
-            messagebox.showwarning("Aviso", "Selecione um widget para duplicar.")
             return
         
-        widget_name = selection[0]
-        new_name = f"{widget_name}_copy"
-        
-        # Verificar se o nome já existe e gerar um único
-        counter = 1
-        while new_name in self.config_data.get('widgets', {}):
-            new_name = f"{widget_name}_copy_{counter}"
-            counter += 1
+        new_names = self.store.duplicate_widgets(selection, self.name_allocator)
+        if new_names:
+            self.widgets_tree.selection_set(new_names)
+            if len(new_names) == 1:
+                self.update_status(f"Widget duplicado como '{new_names[0]}'.")
+            else:
+                self.update_status(f"{len(new_names)} widgets duplicados.")
+    
+    def move_selected_widgets(self):
+        """Move os widgets selecionados para a seção escolhida da barra atual."""
+        selection = self.selected_widgets("mover")
+        if not selection:
+            return
         
-        # Duplicar configuração
-        if 'widgets' in self.config_data and widget_name in self.config_data['widgets']:
-            self.config_data['widgets'][new_name] = self.config_data['widgets'][widget_name].copy()
-            
-            # Adicionar à mesma posição na barra
-            position = self.get_widget_position(widget_name)
-            if position != "N/A":
-                bar_config = self.config_data['bars']['yasb-bar']
-                if position in bar_config['widgets']:
-                    bar_config['widgets'][position].append(new_name)
-            
-            self.refresh_widgets_tree()
-            self.update_status(f"Widget duplicado como '{new_name}'.")
+        section = self.move_position_var.get()
+        moved = self.store.move_widgets(selection, self.current_bar, section)
+        self.update_status(f"{len(moved)} widget(s) movido(s) para '{section}' em {self.current_bar}.")
     
     # Métodos de estilos
     def choose_color(self, var_name: str):
@@ -937,37 +1645,12 @@ class YASBControlPanel:
         """Aplica um tema predefinido."""
         theme = self.theme_var.get()
         
-        themes = {
-            "Escuro": {
-                "background_color": "#1e1e1e",
-                "text_color": "#ffffff",
-                "accent_color": "#007acc",
-                "border_color": "#333333"
-            },
-            "Claro": {
-                "background_color": "#ffffff",
-                "text_color": "#000000",
-                "accent_color": "#0078d4",
-                "border_color": "#cccccc"
-            },
-            "Azul": {
-                "background_color": "#0f1419",
-                "text_color": "#e6e6e6",
-                "accent_color": "#00d4ff",
-                "border_color": "#1e3a5f"
-            },
-            "Verde": {
-                "background_color": "#0d1117",
-                "text_color": "#c9d1d9",
-                "accent_color": "#00ff88",
-                "border_color": "#21262d"
-            }
-        }
-        
-        if theme in themes:
-            for var_name, color in themes[theme].items():
-                if var_name in self.color_vars:
-                    self.color_vars[var_name].set(color)
+        if theme in PREDEFINED_THEMES:
+            # As ligações gravam cada cor alterada; a transação as junta em uma alteração
+            with self.store.transaction(f"Aplicar tema '{theme}'"):
+                for var_name, color in PREDEFINED_THEMES[theme].items():
+                    if var_name in self.color_vars:
+                        self.color_vars[var_name].set(color)
             self.update_status(f"Tema '{theme}' aplicado.")
     
     def open_advanced_style_editor(self):
@@ -978,23 +1661,20 @@ class YASBControlPanel:
             result = dialog.show()
             
             if result:
-                # Aplicar estilos avançados
-                if 'styles' not in self.config_data:
-                    self.config_data['styles'] = {}
-                if 'default' not in self.config_data['styles']:
-                    self.config_data['styles']['default'] = {}
-                
-                self.config_data['styles']['default'].update(result)
-                self.load_config_to_ui()
+                # Aplicar estilos avançados (só as chaves alteradas notificam as vistas)
+                self.store.update(('styles', 'default'), result, "Editor avançado de estilos")
                 self.update_status("Estilos avançados aplicados.")
         else:
             messagebox.showinfo("Em Desenvolvimento", "Editor avançado de estilos em desenvolvimento.")
     
     def apply_styles(self):
-        """Aplica os estilos configurados."""
-        self.apply_ui_to_config()
+        """Confirma os estilos, que já são gravados a cada edição (exceto os inválidos)."""
+        invalid = [binding.label for binding in self.bindings.invalid]
+        if invalid:
+            messagebox.showerror("Erro", "Valores inválidos (não aplicados):\n" + 
+                                 "\n".join(f"• {label}" for label in invalid))
+            return
         self.update_status("Estilos aplicados à configuração.")
-        self.update_preview()
     
     def save_custom_theme(self):
         """Salva um tema personalizado."""
@@ -1036,21 +1716,22 @@ class YASBControlPanel:
                 with open(file_path, 'r', encoding='utf-8') as file:
                     theme_data = json.load(file)
                 
-                # Aplicar dados do tema
-                for var_name, value in theme_data.items():
-                    if var_name in self.color_vars:
-                        self.color_vars[var_name].set(value)
-                    elif var_name == 'font_family':
-                        self.font_family_var.set(value)
-                    elif var_name == 'font_size':
-                        self.font_size_var.set(value)
-                    elif var_name == 'font_weight':
-                        self.font_weight_var.set(value)
-                    elif var_name == 'padding':
-                        self.padding_var.set(value)
-                    elif var_name == 'margin':
-                        self.margin_var.set(value)
-                
+                # Aplicar dados do tema (as ligações gravam os campos alterados de uma vez)
+                with self.store.transaction(f"Carregar tema '{os.path.basename(file_path)}'"):
+                    for var_name, value in theme_data.items():
+                        if var_name in self.color_vars:
+                            self.color_vars[var_name].set(value)
+                        elif var_name == 'font_family':
+                            self.font_family_var.set(value)
+                        elif var_name == 'font_size':
+                            self.font_size_var.set(value)
+                        elif var_name == 'font_weight':
+                            self.font_weight_var.set(value)
+                        elif var_name == 'padding':
+                            self.padding_var.set(value)
+                        elif var_name == 'margin':
+                            self.margin_var.set(value)
+
                 self.theme_var.set("Personalizado")
                 self.update_status(f"Tema carregado: {os.path.basename(file_path)}")
             except Exception as e:
@@ -1080,9 +1761,8 @@ class YASBControlPanel:
         """Salva o YAML do editor para a configuração."""
         try:
             yaml_content = self.yaml_text.get(1.0, tk.END)
-            self.config_data = yaml.safe_load(yaml_content) or {}
-            self.refresh_widgets_tree()
-            self.load_config_to_ui()
+            config_data = yaml.safe_load(yaml_content) or {}
+            self.store.replace(config_data, "Editor YAML", record=True)
             self.update_status("Configuração atualizada a partir do YAML.")
         except yaml.YAMLError as e:
             messagebox.showerror("Erro", f"Erro na sintaxe YAML:\n{str(e)}")
@@ -1092,7 +1772,7 @@ class YASBControlPanel:
         try:
             yaml_content = self.yaml_text.get(1.0, tk.END)
             data = yaml.safe_load(yaml_content)
-            formatted_yaml = yaml.dump(data, default_flow_style=False, allow_unicode=True, indent=2)
+            formatted_yaml = dump_yaml(data)
             
             self.yaml_text.delete(1.0, tk.END)
             self.yaml_text.insert(1.0, formatted_yaml)
@@ -1101,72 +1781,163 @@ class YASBControlPanel:
             messagebox.showerror("Erro", f"Erro na sintaxe YAML:\n{str(e)}")
     
     # Métodos de preview
+    def request_preview_redraw(self, kind: str = 'full'):
+        """Pede um redesenho do preview, agrupado com os pedidos pendentes."""
+        self.preview_redraw.request(kind)
+    
+    def on_preview_configure(self, event):
+        """Callback para redimensionamento do canvas do preview."""
+        size = (event.width, event.height)
+        if size != self.preview_size:
+            self.preview_size = size
+            self.request_preview_redraw('layout')
+    
+    def on_preview_redraw(self, kinds):
+        """Executa um redesenho agrupado do preview."""
+        if 'full' in kinds:
+            self.update_preview()
+        else:
+            # Redimensionamento: apenas reposicionar os rótulos atuais
+            self.layout_preview()
+    
     def update_preview(self):
         """Atualiza o preview da barra."""
-        self.preview_canvas.delete("all")
+        self.preview_labels = {}
+        self.preview_texts = {}
+        self.preview_hidden = []
         
         # Obter configurações da barra
-        bar_config = self.config_data.get('bars', {}).get('yasb-bar', {})
-        widgets_config = bar_config.get('widgets', {})
+        bar_config = self.config_data.get('bars', {}).get(self.current_bar, {})
+        widgets_config = bar_config.get('widgets') or {}
         style_config = self.config_data.get('styles', {}).get('default', {})
         
-        # Configurações visuais
-        bg_color = style_config.get('background_color', '#1e1e1e')
+        # Desenhar fundo da barra
+        self.preview_cache.set_background(style_config.get('background_color', '#1e1e1e'))
+        
+        # Renderizar os rótulos visíveis de cada seção
+        self.preview_sections = {}
+        for section in SECTIONS:
+            names = []
+            for widget_name in widgets_config.get(section, []):
+                text = self.prepare_preview_label(widget_name, self.preview_hidden)
+                if text is not None:
+                    names.append(widget_name)
+                    self.preview_texts[widget_name] = text
+            self.preview_sections[section] = names
+        
+        self.layout_preview()
+        self.preview_rendered = {name: rendered for name, rendered in self.preview_rendered.items()
+                                 if name in self.preview_labels}
+        
+        # Animar apenas os rótulos com campos dinâmicos
+        intervals = {}
+        for widget_name, label in self.preview_labels.items():
+            if widget_name in self.preview_texts and label.dynamic:
+                options = self.config_data['widgets'][widget_name].get('options') or {}
+                try:
+                    intervals[widget_name] = int(options.get('update_interval', DEFAULT_TICK_INTERVAL))
+                except (TypeError, ValueError):
+                    intervals[widget_name] = DEFAULT_TICK_INTERVAL
+        self.preview_ticker.set_widgets(intervals)
+        
+        # Atualizar informações
+        self.update_config_info()
+    
+    def preview_font(self):
+        """Retorna a fonte (família, tamanho, peso) do estilo atual."""
+        style_config = self.config_data.get('styles', {}).get('default', {})
+        try:
+            size = int(style_config.get('font_size', 12))
+        except (TypeError, ValueError):
+            size = 12
+        weight = 'bold' if style_config.get('font_weight') == 'bold' else 'normal'
+        return (str(style_config.get('font_family', 'Arial')), size, weight)
+    
+    def measure_preview_text(self, text: str) -> int:
+        """Mede um texto com a fonte do preview."""
+        return self.text_measurer.measure(*self.preview_font(), text)
+    
+    def layout_preview(self):
+        """Posiciona os rótulos já renderizados usando as métricas da fonte."""
+        style_config = self.config_data.get('styles', {}).get('default', {})
         text_color = style_config.get('text_color', '#ffffff')
+        font = self.preview_font()
         
-        # Desenhar fundo da barra
         canvas_width = self.preview_canvas.winfo_width()
         if canvas_width <= 1:
             canvas_width = 800  # Largura padrão
+        canvas_height = self.preview_canvas.winfo_height()
+        y = canvas_height // 2 if canvas_height > 1 else 25
+        
+        measure = lambda text: self.text_measurer.measure(*font, text)
+        layout, placed = layout_sections(self.preview_sections, self.preview_texts, measure, canvas_width)
+        
+        # Mover, alterar ou ocultar os itens existentes
+        entries = [PreviewEntry(name, x, y, self.preview_texts[name], text_color, tk.W, font)
+                   for name, x, _ in placed]
+        self.preview_cache.sync(entries, self.preview_hidden)
+        self.preview_items = self.preview_cache.visible_items()
+        self.preview_widths = {name: width for name, _, width in placed}
+        
+        # Sinalizar transbordo e colisões entre as seções
+        problems = describe_problems(layout)
+        frame_title = f"Preview da Barra — ⚠️ {problems}" if problems else "Preview da Barra"
+        if frame_title != self.preview_frame_title:
+            self.preview_frame_title = frame_title
+            self.preview_canvas_frame.configure(text=frame_title)
+    
+    def prepare_preview_label(self, widget_name: str, hidden: list) -> Optional[str]:
+        """Renderiza o rótulo de um widget com dados simulados.
+        
+        Retorna None se o widget não existir ou estiver desativado; widgets
+        desativados são adicionados a hidden para que seu item seja apenas ocultado.
+        """
+        widget_config = self.config_data.get('widgets', {}).get(widget_name)
+        if not widget_config:
+            return None
+        if not widget_config.get('enabled', True):
+            hidden.append(widget_name)
+            return None
+        
+        options = widget_config.get('options') or {}
+        label = compile_label(str(options.get('label', widget_name)))
+        previous = self.preview_rendered.get(widget_name)
+        self.preview_labels[widget_name] = label
+        
+        # Manter o texto atual se o rótulo não mudou; o temporizador o atualiza
+        if previous is not None and previous[0] is label:
+            current = self.preview_cache.text(widget_name)
+            if current is not None:
+                return current
+        
+        text = label.render(self.sample_data.values_for(label.fields))
+        self.preview_rendered[widget_name] = (label, text)
+        return text
+    
+    def on_preview_tick(self, widget_names):
+        """Atualiza apenas os rótulos vencidos no preview."""
+        now = time.localtime()
+        time_cache = {}
+        relayout = False
+        for widget_name in widget_names:
+            item = self.preview_items.get(widget_name)
+            label = self.preview_labels.get(widget_name)
+            if item is None or label is None:
+                continue
+            values = self.sample_data.values_for(label.fields)
+            text = label.render(values, now, time_cache)
+            self.preview_texts[widget_name] = text
+            if self.measure_preview_text(text) != self.preview_widths.get(widget_name):
+                relayout = True
+            else:
+                self.preview_cache.set_text(widget_name, text)
         
-        self.preview_canvas.configure(bg=bg_color)
-        
-        # Desenhar widgets
-        x_left = 10
-        x_right = canvas_width - 10
-        x_center = canvas_width // 2
-        
-        # Widgets da esquerda
-        for widget_name in widgets_config.get('left', []):
-            if widget_name in self.config_data.get('widgets', {}):
-                widget_config = self.config_data['widgets'][widget_name]
-                if widget_config.get('enabled', True):
-                    self.preview_canvas.create_text(x_left, 25, text=widget_name, 
-                                                   fill=text_color, anchor=tk.W)
-                    x_left += len(widget_name) * 8 + 20
-        
-        # Widgets do centro
-        center_widgets = widgets_config.get('center', [])
-        if center_widgets:
-            total_width = sum(len(w) * 8 for w in center_widgets) + (len(center_widgets) - 1) * 20
-            x_start = x_center - total_width // 2
-            
-            for widget_name in center_widgets:
-                if widget_name in self.config_data.get('widgets', {}):
-                    widget_config = self.config_data['widgets'][widget_name]
-                    if widget_config.get('enabled', True):
-                        self.preview_canvas.create_text(x_start, 25, text=widget_name, 
-                                                       fill=text_color, anchor=tk.W)
-                        x_start += len(widget_name) * 8 + 20
-        
-        # Widgets da direita
-        right_widgets = list(reversed(widgets_config.get('right', [])))
-        for widget_name in right_widgets:
-            if widget_name in self.config_data.get('widgets', {}):
-                widget_config = self.config_data['widgets'][widget_name]
-                if widget_config.get('enabled', True):
-                    x_right -= len(widget_name) * 8
-                    self.preview_canvas.create_text(x_right, 25, text=widget_name, 
-                                                   fill=text_color, anchor=tk.W)
-                    x_right -= 20
-        
-        # Atualizar informações
-        self.update_config_info()
+        # Reposicionar a barra apenas se alguma largura mudou
+        if relayout:
+            self.layout_preview()
     
     def update_config_info(self):
         """Atualiza as informações da configuração."""
-        self.info_text.delete(1.0, tk.END)
-        
         info = []
         info.append("=== INFORMAÇÕES DA CONFIGURAÇÃO ===\n")
         
@@ -1179,14 +1950,15 @@ class YASBControlPanel:
         info.append(f"Widgets Inativos: {total_widgets - active_widgets}\n")
         
         # Configurações da barra
-        bar_config = self.config_data.get('bars', {}).get('yasb-bar', {})
+        bar_config = self.config_data.get('bars', {}).get(self.current_bar, {})
         info.append("=== CONFIGURAÇÕES DA BARRA ===")
+        info.append(f"Barra: {self.current_bar} ({len(self.bar_index.bars)} no total)")
         info.append(f"Posição: {bar_config.get('alignment', {}).get('position', 'N/A')}")
         info.append(f"Largura: {bar_config.get('dimensions', {}).get('width', 'N/A')}")
         info.append(f"Altura: {bar_config.get('dimensions', {}).get('height', 'N/A')}\n")
         
         # Distribuição de widgets
-        widgets_config = bar_config.get('widgets', {})
+        widgets_config = bar_config.get('widgets') or {}
         info.append("=== DISTRIBUIÇÃO DE WIDGETS ===")
         info.append(f"Esquerda: {', '.join(widgets_config.get('left', []))}")
         info.append(f"Centro: {', '.join(widgets_config.get('center', []))}")
@@ -1200,7 +1972,13 @@ class YASBControlPanel:
             info.append(f"Cor do Texto: {style_config.get('text_color', 'N/A')}")
             info.append(f"Fonte: {style_config.get('font_family', 'N/A')} {style_config.get('font_size', 'N/A')}px")
         
-        self.info_text.insert(1.0, '\n'.join(info))
+        # Só reescrever o texto quando as informações mudarem
+        info_text = '\n'.join(info)
+        if info_text == self.config_info_text:
+            return
+        self.config_info_text = info_text
+        self.info_text.delete(1.0, tk.END)
+        self.info_text.insert(1.0, info_text)
     
     def capture_screenshot(self):
         """Captura um screenshot do preview."""
@@ -1212,29 +1990,86 @@ class YASBControlPanel:
         
         if file_path:
             try:
-                # Simular captura (em um ambiente real, usaria bibliotecas como PIL)
-                messagebox.showinfo("Screenshot", f"Screenshot salvo em: {file_path}")
+                # Renderizar a barra fora da tela na largura atual do preview
+                canvas_width = self.preview_canvas.winfo_width()
+                if canvas_width <= 1:
+                    canvas_width = 800  # Largura padrão
+                png_data = render_bar_png(self.config_data, canvas_width, self.current_bar)
+                
+                with open(file_path, 'wb') as file:
+                    file.write(png_data)
                 self.update_status(f"Screenshot salvo: {os.path.basename(file_path)}")
             except Exception as e:
                 messagebox.showerror("Erro", f"Erro ao salvar screenshot: {str(e)}")
     
-    def test_configuration(self):
-        """Testa a configuração atual."""
-        # Validar configuração
-        errors = []
+    def create_contact_sheet(self):
+        """Gera uma imagem com a barra em várias larguras de tela e temas."""
+        widths_text = simpledialog.askstring(
+            "Folha de Contatos", "Larguras de tela (px), separadas por vírgula:",
+            initialvalue=", ".join(str(width) for width in DEFAULT_SCREEN_WIDTHS), parent=self.root)
+        if not widths_text:
+            return
+        try:
+            widths = [int(width) for width in widths_text.replace(';', ',').split(',') if width.strip()]
+        except ValueError:
+            messagebox.showerror("Erro", "Larguras inválidas. Use números separados por vírgula.")
+            return
         
-        # Verificar se há widgets configurados
-        if not self.config_data.get('widgets'):
-            errors.append("Nenhum widget configurado")
+        # Temas: estilo atual, temas predefinidos e temas JSON opcionais
+        themes = {"Atual": None}
+        themes.update(PREDEFINED_THEMES)
+        theme_files = filedialog.askopenfilenames(
+            title="Temas Personalizados (opcional)",
+            filetypes=[("Arquivos JSON", "*.json"), ("Todos os arquivos", "*.*")]
+        )
+        try:
+            themes.update(load_theme_files(theme_files))
+        except Exception as e:
+            messagebox.showerror("Erro", f"Erro ao carregar tema: {str(e)}")
+            return
         
-        # Verificar se há widgets ativos
-        active_widgets = [w for w in self.config_data.get('widgets', {}).values() if w.get('enabled', True)]
-        if not active_widgets:
-            errors.append("Nenhum widget ativo")
+        file_path = filedialog.asksaveasfilename(
+            title="Salvar Folha de Contatos",
+            defaultextension=".png",
+            filetypes=[("Arquivos PNG", "*.png"), ("Todos os arquivos", "*.*")]
+        )
+        if not file_path:
+            return
         
-        # Verificar configuração da barra
-        if not self.config_data.get('bars'):
-            errors.append("Configuração da barra não encontrada")
+        self.update_status(f"Gerando folha de contatos com {len(widths) * len(themes)} variações...")
+        config_snapshot = copy.deepcopy(self.config_data)
+        bar_name = self.current_bar
+        outcome = {}
+        # A thread só avança o contador; a barra de status é atualizada por quadro
+        job = self.status.start_job("Folha de contatos", len(widths) * len(themes))
+        
+        def worker():
+            try:
+                png_data = build_contact_sheet(config_snapshot, widths, themes, bar_name,
+                                               progress=job.advance).to_png()
+                with open(file_path, 'wb') as file:
+                    file.write(png_data)
+            except Exception as e:
+                outcome['error'] = e
+        
+        thread = threading.Thread(target=worker, daemon=True)
+        thread.start()
+        
+        def poll():
+            if thread.is_alive():
+                self.root.after(100, poll)
+            elif 'error' in outcome:
+                job.finish("Erro ao gerar folha de contatos.")
+                messagebox.showerror("Erro", f"Erro ao gerar folha de contatos: {str(outcome['error'])}")
+            else:
+                job.finish(f"Folha de contatos salva: {os.path.basename(file_path)}")
+        
+        self.root.after(100, poll)
+    
+    def test_configuration(self):
+        """Testa a configuração atual."""
+        # Validar configuração (as mesmas verificações da linha de comando)
+        errors = validate_config(self.config_data)
         
         if errors:
             messagebox.showwarning("Problemas na Configuração", 
@@ -1245,6 +2080,83 @@ class YASBControlPanel:
         
         self.update_status("Teste de configuração concluído.")
     
+    def profile_custom_commands(self):
+        """Perfila os comandos dos CustomWidget em segundo plano."""
+        commands = collect_custom_commands(self.config_data)
+        if not commands:
+            messagebox.showinfo("Perfil de Comandos", "Nenhum CustomWidget com comando configurado.")
+            return
+        
+        self.update_status("Perfilando comandos dos widgets personalizados...")
+        outcome = {}
+        # Copiar os widgets para que a thread não leia dados em edição
+        widgets_snapshot = {'widgets': copy.deepcopy(self.config_data.get('widgets', {}))}
+        job = self.status.start_job("Comandos perfilados", len(commands))
+        
+        def worker():
+            try:
+                outcome['results'] = profile_custom_widgets(widgets_snapshot, progress=job.advance)
+            except Exception as e:
+                outcome['error'] = e
+        
+        thread = threading.Thread(target=worker, daemon=True)
+        thread.start()
+        
+        # Aguardar o resultado sem bloquear a interface
+        def poll():
+            if thread.is_alive():
+                self.root.after(100, poll)
+            elif 'error' in outcome:
+                job.finish("Erro ao perfilar comandos.")
+                messagebox.showerror("Erro", f"Erro ao perfilar comandos: {str(outcome['error'])}")
+            else:
+                job.finish(f"{len(outcome['results'])} comando(s) perfilado(s).")
+                self.show_profile_results(outcome['results'])
+        
+        self.root.after(100, poll)
+    
+    def show_profile_results(self, results):
+        """Mostra o resultado do perfil dos comandos."""
+        window = tk.Toplevel(self.root)
+        window.title("Perfil dos Comandos")
+        window.geometry("800x300")
+        
+        columns = ('interval', 'wall', 'cpu', 'output', 'ratio', 'status')
+        tree = ttk.Treeview(window, columns=columns, show='tree headings')
+        tree.heading('#0', text='Widget')
+        tree.heading('interval', text='Intervalo (ms)')
+        tree.heading('wall', text='Tempo (ms)')
+        tree.heading('cpu', text='CPU (ms)')
+        tree.heading('output', text='Saída (bytes)')
+        tree.heading('ratio', text='% do Intervalo')
+        tree.heading('status', text='Status')
+        tree.column('#0', width=150)
+        for column in columns:
+            tree.column(column, width=100, anchor=tk.E)
+        tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        
+        for result in results:
+            cpu = f"{result['cpu_mean'] * 1000:.1f}" if result['cpu_mean'] is not None else "N/A"
+            if result['error']:
+                status = "❌ Erro"
+            elif result['timeouts']:
+                status = "⏰ Tempo esgotado"
+            elif result['flagged']:
+                status = "⚠️ Lento"
+            else:
+                status = "✅ OK"
+            tree.insert('', 'end', text=result['name'], values=(
+                result['update_interval'],
+                f"{result['wall_mean'] * 1000:.1f}",
+                cpu,
+                result['output_bytes'],
+                f"{result['interval_ratio'] * 100:.1f}%",
+                status
+            ))
+        
+        flagged = sum(1 for r in results if r['flagged'])
+        self.update_status(f"Perfil concluído: {len(results)} comandos, {flagged} sinalizados.")
+    
     def reload_yasb(self):
         """Recarrega o YASB."""
         if not self.yasb_path:
@@ -1270,12 +2182,26 @@ class YASBControlPanel:
         except Exception as e:
             messagebox.showerror("Erro", f"Erro ao recarregar YASB: {str(e)}")
     
+    def on_close(self):
+        """Grava o diário pendente antes de fechar a janela."""
+        self.autosave.flush()
+        self.writer.wait_idle()
+        self.process_write_results()
+        self.journal.flush()
+        if self.file_watcher is not None:
+            self.file_watcher.stop()
+        self.preview_ticker.stop()
+        self.root.destroy()
+    
     def run(self):
         """Inicia a aplicação."""
         self.root.mainloop()
 
 
 if __name__ == "__main__":
+    # YASB_PANEL_LOG=DEBUG mostra o tempo de cada atualização de aba
+    logging.basicConfig(level=os.environ.get('YASB_PANEL_LOG', 'WARNING').upper(),
+                        format="%(asctime)s %(name)s %(levelname)s: %(message)s")
     app = YASBControlPanel()
     app.run()
 
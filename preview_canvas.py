@@ -0,0 +1,153 @@
+"""
+Módulo para reaproveitar os itens de texto do canvas do preview.
+
+Em vez de apagar e recriar todos os itens a cada atualização, o cache
+mantém um item por widget e, a cada sincronização, apenas move, altera o
+texto ou oculta os itens existentes; itens só são criados para widgets
+novos e apagados para widgets que saíram da barra.
+"""
+
+from typing import Dict, Any, Iterable, NamedTuple, Optional
+
+
+class PreviewEntry(NamedTuple):
+    """Estado desejado de um item de texto do preview."""
+    name: str
+    x: float
+    y: float
+    text: str
+    fill: str
+    anchor: str
+    font: Any = None
+
+
+class CanvasItemCache:
+    """Mapa de nome do widget para item de texto do canvas."""
+
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self.items: Dict[str, int] = {}
+        self.state: Dict[str, PreviewEntry] = {}
+        self.hidden: set = set()
+        self.background: Optional[str] = None
+        self.stats = {'created': 0, 'deleted': 0, 'moved': 0, 'updated': 0, 'hidden': 0}
+
+    def text(self, name: str) -> Optional[str]:
+        """Retorna o texto exibido atualmente para o widget."""
+        entry = self.state.get(name)
+        return entry.text if entry is not None else None
+
+    def set_background(self, color: str):
+        """Altera a cor de fundo apenas quando ela mudar."""
+        if color != self.background:
+            self.canvas.configure(bg=color)
+            self.background = color
+
+    def set_text(self, name: str, text: str):
+        """Altera apenas o texto de um item existente."""
+        entry = self.state.get(name)
+        if entry is None or entry.text == text:
+            return
+        self.canvas.itemconfigure(self.items[name], text=text)
+        self.state[name] = entry._replace(text=text)
+        self.stats['updated'] += 1
+
+    def sync(self, entries: Iterable[PreviewEntry], hidden: Iterable[str] = ()) -> Dict[str, int]:
+        """Aplica o estado desejado ao canvas com o mínimo de operações.
+
+        Itens de widgets em hidden são ocultados e mantidos para uso
+        futuro; itens que não aparecem em nenhum dos dois são apagados.
+        Retorna quantas operações de cada tipo foram feitas.
+        """
+        stats = {'created': 0, 'deleted': 0, 'moved': 0, 'updated': 0, 'hidden': 0}
+        visible = set()
+
+        for entry in entries:
+            name = entry.name
+            visible.add(name)
+            item = self.items.get(name)
+            if item is None:
+                options = {'text': entry.text, 'fill': entry.fill, 'anchor': entry.anchor}
+                if entry.font is not None:
+                    options['font'] = entry.font
+                self.items[name] = self.canvas.create_text(entry.x, entry.y, **options)
+                self.state[name] = entry
+                stats['created'] += 1
+                continue
+
+            previous = self.state[name]
+            if (previous.x, previous.y) != (entry.x, entry.y):
+                self.canvas.coords(item, entry.x, entry.y)
+                stats['moved'] += 1
+
+            changes: Dict[str, Any] = {}
+            if previous.text != entry.text:
+                changes['text'] = entry.text
+            if previous.fill != entry.fill:
+                changes['fill'] = entry.fill
+            if previous.anchor != entry.anchor:
+                changes['anchor'] = entry.anchor
+            if previous.font != entry.font and entry.font is not None:
+                changes['font'] = entry.font
+            if name in self.hidden:
+                changes['state'] = 'normal'
+                self.hidden.discard(name)
+            if changes:
+                self.canvas.itemconfigure(item, **changes)
+                stats['updated'] += 1
+            self.state[name] = entry
+
+        keep_hidden = set(hidden) - visible
+        for name in list(self.items):
+            if name in visible:
+                continue
+            if name in keep_hidden:
+                if name not in self.hidden:
+                    self.canvas.itemconfigure(self.items[name], state='hidden')
+                    self.hidden.add(name)
+                    stats['hidden'] += 1
+            else:
+                self.canvas.delete(self.items.pop(name))
+                self.state.pop(name, None)
+                self.hidden.discard(name)
+                stats['deleted'] += 1
+
+        for key, value in stats.items():
+            self.stats[key] += value
+        return stats
+
+    def visible_items(self) -> Dict[str, int]:
+        """Retorna os itens visíveis, por nome do widget."""
+        return {name: item for name, item in self.items.items() if name not in self.hidden}
+
+
+class RecordingCanvas:
+    """Canvas falso que apenas conta as operações (para testes e benchmarks)."""
+
+    def __init__(self):
+        self.next_id = 0
+        self.calls: Dict[str, int] = {}
+
+    def _count(self, name: str):
+        self.calls[name] = self.calls.get(name, 0) + 1
+
+    def create_text(self, *args, **kwargs) -> int:
+        self._count('create_text')
+        self.next_id += 1
+        return self.next_id
+
+    def coords(self, *args):
+        self._count('coords')
+
+    def itemconfigure(self, *args, **kwargs):
+        self._count('itemconfigure')
+
+    def configure(self, **kwargs):
+        self._count('configure')
+
+    def delete(self, *args):
+        self._count('delete')
+
+    def total_calls(self) -> int:
+        return sum(self.calls.values())
+
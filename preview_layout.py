@@ -0,0 +1,148 @@
+"""
+Módulo para calcular o layout do preview da barra.
+
+As larguras dos rótulos são medidas com as métricas reais da fonte
+(tkinter.font.Font.measure) por meio de um cache LRU, e as posições de
+cada seção (esquerda, centro e direita) são calculadas por uma função
+pura, também guardada em cache, que sinaliza transbordo e colisões.
+"""
+
+from functools import lru_cache
+from typing import Callable, Dict, NamedTuple, Optional, Tuple
+
+SECTIONS = ("left", "center", "right")
+
+# Espaço entre widgets e margem lateral da barra (px)
+WIDGET_SPACING = 20
+BAR_PADDING = 10
+
+
+class TextMeasurer:
+    """Mede textos com as métricas da fonte, com cache LRU.
+
+    A chave do cache é (família, tamanho, peso, texto). Sem uma janela Tk
+    (root=None) é usada uma estimativa baseada no tamanho da fonte.
+    """
+
+    def __init__(self, root=None, maxsize: int = 8192):
+        self.root = root
+        self.fonts: Dict[Tuple[str, int, str], object] = {}
+        self.measure = lru_cache(maxsize=maxsize)(self._measure)
+
+    def _font(self, family: str, size: int, weight: str):
+        key = (family, size, weight)
+        font = self.fonts.get(key)
+        if font is None:
+            from tkinter import font as tkfont
+            font = tkfont.Font(root=self.root, family=family, size=size, weight=weight)
+            self.fonts[key] = font
+        return font
+
+    def _measure(self, family: str, size: int, weight: str, text: str) -> int:
+        if self.root is None:
+            return estimate_text_width(size, weight, text)
+        return self._font(family, size, weight).measure(text)
+
+    def cache_info(self):
+        """Estatísticas do cache de medições."""
+        return self.measure.cache_info()
+
+
+def estimate_text_width(size: int, weight: str, text: str) -> int:
+    """Estima a largura de um texto sem acesso às métricas da fonte."""
+    factor = 0.62 if weight == 'bold' else 0.56
+    width = 0.0
+    for char in text:
+        # Caracteres fora do ASCII (emojis, acentos largos) ocupam mais espaço
+        width += size * (factor if ord(char) < 0x2000 else 1.2)
+    return int(round(width))
+
+
+class BarLayout(NamedTuple):
+    """Resultado do cálculo de layout da barra."""
+    positions: Tuple[Tuple[int, ...], ...]
+    extents: Tuple[Optional[Tuple[int, int]], ...]
+    overflow: bool
+    collisions: Tuple[Tuple[str, str], ...]
+
+
+@lru_cache(maxsize=256)
+def compute_layout(widths: Tuple[Tuple[int, ...], Tuple[int, ...], Tuple[int, ...]],
+                   bar_width: int, padding: int = BAR_PADDING,
+                   spacing: int = WIDGET_SPACING) -> BarLayout:
+    """Calcula a posição x (borda esquerda) de cada widget das três seções.
+
+    widths traz as larguras dos widgets de cada seção, na ordem de
+    SECTIONS. A direita é alinhada à borda direita e o centro ao meio da
+    barra, como no YASB.
+    """
+    left, center, right = widths
+
+    def run(start: int, section_widths: Tuple[int, ...]) -> Tuple[int, ...]:
+        positions = []
+        x = start
+        for width in section_widths:
+            positions.append(x)
+            x += width + spacing
+        return tuple(positions)
+
+    def total(section_widths: Tuple[int, ...]) -> int:
+        if not section_widths:
+            return 0
+        return sum(section_widths) + spacing * (len(section_widths) - 1)
+
+    left_positions = run(padding, left)
+    center_positions = run((bar_width - total(center)) // 2, center)
+    right_positions = run(bar_width - padding - total(right), right)
+
+    extents = []
+    for positions, section_widths in ((left_positions, left), (center_positions, center),
+                                      (right_positions, right)):
+        if positions:
+            extents.append((positions[0], positions[-1] + section_widths[-1]))
+        else:
+            extents.append(None)
+
+    # Colisões entre seções vizinhas (ou esquerda/direita sem centro)
+    collisions = []
+    present = [(name, extent) for name, extent in zip(SECTIONS, extents) if extent is not None]
+    for (name_a, extent_a), (name_b, extent_b) in zip(present, present[1:]):
+        if extent_a[1] + spacing > extent_b[0]:
+            collisions.append((name_a, name_b))
+
+    content = sum(total(section) for section in widths)
+    gaps = spacing * max(0, len(present) - 1)
+    overflow = content + gaps + 2 * padding > bar_width or any(
+        extent[0] < padding or extent[1] > bar_width - padding for _, extent in present)
+
+    return BarLayout((left_positions, center_positions, right_positions),
+                     tuple(extents), overflow, tuple(collisions))
+
+
+def layout_sections(sections: Dict[str, list], texts: Dict[str, str],
+                    measure: Callable[[str], int], bar_width: int,
+                    padding: int = BAR_PADDING, spacing: int = WIDGET_SPACING):
+    """Mede os textos de cada seção e calcula o layout.
+
+    Retorna o BarLayout e a lista (nome, x, largura) de todos os widgets.
+    """
+    widths = tuple(tuple(measure(texts[name]) for name in sections.get(section, ()))
+                   for section in SECTIONS)
+    layout = compute_layout(widths, bar_width, padding, spacing)
+
+    placed = []
+    for section, positions, section_widths in zip(SECTIONS, layout.positions, widths):
+        for name, x, width in zip(sections.get(section, ()), positions, section_widths):
+            placed.append((name, x, width))
+    return layout, placed
+
+
+def describe_problems(layout: BarLayout) -> str:
+    """Descreve transbordo e colisões para exibir ao usuário."""
+    names = {"left": "esquerda", "center": "centro", "right": "direita"}
+    problems = []
+    if layout.overflow:
+        problems.append("widgets não cabem na barra")
+    for section_a, section_b in layout.collisions:
+        problems.append(f"sobreposição entre {names[section_a]} e {names[section_b]}")
+    return "; ".join(problems)
@@ -0,0 +1,209 @@
+"""
+Módulo para agendar as atualizações do preview da barra.
+
+Todos os widgets do preview compartilham um único temporizador: ele só é
+agendado para o próximo widget cujo update_interval venceu, e a cada
+disparo apenas os rótulos vencidos são renderizados novamente. Pedidos de
+redesenho (redimensionamento, edições) são agrupados por quadro.
+"""
+
+import heapq
+import math
+import random
+import time
+from typing import Dict, Any, Callable, Iterable, List, Optional
+
+# Intervalo usado por widgets com campos dinâmicos mas sem update_interval
+DEFAULT_TICK_INTERVAL = 1000
+
+# Menor intervalo aceito no preview (ms)
+MIN_TICK_INTERVAL = 100
+
+SAMPLE_TITLES = [
+    "Visual Studio Code",
+    "Mozilla Firefox",
+    "Explorador de Arquivos",
+    "Terminal",
+    "Spotify"
+]
+
+SAMPLE_NETWORK = ["Conectado", "Wi-Fi", "Ethernet"]
+
+SAMPLE_FIXED = {
+    "cpu_freq": "3.2 GHz",
+    "cpu_cores": 8,
+    "time_remaining": "2:45",
+    "is_charging": "⚡",
+    "is_muted": "",
+    "interface": "Wi-Fi",
+    "win_class": "Chrome_WidgetWin_1",
+    "process_name": "code.exe",
+    "condition": "Ensolarado",
+    "humidity": "65%",
+    "location": "São Paulo"
+}
+
+
+class SampleDataProvider:
+    """Gera valores simulados para os campos dos rótulos."""
+
+    def __init__(self, seed: int = 0):
+        self.random = random.Random(seed)
+        self.levels: Dict[str, float] = {}
+
+    def _walk(self, field: str, low: float, high: float, step: float) -> float:
+        """Passeio aleatório limitado, para que os valores variem suavemente."""
+        level = self.levels.get(field)
+        if level is None:
+            level = self.random.uniform(low, high)
+        else:
+            level = min(high, max(low, level + self.random.uniform(-step, step)))
+        self.levels[field] = level
+        return level
+
+    def value(self, field: str) -> Any:
+        """Retorna um valor simulado para um campo, ou None se desconhecido."""
+        if field.endswith('_percent'):
+            return int(self._walk(field, 0, 100, 8))
+        if field == 'temperature':
+            return int(self._walk(field, -5, 40, 1))
+        if field == 'win_title':
+            return self.random.choice(SAMPLE_TITLES)
+        if field == 'network_status':
+            return self.random.choice(SAMPLE_NETWORK)
+        if field.endswith('_speed'):
+            return f"{self._walk(field, 0, 50, 5):.1f} MB/s"
+        if field.endswith(('_used', '_free', '_total')):
+            return f"{self._walk(field, 1, 64, 2):.1f} GB"
+        return SAMPLE_FIXED.get(field)
+
+    def values_for(self, fields: Iterable[str]) -> Dict[str, Any]:
+        """Retorna valores simulados apenas para os campos pedidos."""
+        values = {}
+        for field in fields:
+            value = self.value(field)
+            # Campos desconhecidos continuam visíveis no rótulo
+            if value is not None:
+                values[field] = value
+        return values
+
+
+class PreviewTicker:
+    """Temporizador compartilhado que dispara os widgets vencidos.
+
+    schedule(delay_ms, callback) deve agendar o callback e retornar um
+    identificador aceito por cancel(); no painel são root.after e
+    root.after_cancel.
+    """
+
+    def __init__(self, schedule: Callable, cancel: Callable,
+                 on_due: Callable[[List[str]], None],
+                 clock: Callable[[], float] = time.monotonic):
+        self.schedule = schedule
+        self.cancel = cancel
+        self.on_due = on_due
+        self.clock = clock
+        self.intervals: Dict[str, float] = {}
+        self.heap: List = []
+        self.pending = None
+        self.pending_due: Optional[float] = None
+
+    def set_widgets(self, intervals: Dict[str, int]):
+        """Define os widgets animados e seus intervalos (ms)."""
+        now = self.clock()
+        self.intervals = {name: max(MIN_TICK_INTERVAL, interval) / 1000.0
+                          for name, interval in intervals.items()}
+        self.heap = [(now + interval, name) for name, interval in self.intervals.items()]
+        heapq.heapify(self.heap)
+        self._arm()
+
+    def stop(self):
+        """Para o temporizador."""
+        self.intervals = {}
+        self.heap = []
+        self._disarm()
+
+    def _disarm(self):
+        if self.pending is not None:
+            self.cancel(self.pending)
+        self.pending = None
+        self.pending_due = None
+
+    def _arm(self):
+        """Agenda um único disparo para o próximo vencimento."""
+        if not self.heap:
+            self._disarm()
+            return
+
+        next_due = self.heap[0][0]
+        if self.pending is not None and self.pending_due == next_due:
+            return
+
+        self._disarm()
+        delay_ms = max(0, math.ceil((next_due - self.clock()) * 1000))
+        self.pending_due = next_due
+        self.pending = self.schedule(delay_ms, self._tick)
+
+    def _tick(self):
+        """Dispara todos os widgets vencidos e reagenda o temporizador."""
+        self.pending = None
+        self.pending_due = None
+        now = self.clock()
+
+        due = []
+        while self.heap and self.heap[0][0] <= now:
+            due_time, name = heapq.heappop(self.heap)
+            interval = self.intervals.get(name)
+            if interval is None:
+                continue
+            due.append(name)
+            # Reagendar a partir do vencimento anterior para não acumular atraso
+            next_due = due_time + interval
+            if next_due <= now:
+                next_due = now + interval
+            heapq.heappush(self.heap, (next_due, name))
+
+        if due:
+            self.on_due(due)
+        self._arm()
+
+
+class RedrawScheduler:
+    """Agrupa pedidos de redesenho em no máximo um por intervalo de quadro.
+
+    Pedidos que chegam enquanto há um redesenho pendente são mesclados a
+    ele: redraw(kinds) recebe o conjunto de tipos pedidos, por exemplo
+    {'layout'} para um redimensionamento ou {'full'} para uma mudança na
+    configuração.
+    """
+
+    def __init__(self, schedule: Callable, redraw: Callable[[set], None],
+                 frame_interval: int = 33, clock: Callable[[], float] = time.monotonic):
+        self.schedule = schedule
+        self.redraw = redraw
+        self.frame_interval = frame_interval / 1000.0
+        self.clock = clock
+        self.kinds: set = set()
+        self.pending = None
+        self.last_run: Optional[float] = None
+        self.requests = 0
+        self.runs = 0
+
+    def request(self, kind: str = 'full'):
+        """Pede um redesenho; é mesclado a um pedido pendente se houver."""
+        self.requests += 1
+        self.kinds.add(kind)
+        if self.pending is not None:
+            return
+
+        delay = 0.0
+        if self.last_run is not None:
+            delay = max(0.0, self.last_run + self.frame_interval - self.clock())
+        self.pending = self.schedule(math.ceil(delay * 1000), self._run)
+
+    def _run(self):
+        kinds, self.kinds = self.kinds, set()
+        self.pending = None
+        self.last_run = self.clock()
+        self.runs += 1
+        self.redraw(kinds)
@@ -0,0 +1,286 @@
+"""
+Módulo com o histórico de versões salvas (snapshots) da configuração.
+
+Cada gravação vira um snapshot em um repositório local endereçado por
+conteúdo, no estilo do git: cada dicionário e lista é um objeto, gravado
+comprimido com zlib em "objects/<hash>", que referencia os filhos pelo
+hash. Subárvores iguais têm o mesmo hash e são gravadas uma única vez,
+então centenas de versões quase idênticas ocupam pouco espaço. O índice
+(index.json) lista os snapshots com data, rótulo e hash da raiz.
+
+Dicionários e listas grandes (como a seção de widgets) são divididos em
+páginas com fronteiras definidas pelo conteúdo, para que alterar um item
+regrave só a sua página, e não o nó inteiro.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+import zlib
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Tuple
+
+from config_history import FrozenMap
+from config_io import atomic_write
+
+SNAPSHOT_SUFFIX = ".snapshots"
+INDEX_VERSION = 1
+
+# Tamanho médio das páginas em que dicionários e listas grandes são divididos
+PAGE_SIZE = 32
+
+# Limites padrão da coleta de lixo
+DEFAULT_MAX_SNAPSHOTS = 200
+DEFAULT_MAX_AGE_DAYS = 90
+
+
+def snapshot_dir(config_path: str) -> str:
+    """Diretório de snapshots de um arquivo de configuração."""
+    return config_path + SNAPSHOT_SUFFIX
+
+
+def _split_pages(entries: List[Any]) -> List[List[Any]]:
+    """Divide entradas em páginas; a fronteira depende só da própria entrada.
+
+    Assim uma inserção ou remoção muda apenas a página em que acontece.
+    """
+    pages = []
+    page = []
+    for entry in entries:
+        page.append(entry)
+        key = json.dumps(entry[0] if isinstance(entry, list) else entry, default=str)
+        if zlib.crc32(key.encode('utf-8')) % PAGE_SIZE == 0:
+            pages.append(page)
+            page = []
+    if page:
+        pages.append(page)
+    return pages
+
+
+class SnapshotInfo(NamedTuple):
+    """Entrada do índice de snapshots."""
+    snapshot_id: int
+    created: float
+    root: str
+    label: str
+    new_objects: int
+
+
+class SnapshotStore:
+    """Repositório de snapshots endereçado por conteúdo.
+
+    Árvores congeladas (FrozenMap/tuplas) têm o hash de cada nó lembrado
+    entre gravações; como o histórico reaproveita os nós inalterados, um
+    snapshot novo só calcula o hash dos ramos que mudaram.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.objects_dir = os.path.join(directory, "objects")
+        self.index_path = os.path.join(directory, "index.json")
+        self.lock = threading.Lock()
+        self.known_objects: Optional[Set[str]] = None
+        self.node_hashes: Dict[int, Tuple[Any, str]] = {}
+
+    # Índice
+
+    def list(self) -> List[SnapshotInfo]:
+        """Snapshots do mais recente para o mais antigo."""
+        return list(reversed(self._read_index()))
+
+    def _read_index(self) -> List[SnapshotInfo]:
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as file:
+                data = json.load(file)
+            return [SnapshotInfo(*entry) for entry in data['snapshots']]
+        except (OSError, ValueError, KeyError, TypeError):
+            return []
+
+    def _write_index(self, snapshots: List[SnapshotInfo]):
+        data = {'version': INDEX_VERSION, 'snapshots': [list(entry) for entry in snapshots]}
+        atomic_write(self.index_path, json.dumps(data, ensure_ascii=False).encode('utf-8'))
+
+    # Objetos
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.objects_dir, digest[:2], digest[2:])
+
+    def _load_known_objects(self) -> Set[str]:
+        if self.known_objects is None:
+            self.known_objects = set()
+            if os.path.isdir(self.objects_dir):
+                for prefix in os.listdir(self.objects_dir):
+                    folder = os.path.join(self.objects_dir, prefix)
+                    if os.path.isdir(folder):
+                        self.known_objects.update(prefix + name for name in os.listdir(folder)
+                                                  if not name.endswith('.tmp'))
+        return self.known_objects
+
+    def _write_object(self, digest: str, data: bytes) -> bool:
+        known = self._load_known_objects()
+        if digest in known:
+            return False
+        path = self._object_path(digest)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = path + '.tmp'
+        with open(temp_path, 'wb') as file:
+            file.write(zlib.compress(data))
+        os.replace(temp_path, path)
+        known.add(digest)
+        return True
+
+    def _read_object(self, digest: str) -> Any:
+        with open(self._object_path(digest), 'rb') as file:
+            return json.loads(zlib.decompress(file.read()))
+
+    def _store(self, value: Any, hashes: Dict[int, Tuple[Any, str]], written: List[int]) -> Any:
+        """Grava value e retorna a referência usada pelo nó pai."""
+        frozen = isinstance(value, (FrozenMap, tuple))
+        if frozen:
+            cached = self.node_hashes.get(id(value))
+            if cached is not None and cached[0] is value:
+                self._carry(value, hashes)
+                return {"#": cached[1]}
+
+        if isinstance(value, (FrozenMap, dict)):
+            items = value.items if isinstance(value, FrozenMap) else value
+            kind, entries = "d", [[key, self._store(child, hashes, written)] for key, child in items.items()]
+        elif isinstance(value, (tuple, list)):
+            kind, entries = "l", [self._store(child, hashes, written) for child in value]
+        else:
+            return value
+
+        if len(entries) > PAGE_SIZE:
+            pages = [self._write_node([kind, page], written) for page in _split_pages(entries)]
+            digest = self._write_node([kind.upper(), [{"#": page} for page in pages]], written)
+        else:
+            digest = self._write_node([kind, entries], written)
+        if frozen:
+            hashes[id(value)] = (value, digest)
+        # Em um nó pai, um dicionário é sempre uma referência (filhos nunca ficam embutidos)
+        return {"#": digest}
+
+    def _write_node(self, node: list, written: List[int]) -> str:
+        data = json.dumps(node, ensure_ascii=False, separators=(',', ':'), default=str).encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+        if self._write_object(digest, data):
+            written[0] += 1
+        return digest
+
+    def _carry(self, value: Any, hashes: Dict[int, Tuple[Any, str]]):
+        """Copia os hashes já conhecidos de uma subárvore inalterada."""
+        stack = [value]
+        while stack:
+            node = stack.pop()
+            entry = self.node_hashes.get(id(node))
+            if entry is None or entry[0] is not node:
+                continue
+            hashes[id(node)] = entry
+            stack.extend(node.items.values() if isinstance(node, FrozenMap) else node)
+
+    def _load(self, reference: Any) -> Any:
+        if not isinstance(reference, dict):
+            return reference
+        kind, children = self._read_object(reference["#"])
+        if kind == "d":
+            return {key: self._load(child) for key, child in children}
+        if kind == "D":
+            merged = {}
+            for page in children:
+                merged.update(self._load(page))
+            return merged
+        if kind == "L":
+            return [item for page in children for item in self._load(page)]
+        return [self._load(child) for child in children]
+
+    def _reachable(self, digest: str, seen: Set[str]):
+        stack = [digest]
+        while stack:
+            current = stack.pop()
+            if current in seen:
+                continue
+            seen.add(current)
+            kind, children = self._read_object(current)
+            references = (child for _, child in children) if kind == "d" else children
+            stack.extend(child["#"] for child in references if isinstance(child, dict))
+
+    # Operações
+
+    def save(self, config: Any, label: str = "") -> Optional[SnapshotInfo]:
+        """Grava um snapshot (configuração comum ou árvore congelada).
+
+        Retorna None, sem criar entrada, se o conteúdo é igual ao último.
+        """
+        with self.lock:
+            hashes: Dict[int, Tuple[Any, str]] = {}
+            written = [0]
+            root = self._store(config, hashes, written)["#"]
+            self.node_hashes = hashes
+
+            snapshots = self._read_index()
+            if snapshots and snapshots[-1].root == root:
+                return None
+            snapshot_id = snapshots[-1].snapshot_id + 1 if snapshots else 1
+            info = SnapshotInfo(snapshot_id, time.time(), root, label, written[0])
+            snapshots.append(info)
+            self._write_index(snapshots)
+            return info
+
+    def load(self, snapshot_id: int) -> Dict[str, Any]:
+        """Reconstrói a configuração de um snapshot."""
+        for info in self._read_index():
+            if info.snapshot_id == snapshot_id:
+                return self._load({"#": info.root})
+        raise KeyError(f"Snapshot {snapshot_id} não encontrado")
+
+    def collect_garbage(self, max_count: Optional[int] = DEFAULT_MAX_SNAPSHOTS,
+                        max_age_days: Optional[float] = DEFAULT_MAX_AGE_DAYS,
+                        now: Optional[float] = None) -> Tuple[int, int]:
+        """Descarta snapshots antigos e os objetos que ficaram sem uso.
+
+        O snapshot mais recente é sempre mantido. Retorna (snapshots
+        removidos, objetos removidos).
+        """
+        with self.lock:
+            snapshots = self._read_index()
+            kept = snapshots
+            if max_age_days is not None:
+                limit = (time.time() if now is None else now) - max_age_days * 86400
+                kept = [info for info in kept if info.created >= limit]
+            if max_count is not None:
+                kept = kept[-max_count:] if max_count > 0 else []
+            if not kept and snapshots:
+                kept = snapshots[-1:]
+            removed_snapshots = len(snapshots) - len(kept)
+            if not removed_snapshots:
+                return 0, 0
+            self._write_index(kept)
+
+            # Marcar os objetos alcançáveis e apagar o resto
+            reachable: Set[str] = set()
+            for info in kept:
+                self._reachable(info.root, reachable)
+            removed_objects = 0
+            for digest in list(self._load_known_objects()):
+                if digest not in reachable:
+                    try:
+                        os.remove(self._object_path(digest))
+                    except OSError:
+                        continue
+                    self.known_objects.discard(digest)
+                    removed_objects += 1
+            self.node_hashes = {key: entry for key, entry in self.node_hashes.items()
+                                if entry[1] in reachable}
+            return removed_snapshots, removed_objects
+
+    def disk_usage(self) -> int:
+        """Espaço ocupado pelos objetos e pelo índice, em bytes."""
+        total = 0
+        for folder, _, files in os.walk(self.directory):
+            for name in files:
+                try:
+                    total += os.path.getsize(os.path.join(folder, name))
+                except OSError:
+                    pass
+        return total
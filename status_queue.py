@@ -0,0 +1,126 @@
+"""
+Módulo com a fila de mensagens da barra de status.
+
+As mensagens são enfileiradas e exibidas no máximo uma vez por quadro,
+sem forçar o Tk a redesenhar a cada mensagem de um laço. Trabalhos longos
+têm contadores de progresso que as threads podem avançar: elas só mexem
+na fila e nos contadores (protegidos por trava), nunca no Tk; quem exibe
+é a thread da interface. As mensagens recentes ficam em um histórico.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, List, NamedTuple, Optional
+
+from preview_ticker import RedrawScheduler
+
+# Mensagens guardadas no histórico
+DEFAULT_HISTORY_SIZE = 200
+
+
+class StatusMessage(NamedTuple):
+    """Mensagem exibida na barra de status."""
+    time: float
+    text: str
+
+
+class ProgressJob:
+    """Contador de progresso de um trabalho longo (seguro entre threads)."""
+
+    def __init__(self, status: "StatusQueue", label: str, total: int):
+        self.status = status
+        self.label = label
+        self.total = max(0, total)
+        self.done = 0
+        self.finished = False
+
+    def advance(self, count: int = 1):
+        """Conta itens concluídos; pode ser chamado de qualquer thread."""
+        with self.status.lock:
+            self.done = min(self.total, self.done + count) if self.total else self.done + count
+        self.status.changed()
+
+    def finish(self, text: Optional[str] = None):
+        """Encerra o trabalho, opcionalmente com uma mensagem final."""
+        with self.status.lock:
+            self.finished = True
+        if text is not None:
+            self.status.post(text)
+        else:
+            self.status.changed()
+
+    def describe(self) -> str:
+        """Texto do progresso, como "Gerando: 3/12 (25%)"."""
+        if not self.total:
+            return f"{self.label}: {self.done}"
+        return f"{self.label}: {self.done}/{self.total} ({self.done * 100 // self.total}%)"
+
+
+class StatusQueue:
+    """Fila de mensagens exibidas no máximo uma vez por quadro.
+
+    schedule é o root.after do painel e show(text, messages) recebe o texto
+    da barra e as mensagens novas desde a última exibição; ambos só são
+    chamados na thread que criou a fila. Chamadas de outras threads apenas
+    enfileiram: elas aparecem no próximo quadro, que é agendado sem parar
+    enquanto houver trabalhos com progresso em andamento.
+    """
+
+    def __init__(self, schedule: Callable, show: Callable[[str, List[StatusMessage]], None],
+                 frame_interval: int = 33, history_size: int = DEFAULT_HISTORY_SIZE,
+                 clock: Callable[[], float] = time.time):
+        self.show = show
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.owner = threading.get_ident()
+        self.scheduler = RedrawScheduler(schedule, lambda kinds: self.flush(), frame_interval)
+        self.pending: List[StatusMessage] = []
+        self.history: Deque[StatusMessage] = deque(maxlen=history_size)
+        self.jobs: List[ProgressJob] = []
+        self.text = ""
+        self.posts = 0
+        self.flushes = 0
+
+    def post(self, text: str):
+        """Enfileira uma mensagem; pode ser chamado de qualquer thread."""
+        with self.lock:
+            self.pending.append(StatusMessage(self.clock(), text))
+            self.posts += 1
+        self.changed()
+
+    def start_job(self, label: str, total: int) -> ProgressJob:
+        """Começa um trabalho com progresso (chame na thread da interface)."""
+        job = ProgressJob(self, label, total)
+        with self.lock:
+            self.jobs.append(job)
+        self.changed()
+        return job
+
+    def changed(self):
+        """Pede uma exibição, se estiver na thread da interface."""
+        if threading.get_ident() == self.owner:
+            self.scheduler.request()
+
+    def flush(self):
+        """Exibe a última mensagem e o progresso dos trabalhos (thread da interface)."""
+        with self.lock:
+            messages, self.pending = self.pending, []
+            self.history.extend(messages)
+            active = [job for job in self.jobs if not job.finished]
+            self.jobs = active
+            progress = [job.describe() for job in active]
+        if messages:
+            self.text = messages[-1].text
+        text = " | ".join([self.text] + progress) if progress else self.text
+        self.flushes += 1
+        self.show(text, messages)
+        if active:
+            # As threads não agendam: manter os quadros enquanto houver progresso
+            self.scheduler.request()
+
+    def recent(self, count: Optional[int] = None) -> List[StatusMessage]:
+        """Mensagens mais recentes do histórico, da mais antiga à mais nova."""
+        with self.lock:
+            messages = list(self.history)
+        return messages if count is None else messages[-count:]
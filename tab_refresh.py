@@ -0,0 +1,83 @@
+"""
+Módulo com a atualização das abas do painel conforme a visibilidade.
+
+As alterações da configuração marcam as abas afetadas como pendentes
+(com as chaves alteradas, como nomes de widgets, ou ALL para a aba
+inteira). Só a aba visível é atualizada na hora; as outras acumulam as
+pendências e são atualizadas uma única vez quando selecionadas. O tempo
+de cada atualização é registrado no logging.
+"""
+
+import logging
+import time
+from typing import Callable, Dict, Iterable, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# Chave que pede a atualização da aba inteira
+ALL = object()
+
+
+class TabRefresher:
+    """Pendências de atualização por aba.
+
+    visible_tab() retorna o nome da aba visível (ou None); cada aba tem um
+    handler(keys) que a atualiza a partir das chaves pendentes.
+    """
+
+    def __init__(self, visible_tab: Callable[[], Optional[str]],
+                 clock: Callable[[], float] = time.perf_counter):
+        self.visible_tab = visible_tab
+        self.clock = clock
+        self.handlers: Dict[str, Callable[[Set], None]] = {}
+        self.dirty: Dict[str, Set] = {}
+        self.refreshes: Dict[str, int] = {}
+        self.last_elapsed: Dict[str, float] = {}
+
+    def register(self, tab: str, handler: Callable[[Set], None]):
+        """Define como a aba é atualizada."""
+        self.handlers[tab] = handler
+        self.refreshes.setdefault(tab, 0)
+
+    def invalidate(self, tab: str, keys: Optional[Iterable] = None):
+        """Marca chaves da aba (ou a aba inteira) como pendentes."""
+        pending = self.dirty.setdefault(tab, set())
+        if ALL in pending:
+            return
+        if keys is None:
+            pending.clear()
+            pending.add(ALL)
+        else:
+            pending.update(keys)
+            if not pending:
+                del self.dirty[tab]
+
+    def invalidate_all(self):
+        """Marca todas as abas como pendentes por inteiro."""
+        for tab in self.handlers:
+            self.invalidate(tab)
+
+    def is_dirty(self, tab: str) -> bool:
+        return tab in self.dirty
+
+    def flush(self, tab: Optional[str] = None) -> float:
+        """Atualiza a aba (a visível, por padrão) se ela tem pendências.
+
+        Retorna o tempo gasto, em segundos.
+        """
+        tab = tab if tab is not None else self.visible_tab()
+        keys = self.dirty.pop(tab, None) if tab in self.handlers else None
+        if keys is None:
+            return 0.0
+        start = self.clock()
+        self.handlers[tab](keys)
+        elapsed = self.clock() - start
+        self.refreshes[tab] += 1
+        self.last_elapsed[tab] = elapsed
+        logger.debug("Aba '%s' atualizada em %.1f ms (%s)", tab, elapsed * 1000,
+                     "inteira" if ALL in keys else f"{len(keys)} item(ns)")
+        return elapsed
+
+    def pending_tabs(self) -> Set[str]:
+        """Abas com atualizações adiadas."""
+        return set(self.dirty)
@@ -5,6 +5,7 @@ Script de teste para validar as funcionalidades do painel de controle YASB.
 
 import yaml
 import os
+import sys
 import json
 from pathlib import Path
 
@@ -272,6 +273,1564 @@ def test_file_operations():
     return True
 
 
+def test_command_profiler():
+    """Testa o perfil de comandos dos CustomWidget."""
+    print("\n=== Testando perfil de comandos ===")
+    
+    from command_profiler import collect_custom_commands, profile_custom_widgets
+    
+    python = f'"{sys.executable}"'
+    config = {
+        "widgets": {
+            "fast": {
+                "type": "yasb.custom.CustomWidget",
+                "options": {"command": f'{python} -c "print(123)"', "update_interval": 60000}
+            },
+            "stuck": {
+                "type": "yasb.custom.CustomWidget",
+                "options": {"command": f'{python} -c "import time; time.sleep(10)"', "update_interval": 1000}
+            },
+            "clock": {
+                "type": "yasb.clock.ClockWidget",
+                "options": {"label": "{%H:%M:%S}"}
+            }
+        }
+    }
+    
+    try:
+        if len(collect_custom_commands(config)) != 2:
+            print("❌ Comandos personalizados não coletados corretamente")
+            return False
+        
+        results = {r['name']: r for r in profile_custom_widgets(config, runs=2, timeout=1.0)}
+        fast, stuck = results['fast'], results['stuck']
+        
+        if fast['flagged'] or fast['runs'] != 2 or fast['output_bytes'] < 3:
+            print(f"❌ Comando rápido medido incorretamente: {fast}")
+            return False
+        if not stuck['flagged'] or not stuck['timeouts'] or stuck['wall_max'] > 5:
+            print(f"❌ Comando travado não foi interrompido: {stuck}")
+            return False
+        
+        print("✅ Perfil de comandos: OK")
+        print(f"   - Tempo do comando rápido: {fast['wall_mean'] * 1000:.1f} ms")
+        
+        if sys.platform != "win32":
+            # Limite de CPU aplicado pelo shell, sem preexec_fn
+            from command_profiler import run_command_once
+            sample = run_command_once("ulimit -t", timeout=2.0)
+            if sample['output'].strip() != b"3" or sample['timed_out']:
+                print(f"❌ Limite de CPU não aplicado: {sample}")
+                return False
+            print("✅ Limite de CPU: OK")
+    except Exception as e:
+        print(f"❌ Erro no perfil de comandos: {e}")
+        return False
+    
+    return True
+
+
+def test_preview_ticker():
+    """Testa o temporizador compartilhado do preview."""
+    print("\n=== Testando temporizador do preview ===")
+    
+    from preview_ticker import PreviewTicker, SampleDataProvider
+    from label_templates import render_label, placeholders
+    
+    clock = {'now': 0.0}
+    scheduled = []
+    fired = []
+    
+    def schedule(delay_ms, callback):
+        scheduled.append((delay_ms, callback))
+        return len(scheduled)
+    
+    ticker = PreviewTicker(schedule, lambda handle: None, fired.append, clock=lambda: clock['now'])
+    ticker.set_widgets({"clock": 1000, "cpu": 2000, "weather": 600000})
+    
+    # Simular 4 segundos disparando apenas quando agendado
+    while clock['now'] < 4.0:
+        delay_ms, callback = scheduled[-1]
+        clock['now'] += delay_ms / 1000.0
+        callback()
+    
+    ticks = [name for batch in fired for name in batch]
+    if ticks.count("clock") != 4 or ticks.count("cpu") != 2 or "weather" in ticks:
+        print(f"❌ Disparos incorretos: {fired}")
+        return False
+    if len(scheduled) != 5:
+        print(f"❌ Agendamentos em excesso: {len(scheduled)}")
+        return False
+    print("✅ Temporizador compartilhado: OK")
+    
+    # Pedidos de redesenho agrupados por quadro
+    from preview_ticker import RedrawScheduler
+    pending = []
+    redraws = []
+    redraw = RedrawScheduler(lambda delay, callback: pending.append(callback) or len(pending),
+                             redraws.append, frame_interval=33, clock=lambda: clock['now'])
+    for _ in range(20):
+        redraw.request('layout')
+    redraw.request('full')
+    pending.pop(0)()
+    if len(pending) != 0 or redraws != [{'layout', 'full'}]:
+        print(f"❌ Redesenhos não foram agrupados: {redraws}")
+        return False
+    print("✅ Agrupamento de redesenhos: OK")
+    
+    provider = SampleDataProvider(seed=1)
+    template = "CPU: {cpu_percent}% {unknown}"
+    text = render_label(template, provider.values_for(placeholders(template)))
+    if not text.startswith("CPU: ") or "{unknown}" not in text:
+        print(f"❌ Rótulo renderizado incorretamente: {text}")
+        return False
+    print("✅ Rótulo com dados simulados: OK")
+    print(f"   - {text}")
+    
+    return True
+
+
+def test_label_templates():
+    """Testa a compilação e validação dos rótulos."""
+    print("\n=== Testando rótulos dos widgets ===")
+    
+    import time
+    from label_templates import compile_label, validate_label, validate_widget_labels
+    
+    now = time.strptime("2024-01-02 03:04:05", "%Y-%m-%d %H:%M:%S")
+    label = compile_label("{%H:%M:%S} CPU: {cpu_percent}% {{")
+    if compile_label("{%H:%M:%S} CPU: {cpu_percent}% {{") is not label:
+        print("❌ Rótulo não foi reaproveitado do cache")
+        return False
+    if label.render({"cpu_percent": 42}, now) != "03:04:05 CPU: 42% {{":
+        print(f"❌ Renderização incorreta: {label.render({'cpu_percent': 42}, now)}")
+        return False
+    if not label.errors:
+        print("❌ Chaves sem par não foram detectadas")
+        return False
+    print("✅ Compilação e renderização de rótulos: OK")
+    
+    if validate_label("CPU: {cpu_percnt}%", "yasb.cpu.CpuWidget") == []:
+        print("❌ Campo com erro de digitação não foi detectado")
+        return False
+    if validate_label("{%H:%M:%Q}", "yasb.clock.ClockWidget") == []:
+        print("❌ Diretiva strftime inválida não foi detectada")
+        return False
+    if validate_label("{anything}", "yasb.custom.CustomWidget") != []:
+        print("❌ CustomWidget deveria aceitar qualquer campo")
+        return False
+    
+    with open('config_example.yaml', 'r', encoding='utf-8') as file:
+        config = yaml.safe_load(file)
+    errors = validate_widget_labels(config)
+    if errors:
+        print(f"❌ Exemplo de configuração com rótulos inválidos: {errors}")
+        return False
+    print("✅ Validação de rótulos: OK")
+    
+    # Renderizar milhares de rótulos em um quadro
+    labels = [compile_label(f"Item {i}: {{cpu_percent}}% {{%H:%M}}") for i in range(5000)]
+    start = time.perf_counter()
+    time_cache = {}
+    for item in labels:
+        item.render({"cpu_percent": 10}, now, time_cache)
+    elapsed = time.perf_counter() - start
+    print(f"   - 5000 rótulos renderizados em {elapsed * 1000:.1f} ms")
+    
+    return True
+
+
+def test_preview_canvas_cache():
+    """Testa o reaproveitamento dos itens do canvas do preview."""
+    print("\n=== Testando cache de itens do preview ===")
+    
+    from preview_canvas import CanvasItemCache, PreviewEntry, RecordingCanvas
+    
+    canvas = RecordingCanvas()
+    cache = CanvasItemCache(canvas)
+    layout = [PreviewEntry("clock", 10, 25, "12:00", "#fff", "w"),
+              PreviewEntry("cpu", 80, 25, "CPU: 5%", "#fff", "w"),
+              PreviewEntry("battery", 700, 25, "🔋 90%", "#fff", "w")]
+    cache.sync(layout)
+    clock_item = cache.items["clock"]
+    
+    # Sem mudanças nenhuma operação deve ser feita
+    if sum(cache.sync(layout).values()) != 0:
+        print("❌ Sincronização sem mudanças alterou o canvas")
+        return False
+    
+    # Mover o cpu, ocultar a bateria e remover o relógio
+    stats = cache.sync([PreviewEntry("cpu", 10, 25, "CPU: 5%", "#fff", "w")], hidden=["battery"])
+    if stats != {'created': 0, 'deleted': 1, 'moved': 1, 'updated': 0, 'hidden': 1}:
+        print(f"❌ Operações incorretas: {stats}")
+        return False
+    
+    # Reexibir a bateria reaproveita o item
+    stats = cache.sync([PreviewEntry("battery", 700, 25, "🔋 90%", "#fff", "w")])
+    if stats['created'] or "battery" in cache.hidden or clock_item in cache.items.values():
+        print(f"❌ Item oculto não foi reaproveitado: {stats}")
+        return False
+    
+    print("✅ Cache de itens do preview: OK")
+    print(f"   - Operações no canvas: {canvas.total_calls()}")
+    return True
+
+
+def test_preview_layout():
+    """Testa o cálculo de layout do preview."""
+    print("\n=== Testando layout do preview ===")
+    
+    from preview_layout import TextMeasurer, compute_layout, layout_sections, describe_problems
+    
+    layout = compute_layout(((50, 30), (100,), (40,)), 800, 10, 20)
+    if layout.positions != ((10, 80), (350,), (750,)) or layout.overflow or layout.collisions:
+        print(f"❌ Posições incorretas: {layout}")
+        return False
+    if compute_layout(((50, 30), (100,), (40,)), 800, 10, 20) is not layout:
+        print("❌ Layout não foi reaproveitado do cache")
+        return False
+    print("✅ Posições das seções: OK")
+    
+    crowded = compute_layout(((300,), (300,), (300,)), 800, 10, 20)
+    if not crowded.overflow or ("left", "center") not in crowded.collisions:
+        print(f"❌ Transbordo não detectado: {crowded}")
+        return False
+    print("✅ Detecção de transbordo e colisões: OK")
+    print(f"   - {describe_problems(crowded)}")
+    
+    measurer = TextMeasurer()
+    sections = {"left": ["clock"], "center": [], "right": ["cpu"]}
+    texts = {"clock": "12:00:00", "cpu": "CPU: 10%"}
+    measure = lambda text: measurer.measure("Arial", 12, "normal", text)
+    layout_sections(sections, texts, measure, 800)
+    layout_sections(sections, texts, measure, 800)
+    if measurer.cache_info().hits < 2:
+        print("❌ Medições não foram reaproveitadas")
+        return False
+    print("✅ Cache de medições: OK")
+    
+    return True
+
+
+def test_bar_renderer():
+    """Testa a renderização da barra em PNG fora da tela."""
+    print("\n=== Testando renderização em PNG ===")
+    
+    import time
+    import zlib
+    from bar_renderer import render_bar, render_bar_png
+    
+    with open('config_example.yaml', 'r', encoding='utf-8') as file:
+        config = yaml.safe_load(file)
+    
+    image = render_bar(config, 800)
+    # Linha 1, x=10: acima do texto dos rótulos, só o fundo da barra
+    assert (image.width, image.height) == (800, 30), "❌ Dimensões incorretas"
+    assert bytes(image.rows[1][30:33]) == b'\x1e\x1e\x1e', "❌ Fundo incorreto"
+    if not any(bytes(row).count(b'\xff\xff\xff') for row in image.rows):
+        print("❌ Nenhum texto foi desenhado")
+        return False
+    
+    png = render_bar_png(config, 800)
+    if not png.startswith(b'\x89PNG\r\n\x1a\n') or png[12:16] != b'IHDR':
+        print("❌ Cabeçalho PNG inválido")
+        return False
+    idat_length = int.from_bytes(png[33:37], 'big')
+    raw = zlib.decompress(png[41:41 + idat_length])
+    if len(raw) != 30 * (800 * 3 + 1):
+        print("❌ Dados de imagem com tamanho incorreto")
+        return False
+    print("✅ Renderização em PNG: OK")
+    
+    start = time.perf_counter()
+    render_bar_png(config, 3840)
+    elapsed = time.perf_counter() - start
+    print(f"   - Barra 4K renderizada em {elapsed * 1000:.1f} ms")
+    if elapsed > 1.0:
+        print("❌ Renderização 4K muito lenta")
+        return False
+    
+    # Folha de contatos renderizada em um pool de processos
+    from contact_sheet import build_contact_sheet
+    themes = {"Atual": None, "Claro": {"background_color": "#ffffff", "text_color": "#000000"}}
+    sheet = build_contact_sheet(config, [640, 1280], themes, max_workers=2)
+    if sheet.width != 10 + 650 + 1290 or sheet.height < 2 * 30:
+        print(f"❌ Folha de contatos com dimensões incorretas: {sheet.width}x{sheet.height}")
+        return False
+    print("✅ Folha de contatos: OK")
+    
+    return True
+
+
+def test_bar_index():
+    """Testa o índice de widgets por barra."""
+    print("\n=== Testando configuração com várias barras ===")
+    
+    from config_index import BarIndex
+    
+    config = {
+        'bars': {
+            'barra-1': {'widgets': {'left': ['clock'], 'center': [], 'right': ['cpu']}},
+            'barra-2': {'dimensions': {'height': 40}, 'widgets': {'left': [], 'center': ['clock'], 'right': []}}
+        },
+        'widgets': {}
+    }
+    index = BarIndex(config)
+    
+    if index.position('clock', 'barra-1') != 'left' or index.position('clock', 'barra-2') != 'center':
+        print("❌ Posições por barra incorretas")
+        return False
+    if index.position('cpu', 'barra-2') != 'N/A':
+        print("❌ Widget ausente deveria retornar N/A")
+        return False
+    print("✅ Posições por barra: OK")
+    
+    index.place('memory', 'barra-2', 'right')
+    index.add_bar('barra-3', config['bars']['barra-2'])
+    if config['bars']['barra-3'] != {'dimensions': {'height': 40}, 'widgets': {'left': [], 'center': [], 'right': []}}:
+        print("❌ Nova barra não copiou as opções corretamente")
+        return False
+    
+    removed = index.unplace_many(['clock'])
+    if removed != 2 or index.bars_of('clock') or 'clock' in config['bars']['barra-1']['widgets']['left']:
+        print(f"❌ Remoção incorreta: {removed}")
+        return False
+    if 'clock' in config['bars']['barra-2']['widgets']['center']:
+        print("❌ Widget não foi removido da segunda barra")
+        return False
+    
+    index.remove_bar('barra-2')
+    if index.bars != ['barra-1', 'barra-3'] or index.bars_of('memory'):
+        print("❌ Remoção de barra não atualizou o índice")
+        return False
+    print("✅ Criação e remoção de barras: OK")
+    
+    return True
+
+
+def test_bulk_widget_operations():
+    """Testa as operações em lote sobre muitos widgets."""
+    print("\n=== Testando operações em lote ===")
+    
+    import time
+    from config_index import BarIndex
+    from widget_ops import toggle_widgets, remove_widgets, duplicate_widgets, move_widgets
+    
+    count = 5000
+    names = [f"widget_{i}" for i in range(count)]
+    config = {
+        'bars': {'yasb-bar': {'widgets': {'left': names[:count // 2], 'center': [],
+                                          'right': names[count // 2:]}}},
+        'widgets': {name: {'type': 'yasb.custom.CustomWidget', 'enabled': True} for name in names}
+    }
+    index = BarIndex(config)
+    
+    start = time.perf_counter()
+    if toggle_widgets(config, names) is not False or config['widgets']['widget_0']['enabled']:
+        print("❌ Alternância em lote incorreta")
+        return False
+    copies = duplicate_widgets(config, index, names[:1000])
+    moved = move_widgets(config, index, names[::2], 'yasb-bar', 'center')
+    removed = remove_widgets(config, index, names[1::2])
+    elapsed = time.perf_counter() - start
+    
+    sections = config['bars']['yasb-bar']['widgets']
+    if len(copies) != 1000 or index.position('widget_0_copy', 'yasb-bar') != 'left':
+        print("❌ Duplicação em lote incorreta")
+        return False
+    if moved != names[::2] or sections['center'] != names[::2] or \
+            index.position('widget_2', 'yasb-bar') != 'center':
+        print("❌ Movimentação em lote incorreta")
+        return False
+    if len(removed) != count // 2 or any(name in config['widgets'] for name in removed):
+        print("❌ Remoção em lote incorreta")
+        return False
+    if len(sections['left']) + len(sections['right']) != len(copies):
+        print("❌ Seções com widgets removidos")
+        return False
+    print(f"✅ Operações em lote com {count} widgets em {elapsed * 1000:.1f} ms")
+    if elapsed > 2.0:
+        print("❌ Operações em lote muito lentas")
+        return False
+    
+    return True
+
+
+def test_widget_duplication():
+    """Testa a alocação de nomes e a duplicação de widgets."""
+    print("\n=== Testando duplicação de widgets ===")
+    
+    import time
+    from config_index import BarIndex
+    from config_io import dump_yaml
+    from widget_ops import NameAllocator, duplicate_widgets
+    
+    config = {
+        'bars': {'yasb-bar': {'widgets': {'left': ['clock'], 'center': [], 'right': []}}},
+        'widgets': {
+            'clock': {'type': 'yasb.clock.ClockWidget', 'options': {'label': '{%H:%M}'}},
+            'clock_copy': {'type': 'yasb.clock.ClockWidget', 'options': {}}
+        }
+    }
+    index = BarIndex(config)
+    allocator = NameAllocator()
+    
+    first = duplicate_widgets(config, index, ['clock'], allocator)
+    if first != ['clock_copy_1']:
+        print(f"❌ Nome da cópia incorreto: {first}")
+        return False
+    
+    count = 20000
+    start = time.perf_counter()
+    names = duplicate_widgets(config, index, ['clock'], allocator)
+    for _ in range(count - 1):
+        names += duplicate_widgets(config, index, ['clock'], allocator)
+    elapsed = time.perf_counter() - start
+    if len(set(names)) != count or names[-1] != f"clock_copy_{count + 1}":
+        print("❌ Nomes duplicados ou fora de ordem")
+        return False
+    print(f"✅ {count} duplicações em {elapsed * 1000:.1f} ms")
+    if elapsed > 2.0:
+        print("❌ Duplicação muito lenta")
+        return False
+    
+    widgets = config['widgets']
+    widgets['clock_copy_1']['enabled'] = False
+    if 'enabled' in widgets['clock'] or widgets['clock_copy_1']['options'] is widgets['clock']['options']:
+        print("❌ Cópia compartilha dados com o original")
+        return False
+    
+    # Editar uma opção da cópia pelo ConfigStore não altera o original
+    from config_store import ConfigStore
+    store = ConfigStore({
+        'bars': {'yasb-bar': {'widgets': {'left': ['clock']}}},
+        'widgets': {'clock': {'type': 'yasb.clock.ClockWidget', 'options': {'label': '{%H:%M}'}}}
+    })
+    copy_name, = store.duplicate_widgets(['clock'])
+    store.set(('widgets', copy_name, 'options', 'label'), 'X')
+    if store.data['widgets']['clock']['options']['label'] != '{%H:%M}':
+        print("❌ Edição da cópia alterou o original")
+        return False
+    
+    text = dump_yaml({'widgets': {name: widgets[name] for name in ('clock', 'clock_copy_1')}})
+    if '&id' in text or '*id' in text or text.count("{%H:%M}") != 2:
+        print("❌ YAML gerado com aliases")
+        return False
+    print("✅ Cópias independentes e YAML sem aliases: OK")
+    
+    return True
+
+
+def test_undo_history():
+    """Testa o histórico de desfazer/refazer com compartilhamento estrutural."""
+    print("\n=== Testando desfazer/refazer ===")
+    
+    from config_history import ConfigHistory, thaw
+    
+    config = {
+        'bars': {'yasb-bar': {'widgets': {'left': [f"w{i}" for i in range(500)], 'center': [], 'right': []}}},
+        'widgets': {f"w{i}": {'type': 'yasb.custom.CustomWidget', 'options': {'label': f"rótulo {i}"}}
+                    for i in range(500)}
+    }
+    history = ConfigHistory()
+    history.reset(config)
+    base_cost = history.memory_usage()
+    
+    config['widgets']['w7']['enabled'] = False
+    if not history.record("Desativar w7", config) or history.record("Sem mudança", config):
+        print("❌ Registro de alterações incorreto")
+        return False
+    
+    first, second = history.entries
+    if first.tree.items['bars'] is not second.tree.items['bars']:
+        print("❌ Partes inalteradas não foram compartilhadas")
+        return False
+    if second.cost * 10 > base_cost:
+        print(f"❌ Edição pequena custou muita memória: {second.cost} de {base_cost} bytes")
+        return False
+    print(f"✅ Compartilhamento estrutural: edição custou {second.cost} de {base_cost} bytes")
+    
+    label, restored = history.undo()
+    if label != "Desativar w7" or 'enabled' in restored['widgets']['w7']:
+        print("❌ Desfazer não restaurou o estado anterior")
+        return False
+    label, restored = history.redo()
+    if restored['widgets']['w7'].get('enabled') is not False or history.redo() is not None:
+        print("❌ Refazer incorreto")
+        return False
+    print("✅ Desfazer/refazer: OK")
+    
+    # O orçamento de memória limita a profundidade do histórico
+    history = ConfigHistory(budget_bytes=base_cost + 5 * second.cost)
+    history.reset(config)
+    for i in range(50):
+        config['widgets'][f"w{i}"]['options'] = {'label': f"novo {i}"}
+        history.record(f"Editar w{i}", config)
+    if history.memory_usage() > history.budget or len(history.entries) >= 50:
+        print(f"❌ Orçamento não respeitado: {history.memory_usage()} bytes")
+        return False
+    if thaw(history.entries[-1].tree) != config:
+        print("❌ Último estado difere da configuração")
+        return False
+    print(f"✅ Orçamento de memória: {len(history.entries)} estados mantidos")
+    
+    return True
+
+
+def test_change_journal():
+    """Testa o diário de alterações e a recuperação após falha."""
+    print("\n=== Testando diário de alterações ===")
+    
+    import copy
+    import tempfile
+    from config_history import ConfigHistory, apply_operations, diff_trees
+    from config_journal import ChangeJournal, content_hash, journal_path, read_journal
+    
+    with open('config_example.yaml', 'rb') as file:
+        saved_bytes = file.read()
+    config = yaml.safe_load(saved_bytes)
+    saved = copy.deepcopy(config)
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        config_path = os.path.join(temp_dir, 'config.yaml')
+        scheduled = []
+        journal = ChangeJournal(schedule=lambda delay, callback: scheduled.append(callback))
+        journal.start(config_path, content_hash(saved_bytes))
+        
+        history = ConfigHistory()
+        history.reset(config)
+        journal_tree = history.current()
+        
+        # Várias edições, como as feitas pelo painel
+        widget_name = next(iter(config['widgets']))
+        edits = [
+            lambda: config['widgets'][widget_name].update(enabled=False),
+            lambda: config['widgets'].update(novo={'type': 'yasb.custom.CustomWidget', 'options': {'label': 'ção'}}),
+            lambda: config['widgets'].pop(widget_name),
+        ]
+        for edit in edits:
+            edit()
+            history.record("Editar", config)
+            operations = diff_trees(journal_tree, history.current())
+            journal_tree = history.current()
+            journal.append(operations)
+        
+        if len(scheduled) != 1 or read_journal(journal_path(config_path))[1]:
+            print("❌ Gravações do diário deveriam ser agrupadas no temporizador")
+            return False
+        scheduled.pop()()
+        print(f"✅ Gravação em lote: {journal.records_written} registros em um flush")
+        
+        # Simular uma falha: linha final incompleta
+        with open(journal_path(config_path), 'a', encoding='utf-8') as file:
+            file.write('["s",["widg')
+        
+        base_hash, operations = read_journal(journal_path(config_path))
+        if base_hash != content_hash(saved_bytes):
+            print("❌ Hash base do diário incorreto")
+            return False
+        recovered = apply_operations(copy.deepcopy(saved), operations)
+        if recovered != config or list(recovered['widgets']) != list(config['widgets']):
+            print("❌ Reaplicar o diário não reproduziu a configuração")
+            return False
+        print("✅ Recuperação a partir do diário: OK")
+        
+        # Salvar compacta o diário para apenas o cabeçalho
+        journal.start(config_path, content_hash(b"novo conteudo"))
+        with open(journal_path(config_path), 'r', encoding='utf-8') as file:
+            if len(file.read().splitlines()) != 1:
+                print("❌ Diário não foi compactado")
+                return False
+        print("✅ Compactação ao salvar: OK")
+    
+    return True
+
+
+def test_atomic_save():
+    """Testa a gravação atômica e a detecção de conteúdo inalterado."""
+    print("\n=== Testando gravação atômica ===")
+    
+    import tempfile
+    import config_io
+    from config_io import save_config
+    
+    with open('config_example.yaml', 'r', encoding='utf-8') as file:
+        config = yaml.safe_load(file)
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        config_path = os.path.join(temp_dir, 'config.yaml')
+        
+        if not save_config(config_path, config):
+            print("❌ Primeira gravação não aconteceu")
+            return False
+        with open(config_path, 'r', encoding='utf-8') as file:
+            if yaml.safe_load(file) != config:
+                print("❌ Conteúdo gravado difere da configuração")
+                return False
+        
+        # Mesmo conteúdo (inclusive com as chaves em outra ordem): nada é gravado
+        mtime = os.stat(config_path).st_mtime_ns
+        reordered = dict(reversed(list(config.items())))
+        if save_config(config_path, reordered) or os.stat(config_path).st_mtime_ns != mtime:
+            print("❌ Gravação deveria ser pulada sem alterações")
+            return False
+        print("✅ Gravação pulada quando o conteúdo não mudou")
+        
+        # Falha no meio da gravação mantém o arquivo original intacto
+        config['widgets'] = {}
+        original_replace = config_io.os.replace
+        def failing_replace(*args):
+            raise OSError("falha simulada")
+        config_io.os.replace = failing_replace
+        try:
+            save_config(config_path, config)
+            print("❌ Falha simulada não foi propagada")
+            return False
+        except OSError:
+            pass
+        finally:
+            config_io.os.replace = original_replace
+        
+        with open(config_path, 'r', encoding='utf-8') as file:
+            if not yaml.safe_load(file)['widgets']:
+                print("❌ Arquivo original corrompido após falha")
+                return False
+        if os.listdir(temp_dir) != ['config.yaml']:
+            print(f"❌ Arquivos temporários restantes: {os.listdir(temp_dir)}")
+            return False
+        
+        if not save_config(config_path, config):
+            print("❌ Alteração real não foi gravada")
+            return False
+        print("✅ Gravação atômica: OK")
+    
+    return True
+
+
+def test_streaming_yaml():
+    """Testa a emissão do YAML em partes."""
+    print("\n=== Testando emissão de YAML em partes ===")
+    
+    from config_io import chunked, dump_yaml, iter_yaml
+    
+    with open('config_example.yaml', 'r', encoding='utf-8') as file:
+        config = yaml.safe_load(file)
+    config['widgets']['longo'] = {
+        'type': 'yasb.custom.CustomWidget',
+        'options': {'label': "texto muito longo com acentuação " * 8, 'vazio': {}, 'lista': []}
+    }
+    
+    parts = list(iter_yaml(config))
+    if "".join(parts) != dump_yaml(config):
+        print("❌ YAML em partes difere do yaml.dump")
+        return False
+    if len(parts) < len(config['widgets']):
+        print("❌ Widgets não foram emitidos separadamente")
+        return False
+    print(f"✅ YAML idêntico ao yaml.dump em {len(parts)} partes")
+    
+    blocks = list(chunked(parts, size=256))
+    if "".join(blocks) != "".join(parts) or len(blocks) >= len(parts):
+        print("❌ Agrupamento em blocos incorreto")
+        return False
+    if "".join(iter_yaml({})) != dump_yaml({}):
+        print("❌ Configuração vazia emitida incorretamente")
+        return False
+    print("✅ Blocos para o editor: OK")
+    
+    return True
+
+
+def test_file_watcher():
+    """Testa o observador de alterações externas do arquivo."""
+    print("\n=== Testando observador de arquivo ===")
+    
+    import tempfile
+    import time
+    from config_io import atomic_write
+    from config_watcher import FileWatcher
+    
+    def wait_for(watcher, timeout=5.0):
+        deadline = time.monotonic() + timeout
+        while watcher.changes.empty() and time.monotonic() < deadline:
+            time.sleep(0.02)
+        time.sleep(0.3)  # Garantir que nenhum aviso extra chegue
+        items = []
+        while not watcher.changes.empty():
+            items.append(watcher.changes.get_nowait())
+        return items
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        config_path = os.path.join(temp_dir, 'config.yaml')
+        with open(config_path, 'w', encoding='utf-8') as file:
+            file.write("widgets: {}\n")
+        
+        for use_inotify in (True, False):
+            watcher = FileWatcher(config_path, debounce=0.15, poll_interval=0.05, use_inotify=use_inotify)
+            watcher.start()
+            try:
+                time.sleep(0.1)
+                # Rajada de gravações: apenas um recarregamento
+                for i in range(5):
+                    with open(config_path, 'w', encoding='utf-8') as file:
+                        file.write(f"widgets:\n  w{i}:\n    type: x\n")
+                    time.sleep(0.01)
+                items = wait_for(watcher)
+                if len(items) != 1 or items[0][1] != {'widgets': {'w4': {'type': 'x'}}}:
+                    print(f"❌ [{watcher.backend}] Rajada deveria gerar um único aviso: {len(items)}")
+                    return False
+                
+                # Substituição atômica também é detectada
+                atomic_write(config_path, b"widgets:\n  novo: {}\n")
+                items = wait_for(watcher)
+                if len(items) != 1 or items[0][1] != {'widgets': {'novo': {}}}:
+                    print(f"❌ [{watcher.backend}] Substituição atômica não detectada")
+                    return False
+            finally:
+                watcher.stop()
+            print(f"✅ Observador ({watcher.backend}): OK")
+    
+    return True
+
+
+def test_three_way_merge():
+    """Testa a mesclagem three-way entre painel e disco."""
+    print("\n=== Testando mesclagem three-way ===")
+    
+    import copy
+    import time
+    from config_history import freeze, thaw
+    from config_merge import MISSING, merge_trees, resolution_operations
+    from config_history import apply_operations
+    
+    def build(count):
+        names = [f"w{i}" for i in range(count)]
+        return {
+            'bars': {'yasb-bar': {'widgets': {'left': names[:count // 2], 'center': [], 'right': names[count // 2:]}}},
+            'widgets': {name: {'type': 'yasb.custom.CustomWidget', 'options': {'label': name}} for name in names}
+        }
+    
+    base_config = build(10)
+    base, _ = freeze(base_config)
+    ours_config = copy.deepcopy(base_config)
+    theirs_config = copy.deepcopy(base_config)
+    
+    # Painel: desativa w1, remove w2, adiciona "painel" à esquerda, muda o rótulo de w3
+    ours_config['widgets']['w1']['enabled'] = False
+    del ours_config['widgets']['w2']
+    ours_config['bars']['yasb-bar']['widgets']['left'].remove('w2')
+    ours_config['widgets']['painel'] = {'type': 'x'}
+    ours_config['bars']['yasb-bar']['widgets']['left'].append('painel')
+    ours_config['widgets']['w3']['options']['label'] = 'painel'
+    # Disco: muda opções de w5, adiciona "disco" à direita, muda o rótulo de w3
+    theirs_config['widgets']['w5']['options']['label'] = 'disco'
+    theirs_config['widgets']['disco'] = {'type': 'y'}
+    theirs_config['bars']['yasb-bar']['widgets']['right'].append('disco')
+    theirs_config['widgets']['w3']['options']['label'] = 'disco'
+    
+    ours, _ = freeze(ours_config, base)
+    theirs, _ = freeze(theirs_config, base)
+    merged_tree, conflicts = merge_trees(base, ours, theirs)
+    merged = thaw(merged_tree)
+    
+    widgets = merged['widgets']
+    sections = merged['bars']['yasb-bar']['widgets']
+    if (widgets['w1'].get('enabled') is not False or 'w2' in widgets or 'painel' not in widgets
+            or 'disco' not in widgets or widgets['w5']['options']['label'] != 'disco'):
+        print("❌ Alterações sem conflito não foram combinadas")
+        return False
+    if 'w2' in sections['left'] or sections['left'][-1] != 'painel' or sections['right'][-1] != 'disco':
+        print(f"❌ Listas de posições mescladas incorretamente: {sections}")
+        return False
+    if [conflict.path for conflict in conflicts] != [('widgets', 'w3', 'options', 'label')]:
+        print(f"❌ Conflitos incorretos: {conflicts}")
+        return False
+    if widgets['w3']['options']['label'] != 'painel':
+        print("❌ Conflito deveria manter a versão do painel")
+        return False
+    merged = apply_operations(merged, resolution_operations(conflicts, [True]))
+    if merged['widgets']['w3']['options']['label'] != 'disco':
+        print("❌ Escolha pela versão do disco não aplicada")
+        return False
+    print("✅ Mesclagem com 1 conflito resolvido: OK")
+    
+    # Remoção de um lado e alteração do outro é conflito
+    edited = copy.deepcopy(base_config)
+    edited['widgets']['w4']['enabled'] = False
+    removed = copy.deepcopy(base_config)
+    del removed['widgets']['w4']
+    _, conflicts = merge_trees(base, freeze(removed, base)[0], freeze(edited, base)[0])
+    if len(conflicts) != 1 or conflicts[0].ours is not MISSING:
+        print("❌ Remoção contra alteração não gerou conflito")
+        return False
+    print("✅ Conflito de remoção: OK")
+    
+    # A ordem dos widgets é o layout: reordenar não pode se perder
+    def with_left(names):
+        config = copy.deepcopy(base_config)
+        config['bars']['yasb-bar']['widgets']['left'] = names
+        return freeze(config, base)[0]
+    
+    left = list(base_config['bars']['yasb-bar']['widgets']['left'])
+    reordered = list(reversed(left))
+    merged_tree, conflicts = merge_trees(base, with_left(left + ['painel']), with_left(reordered))
+    if conflicts or list(thaw(merged_tree)['bars']['yasb-bar']['widgets']['left']) != reordered + ['painel']:
+        print("❌ Reordenação do disco foi perdida")
+        return False
+    _, conflicts = merge_trees(base, with_left(left[1:] + left[:1]), with_left(reordered))
+    if [conflict.path for conflict in conflicts] != [('bars', 'yasb-bar', 'widgets', 'left')]:
+        print("❌ Reordenação dos dois lados deveria gerar conflito")
+        return False
+    print("✅ Ordem dos widgets na mesclagem: OK")
+    
+    # Tempo linear no tamanho da configuração
+    timings = []
+    for count in (2000, 8000):
+        config = build(count)
+        base, _ = freeze(config)
+        ours_config, theirs_config = copy.deepcopy(config), copy.deepcopy(config)
+        for i in range(0, count, 2):
+            ours_config['widgets'][f"w{i}"]['enabled'] = False
+            theirs_config['widgets'][f"w{i + 1}"]['enabled'] = False
+        ours, theirs = freeze(ours_config, base)[0], freeze(theirs_config, base)[0]
+        runs = []
+        for _ in range(3):
+            start = time.perf_counter()
+            merge_trees(base, ours, theirs)
+            runs.append(time.perf_counter() - start)
+        timings.append(min(runs))
+    print(f"   - 2000 widgets: {timings[0] * 1000:.1f} ms, 8000 widgets: {timings[1] * 1000:.1f} ms")
+    if timings[1] > timings[0] * 10:
+        print("❌ Mesclagem não escala linearmente")
+        return False
+    
+    return True
+
+
+def test_config_diff():
+    """Testa a comparação estrutural entre disco e painel."""
+    print("\n=== Testando diferenças de configuração ===")
+    
+    import copy
+    import random
+    import time
+    from config_diff import diff_configs, edit_script, format_entry, summarize
+    
+    disk = {
+        'bars': {'yasb-bar': {'widgets': {'left': ['a', 'b', 'c', 'd'], 'right': ['e']}}},
+        'widgets': {name: {'type': 'yasb.custom.CustomWidget', 'options': {'label': name}} for name in 'abcde'}
+    }
+    panel = copy.deepcopy(disk)
+    panel['widgets']['b']['options']['label'] = 'B'
+    panel['widgets']['f'] = {'type': 'x'}
+    del panel['widgets']['e']
+    panel['bars']['yasb-bar']['widgets']['left'] = ['a', 'c', 'f', 'd']
+    
+    entries = diff_configs(disk, panel)
+    found = {(entry.kind, entry.path) for entry in entries}
+    expected = {
+        ('changed', ('widgets', 'b', 'options', 'label')),
+        ('added', ('widgets', 'f')),
+        ('removed', ('widgets', 'e')),
+        ('list', ('bars', 'yasb-bar', 'widgets', 'left')),
+    }
+    if found != expected:
+        print(f"❌ Diferenças incorretas: {found}")
+        return False
+    list_entry = next(entry for entry in entries if entry.kind == 'list')
+    if list_entry.new != [('-', 1, 'b'), ('+', 2, 'f')]:
+        print(f"❌ Diff da lista incorreto: {list_entry.new}")
+        return False
+    if diff_configs(disk, copy.deepcopy(disk)):
+        print("❌ Configurações iguais não deveriam ter diferenças")
+        return False
+    if not all(format_entry(entry) for entry in entries) or not summarize(entries).startswith("4 "):
+        print("❌ Formatação das diferenças incorreta")
+        return False
+    print("✅ Diferenças de chaves, valores e listas: OK")
+    
+    # O script de edição é mínimo (tamanho do LCS) e transforma a em b
+    random.seed(7)
+    for _ in range(300):
+        a = [random.choice('abcd') for _ in range(random.randint(0, 12))]
+        b = [random.choice('abcd') for _ in range(random.randint(0, 12))]
+        script = edit_script(a, b)
+        removed = {i for tag, i, _ in script if tag == '-'}
+        inserted = {j for tag, _, j in script if tag == '+'}
+        kept_a = [item for i, item in enumerate(a) if i not in removed]
+        kept_b = [item for j, item in enumerate(b) if j not in inserted]
+        lcs = [[0] * (len(b) + 1) for _ in range(len(a) + 1)]
+        for i in range(len(a)):
+            for j in range(len(b)):
+                lcs[i + 1][j + 1] = lcs[i][j] + 1 if a[i] == b[j] else max(lcs[i][j + 1], lcs[i + 1][j])
+        if kept_a != kept_b or len(script) != len(a) + len(b) - 2 * lcs[-1][-1]:
+            print(f"❌ Script de edição incorreto para {a} → {b}: {script}")
+            return False
+    print("✅ Diff de listas mínimo (LCS): OK")
+    
+    # Configuração grande com poucas alterações
+    names = [f"w{i}" for i in range(5000)]
+    large = {
+        'bars': {'yasb-bar': {'widgets': {'left': names[:2500], 'right': names[2500:]}}},
+        'widgets': {name: {'type': 'yasb.custom.CustomWidget',
+                           'options': {'label': name, 'update_interval': 1000}} for name in names}
+    }
+    changed = copy.deepcopy(large)
+    changed['widgets']['w10']['options']['label'] = 'alterado'
+    changed['bars']['yasb-bar']['widgets']['left'].insert(100, 'novo')
+    start = time.perf_counter()
+    entries = diff_configs(large, changed)
+    elapsed = time.perf_counter() - start
+    print(f"   - 5000 widgets (~20000 nós): {elapsed * 1000:.1f} ms, {len(entries)} diferença(s)")
+    if len(entries) != 2:
+        print(f"❌ Diferenças incorretas na configuração grande: {entries}")
+        return False
+    if elapsed > 2.0:
+        print("❌ Comparação lenta demais para a configuração grande")
+        return False
+    print("✅ Comparação de configuração grande: OK")
+    
+    return True
+
+
+def test_snapshot_store():
+    """Testa o repositório de versões endereçado por conteúdo."""
+    print("\n=== Testando versões salvas (snapshots) ===")
+    
+    import copy
+    import tempfile
+    import time
+    from config_history import freeze
+    from snapshot_store import SnapshotStore, snapshot_dir
+    
+    names = [f"w{i}" for i in range(500)]
+    config = {
+        'bars': {'yasb-bar': {'widgets': {'left': names, 'center': [], 'right': []}}},
+        'widgets': {name: {'type': 'yasb.custom.CustomWidget', 'options': {'label': name}} for name in names}
+    }
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        store = SnapshotStore(snapshot_dir(os.path.join(temp_dir, "config.yaml")))
+        tree, _ = freeze(config)
+        first = store.save(tree, "inicial")
+        first_usage = store.disk_usage()
+        
+        # Cem versões quase idênticas: só os ramos alterados viram objetos novos
+        for version in range(100):
+            config['widgets'][f"w{version}"]['options']['label'] = f"v{version}"
+            tree, _ = freeze(config, tree)
+            info = store.save(tree, f"versão {version}")
+            if info.new_objects > 6:
+                print(f"❌ Versão quase idêntica gravou {info.new_objects} objetos")
+                return False
+        if store.save(tree, "repetida") is not None:
+            print("❌ Versão sem alterações não deveria ser gravada")
+            return False
+        growth = store.disk_usage() - first_usage
+        print(f"   - primeira versão: {first_usage / 1024:.1f} KB, mais 100 versões: {growth / 1024:.1f} KB")
+        if growth / 100 > first_usage * 0.05:
+            print("❌ Versões quase idênticas ocupam espaço demais")
+            return False
+        print("✅ Deduplicação de subárvores: OK")
+        
+        # Restaurar uma versão antiga e a atual (também a partir de outro processo)
+        reopened = SnapshotStore(store.directory)
+        snapshots = reopened.list()
+        if len(snapshots) != 101 or snapshots[-1].snapshot_id != first.snapshot_id:
+            print("❌ Lista de versões incorreta")
+            return False
+        if reopened.load(snapshots[0].snapshot_id) != config:
+            print("❌ Versão atual restaurada incorretamente")
+            return False
+        original = reopened.load(first.snapshot_id)
+        if original['widgets']['w0']['options']['label'] != 'w0' or len(original['widgets']) != 500:
+            print("❌ Versão antiga restaurada incorretamente")
+            return False
+        if reopened.save(copy.deepcopy(config), "dicionário comum") is not None:
+            print("❌ Configuração comum deveria ter o mesmo hash da árvore congelada")
+            return False
+        print("✅ Restauração de versões: OK")
+        
+        # Coleta de lixo por quantidade e por idade
+        removed, objects = reopened.collect_garbage(max_count=10, max_age_days=None)
+        if removed != 91 or objects == 0 or len(reopened.list()) != 10:
+            print(f"❌ Coleta por quantidade incorreta: {removed} versões, {objects} objetos")
+            return False
+        if reopened.load(reopened.list()[-1].snapshot_id) is None:
+            return False
+        removed, _ = reopened.collect_garbage(max_count=None, max_age_days=1, now=time.time() + 2 * 86400)
+        if removed != 9 or len(reopened.list()) != 1 or reopened.load(reopened.list()[0].snapshot_id) != config:
+            print("❌ Coleta por idade deveria manter só a versão mais recente")
+            return False
+        print("✅ Coleta de lixo: OK")
+    
+    return True
+
+
+def test_autosave():
+    """Testa o salvamento automático com período de silêncio e atraso máximo."""
+    print("\n=== Testando salvamento automático ===")
+    
+    import tempfile
+    from config_autosave import AutoSaver, BackgroundWriter
+    from config_history import freeze
+    
+    clock = {'now': 0.0}
+    timers = {}
+    handles = []
+    saves = []
+    changed = {'value': True}
+    
+    def schedule(delay_ms, callback):
+        handles.append(callback)
+        handle = len(handles)
+        timers[handle] = (clock['now'] + delay_ms / 1000.0, callback)
+        return handle
+    
+    def advance(seconds):
+        """Avança o relógio disparando os temporizadores vencidos."""
+        end = clock['now'] + seconds
+        while True:
+            due = [(when, handle) for handle, (when, _) in timers.items() if when <= end]
+            if not due:
+                break
+            when, handle = min(due)
+            clock['now'] = when
+            timers.pop(handle)[1]()
+        clock['now'] = end
+    
+    def save():
+        saves.append(clock['now'])
+        return changed['value']
+    
+    saver = AutoSaver(schedule, timers.pop, save, quiet_period=2000, max_delay=10000,
+                      clock=lambda: clock['now'])
+    saver.notify()
+    advance(5)
+    if saves:
+        print("❌ Salvamento automático deveria começar desativado")
+        return False
+    
+    # Rajada curta (5 s a 7 s): uma gravação 2 s após a última alteração
+    saver.set_enabled(True)
+    for _ in range(5):
+        saver.notify()
+        advance(0.5)
+    advance(5)
+    if saves != [9.0] or len(timers) != 0:
+        print(f"❌ Período de silêncio incorreto: {saves}")
+        return False
+    
+    # Edição contínua: o atraso máximo força a gravação
+    saves.clear()
+    start = clock['now']
+    for _ in range(30):
+        saver.notify()
+        advance(1)
+    if not saves or saves[0] - start > 10.0 + 1e-9:
+        print(f"❌ Atraso máximo não respeitado: {[round(t - start, 1) for t in saves]}")
+        return False
+    print(f"✅ Gravações após silêncio e atraso máximo ({saves[0] - start:.1f} s): OK")
+    
+    # Gravações sem alterações são contadas como puladas
+    changed['value'] = False
+    saver.notify()
+    advance(3)
+    if saver.skipped != 1:
+        print(f"❌ Gravação sem alterações não contada: {saver.skipped}")
+        return False
+    saver.set_enabled(False)
+    saver.notify()
+    advance(30)
+    print("✅ Contagem de gravações puladas: OK")
+    
+    # Gravador em segundo plano: pedidos acumulados viram uma só gravação
+    writer = BackgroundWriter()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "config.yaml")
+        trees = [freeze({'widgets': {'clock': {'type': 'yasb.clock.ClockWidget', 'version': i}}})[0]
+                 for i in range(20)]
+        for tree in trees:
+            writer.submit(path, tree)
+        writer.wait_idle()
+        results = []
+        while not writer.results.empty():
+            results.append(writer.results.get_nowait())
+        with open(path, 'r', encoding='utf-8') as file:
+            saved = yaml.safe_load(file)
+        if saved['widgets']['clock']['version'] != 19 or results[-1].tree is not trees[-1]:
+            print("❌ Gravador não gravou a versão mais recente")
+            return False
+        if len(results) > len(trees) or any(result.error for result in results):
+            print(f"❌ Resultados incorretos do gravador: {results}")
+            return False
+        
+        writer.submit(path, trees[-1])
+        writer.wait_idle()
+        result = writer.results.get_nowait()
+        if result.written or writer.busy():
+            print("❌ Gravação sem alterações não foi pulada")
+            return False
+        print(f"✅ Gravador em segundo plano ({len(results)} gravação(ões) para 20 pedidos): OK")
+    
+    return True
+
+
+def test_batch_cli():
+    """Testa a linha de comando em lote (sem interface)."""
+    print("\n=== Testando linha de comando em lote ===")
+    
+    import contextlib
+    import io
+    import shutil
+    import tempfile
+    import yasb_cli
+    from config_checks import lint_config
+    
+    def run_cli(*args):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            code = yasb_cli.main(list(args))
+        return code, json.loads(output.getvalue())
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        files = []
+        for i in range(6):
+            path = os.path.join(temp_dir, f"maquina{i}.yaml")
+            shutil.copy("config_example.yaml", path)
+            files.append(path)
+        pattern = os.path.join(temp_dir, "maquina*.yaml")
+        
+        code, summary = run_cli('validate', pattern, '-j', '3')
+        if code != 0 or summary['total'] != 6 or summary['failed'] != 0:
+            print(f"❌ Validação em lote falhou: {summary}")
+            return False
+        
+        code, summary = run_cli('add', '--name', 'relogio2', '--type', 'yasb.clock.ClockWidget',
+                                '--position', 'right', '--option', 'label={%H:%M}', pattern, '-j', '3')
+        with open(files[3], 'r', encoding='utf-8') as file:
+            config = yaml.safe_load(file)
+        right = config['bars']['yasb-bar']['widgets']['right']
+        if code != 0 or summary['changed'] != 6 or right[-1] != 'relogio2' \
+                or config['widgets']['relogio2']['options']['label'] != '{%H:%M}':
+            print(f"❌ Adição em lote incorreta: {summary}")
+            return False
+        
+        code, summary = run_cli('set', '-o', 'system.debug_mode=true', '-o', 'bar.dimensions.height=40', pattern)
+        code, _ = run_cli('toggle', '--name', 'relogio2', '--state', 'disable', pattern)
+        with open(files[0], 'r', encoding='utf-8') as file:
+            config = yaml.safe_load(file)
+        if config['system']['debug_mode'] is not True or config['bars']['yasb-bar']['dimensions']['height'] != 40 \
+                or config['widgets']['relogio2']['enabled'] is not False:
+            print("❌ Opções ou estado dos widgets não aplicados")
+            return False
+        
+        theme_path = os.path.join(temp_dir, "tema.json")
+        with open(theme_path, 'w', encoding='utf-8') as file:
+            json.dump({"background_color": "#101010"}, file)
+        code, summary = run_cli('apply-theme', '--theme', theme_path, '--dry-run', pattern)
+        with open(files[0], 'r', encoding='utf-8') as file:
+            untouched = yaml.safe_load(file)['styles']['default'].get('background_color')
+        if summary['changed'] != 6 or untouched == "#101010":
+            print("❌ --dry-run não deveria gravar os arquivos")
+            return False
+        print("✅ Validação, adição, opções, estado e tema em lote: OK")
+        
+        # Falhas: widget repetido e YAML inválido dão código de saída 1
+        code, summary = run_cli('add', '--name', 'relogio2', '--type', 'x', files[0])
+        if code != 1 or summary['failed'] != 1 or not summary['results'][0]['errors']:
+            print("❌ Widget repetido deveria falhar")
+            return False
+        with open(files[1], 'w', encoding='utf-8') as file:
+            file.write("widgets: [\n")
+        code, summary = run_cli('remove', '--name', 'relogio2', pattern, '-j', '2')
+        if code != 1 or summary['failed'] != 1 or summary['changed'] != 5:
+            print(f"❌ Resumo de falhas incorreto: {summary}")
+            return False
+        
+        # Estruturas inesperadas falham só o próprio arquivo, com o resumo completo
+        for name, content in (("vazio.yaml", "widgets:\n"), ("lista.yaml", "widgets: [1, 2]\n")):
+            with open(os.path.join(temp_dir, name), 'w', encoding='utf-8') as file:
+                file.write(content)
+        broken = [os.path.join(temp_dir, "vazio.yaml"), os.path.join(temp_dir, "lista.yaml")]
+        code, summary = run_cli('lint', *broken, files[0], '-j', '2')
+        lista = summary['results'][1]
+        if code != 1 or summary['total'] != 3 or summary['failed'] != 2 or \
+                not any("mapeamento" in error for error in lista['errors']):
+            print(f"❌ Arquivos com estrutura inesperada: {summary}")
+            return False
+        code, summary = run_cli('remove', '--name', 'cpu', *broken, files[0])
+        if summary['total'] != 3 or not summary['results'][2]['changed']:
+            print(f"❌ Alteração em arquivo com estrutura inesperada: {summary}")
+            return False
+        print("✅ Resumo JSON e código de saída com falhas: OK")
+    
+    warnings = lint_config({
+        'bars': {'yasb-bar': {'widgets': {'left': ['a', 'fantasma', 'a'], 'meio': []}}},
+        'widgets': {'a': {'type': 'x'}, 'solto': {}},
+        'styles': {'default': {'text_color': 'vermelho'}}
+    })
+    if len(warnings) != 6:
+        print(f"❌ Avisos do lint incorretos: {warnings}")
+        return False
+    print("✅ Lint: OK")
+    
+    return True
+
+
+def test_config_store():
+    """Testa o modelo da configuração com eventos por caminho."""
+    print("\n=== Testando o modelo da configuração (ConfigStore) ===")
+    
+    from config_store import ConfigStore, normalize_paths
+    from widget_ops import NameAllocator
+    
+    store = ConfigStore({
+        'bars': {'yasb-bar': {'widgets': {'left': ['clock'], 'center': [], 'right': ['cpu']}}},
+        'widgets': {'clock': {'type': 'clock', 'enabled': True}, 'cpu': {'type': 'cpu', 'enabled': True}},
+        'styles': {'default': {'text_color': '#ffffff'}}
+    })
+    received = {'all': [], 'widgets': [], 'styles': [], 'system': []}
+    store.subscribe((), received['all'].append)
+    store.subscribe(('widgets',), received['widgets'].append)
+    store.subscribe(('styles', 'default'), received['styles'].append)
+    store.subscribe(('system',), received['system'].append)
+    
+    def reset():
+        for events in received.values():
+            events.clear()
+    
+    # Cada vista recebe só os caminhos que exibe
+    store.set(('styles', 'default', 'text_color'), '#000000', "Cor")
+    if (len(received['styles']) != 1 or received['widgets'] or received['system'] or
+            received['all'][0].paths != (('styles', 'default', 'text_color'),)):
+        print(f"❌ Eventos de estilo entregues incorretamente: {received}")
+        return False
+    reset()
+    if store.set(('styles', 'default', 'text_color'), '#000000') or received['all']:
+        print("❌ Definir o mesmo valor não deveria notificar")
+        return False
+    print("✅ Eventos filtrados por caminho e alterações vazias ignoradas: OK")
+    
+    # Transações agrupam as alterações em um evento com o rótulo externo
+    with store.transaction("Aplicar configurações"):
+        store.set(('system', 'debug_mode'), True)
+        with store.transaction("Interna"):
+            store.update(('styles', 'default'), {'text_color': '#000000', 'font_size': 14})
+        if received['all']:
+            print("❌ Transação notificou antes de terminar")
+            return False
+    event = received['all'][0]
+    if (len(received['all']) != 1 or event.label != "Aplicar configurações" or not event.record or
+            set(event.paths) != {('system', 'debug_mode'), ('styles', 'default', 'font_size')}):
+        print(f"❌ Transação incorreta: {received['all']}")
+        return False
+    print("✅ Transações aninhadas: OK")
+    
+    # Operações de widgets mantêm o índice e informam widgets e barras afetados
+    reset()
+    store.add_widget('ram', {'type': 'ram', 'enabled': True}, 'yasb-bar', 'center')
+    try:
+        store.add_widget('ram', {}, 'yasb-bar', 'left')
+        print("❌ Widget repetido deveria ser recusado")
+        return False
+    except ValueError:
+        pass
+    enabled = store.toggle_widgets(['clock', 'inexistente'])
+    copies = store.duplicate_widgets(['cpu'], NameAllocator())
+    moved = store.move_widgets(['clock'], 'yasb-bar', 'right')
+    removed = store.remove_widgets(['cpu'])
+    labels = [event.label for event in received['all']]
+    if (enabled or copies != ['cpu_copy'] or moved != ['clock'] or removed != ['cpu'] or
+            store.index.position('clock', 'yasb-bar') != 'right' or
+            store.data['bars']['yasb-bar']['widgets']['right'] != ['cpu_copy', 'clock'] or
+            labels != ["Adicionar widget 'ram'", "Ativar/desativar 1 widget(s)", "Duplicar 1 widget(s)",
+                       "Mover 1 widget(s) para 'right'", "Remover 1 widget(s)"]):
+        print(f"❌ Operações de widgets incorretas: {labels} {store.data}")
+        return False
+    if (received['widgets'][1].paths != (('widgets', 'clock', 'enabled'),) or
+            set(received['all'][-1].paths) != {('widgets', 'cpu'), ('bars', 'yasb-bar', 'widgets')}):
+        print(f"❌ Caminhos das operações incorretos: {received['all']}")
+        return False
+    print("✅ Operações de widgets com eventos por caminho: OK")
+    
+    # Barras e troca da configuração inteira
+    reset()
+    store.add_bar('monitor-2', {'class_name': 'yasb-bar', 'dimensions': {'height': 30}})
+    if store.data['bars']['monitor-2']['class_name'] != 'monitor-2' or 'monitor-2' not in store.index.bars:
+        print("❌ Barra nova incorreta")
+        return False
+    store.remove_bar('monitor-2')
+    store.replace({'widgets': {}}, paths=[('widgets', 'ram')])
+    if (received['widgets'][-1].record or received['widgets'][-1].paths != (('widgets', 'ram'),) or
+            store.index.bars or received['system']):
+        print("❌ Troca da configuração incorreta")
+        return False
+    if set(normalize_paths([('a', 'b'), ('a',), ('c',), ('a',)])) != {('a',), ('c',)}:
+        print("❌ Normalização de caminhos incorreta")
+        return False
+    print("✅ Barras e troca da configuração: OK")
+    
+    # A árvore é só do store: nós compartilhados (âncoras do YAML, dicionários
+    # do chamador) não fazem uma alteração vazar para outro caminho
+    aliased = yaml.safe_load("base: &opcoes {label: a}\n"
+                             "widgets: {a: {type: x, options: *opcoes}, b: {type: x, options: *opcoes}}\n")
+    store.replace(aliased)
+    widget_config = {'type': 'x', 'options': {'label': 'c'}}
+    store.add_widget('c', widget_config, 'yasb-bar', 'left')
+    widget_config['options']['label'] = 'fora'
+    store.set(('widgets', 'a', 'options', 'label'), 'X')
+    widgets = store.data['widgets']
+    if (widgets['b']['options']['label'] != 'a' or store.data['base']['label'] != 'a' or
+            widgets['c']['options']['label'] != 'c'):
+        print("❌ Alteração vazou por um nó compartilhado")
+        return False
+    print("✅ Árvore sem nós compartilhados: OK")
+    
+    return True
+
+
+def test_variable_bindings():
+    """Testa as ligações de mão dupla entre variáveis e a configuração."""
+    print("\n=== Testando ligações de variáveis ===")
+    
+    from config_bindings import BindingSet
+    from config_history import ConfigHistory
+    from config_store import ConfigStore
+    
+    class FakeVariable:
+        """Variável com a mesma interface de trace do Tk."""
+        
+        def __init__(self, value=""):
+            self.value = value
+            self.traces = {}
+            self.sets = 0
+        
+        def get(self):
+            return self.value
+        
+        def set(self, value):
+            self.value = value
+            self.sets += 1
+            for callback in list(self.traces.values()):
+                callback('var', '', 'write')
+        
+        def trace_add(self, mode, callback):
+            name = f"trace{len(self.traces)}"
+            self.traces[name] = callback
+            return name
+        
+        def trace_remove(self, mode, name):
+            del self.traces[name]
+    
+    store = ConfigStore({
+        'bars': {'yasb-bar': {'dimensions': {'height': 30}}, 'monitor-2': {'dimensions': {'height': 40}}},
+        'styles': {'default': {'text_color': '#ffffff'}}
+    })
+    history = ConfigHistory()
+    history.reset(store.data)
+    store.subscribe((), lambda event: event.record and history.record(event.label, store.data, event.coalesce))
+    errors = []
+    bindings = BindingSet(store, lambda binding, text: errors.append(text))
+    current = {'bar': 'yasb-bar'}
+    height = FakeVariable()
+    color = FakeVariable()
+    debug = FakeVariable()
+    bindings.bind(height, lambda: ('bars', current['bar'], 'dimensions', 'height'), int, default=30,
+                  label="Altura")
+    bindings.bind(color, ('styles', 'default', 'text_color'), default='#ffffff', label="Cor do texto")
+    bindings.bind(debug, ('system', 'debug_mode'), bool, bool, False, "Depuração")
+    if height.get() != "30" or color.get() != "#ffffff" or debug.get() is not False:
+        print("❌ Valores iniciais não carregados")
+        return False
+    
+    # Interface -> configuração: só o caminho editado, e digitar vira uma entrada no histórico
+    events = []
+    store.subscribe((), events.append)
+    for text in ("3", "32"):
+        height.set(text)
+    if (store.data['bars']['yasb-bar']['dimensions']['height'] != 32 or len(events) != 2 or
+            any(event.paths != (('bars', 'yasb-bar', 'dimensions', 'height'),) for event in events) or
+            len(history.entries) != 2 or height.value != "32"):
+        print(f"❌ Escrita da interface incorreta: {events}")
+        return False
+    color.set("#ffffff")
+    height.set("abc")
+    if (len(events) != 2 or errors != ["abc"] or bindings.invalid[0].label != "Altura" or
+            store.data['bars']['yasb-bar']['dimensions']['height'] != 32):
+        print("❌ Valores iguais ou inválidos não deveriam ser gravados")
+        return False
+    print("✅ Interface -> configuração só com campos alterados: OK")
+    
+    # Configuração -> interface: só as variáveis dos caminhos alterados, sem eco
+    sets = (height.sets, color.sets, debug.sets)
+    store.set(('styles', 'default', 'text_color'), '#000000')
+    if color.value != '#000000' or (height.sets, debug.sets) != (sets[0], sets[2]) or len(events) != 3:
+        print("❌ Atualização da interface incorreta")
+        return False
+    store.replace({'system': {'debug_mode': True}}, paths=[('system', 'debug_mode')])
+    if debug.value is not True or color.value != '#000000':
+        print("❌ Troca parcial da configuração incorreta")
+        return False
+    store.replace({'bars': {'monitor-2': {'dimensions': {'height': 40}}}})
+    current['bar'] = 'monitor-2'
+    bindings.refresh()
+    if height.value != "40" or color.value != "#ffffff" or bindings.invalid:
+        print("❌ Recarga após trocar a configuração ou a barra incorreta")
+        return False
+    print("✅ Configuração -> interface sem reescritas desnecessárias: OK")
+    
+    bindings.close()
+    color.set("#123456")
+    if store.get(('styles', 'default', 'text_color')) == "#123456" or color.traces:
+        print("❌ Ligações não foram desfeitas")
+        return False
+    print("✅ Desfazer ligações: OK")
+    
+    return True
+
+
+def test_tab_refresh():
+    """Testa a atualização das abas conforme a visibilidade."""
+    print("\n=== Testando atualização por aba visível ===")
+    
+    from config_store import ConfigStore
+    from tab_refresh import ALL, TabRefresher
+    
+    visible = {'tab': 'widgets'}
+    ticks = iter(range(0, 1000, 2))
+    refresher = TabRefresher(lambda: visible['tab'], clock=lambda: next(ticks) / 1000)
+    calls = []
+    for tab in ('widgets', 'advanced', 'preview'):
+        refresher.register(tab, lambda keys, tab=tab: calls.append((tab, set(keys))))
+    
+    # As vistas marcam o que mudou; o último inscrito atualiza só a aba visível
+    store = ConfigStore({'widgets': {'cpu': {'enabled': True}, 'clock': {'enabled': True}}})
+    store.subscribe(('widgets',), lambda event: refresher.invalidate(
+        'widgets', [path[1] for path in event.paths if len(path) > 1] if () not in event.paths else None))
+    store.subscribe((), lambda event: refresher.invalidate('advanced'))
+    store.subscribe(('widgets',), lambda event: refresher.invalidate('preview'))
+    store.subscribe((), lambda event: refresher.flush())
+    
+    store.set(('widgets', 'cpu', 'enabled'), False)
+    store.set(('widgets', 'clock', 'enabled'), False)
+    if calls != [('widgets', {'cpu'}), ('widgets', {'clock'})] or refresher.pending_tabs() != {'advanced', 'preview'}:
+        print(f"❌ Só a aba visível deveria ser atualizada: {calls}")
+        return False
+    print("✅ Aba visível atualizada na hora, outras adiadas: OK")
+    
+    # Ao selecionar a aba, as pendências acumuladas viram uma única atualização
+    calls.clear()
+    visible['tab'] = 'advanced'
+    refresher.flush()
+    refresher.flush()
+    if calls != [('advanced', {ALL})] or refresher.refreshes['advanced'] != 1:
+        print(f"❌ Aba selecionada não foi atualizada uma única vez: {calls}")
+        return False
+    if abs(refresher.last_elapsed['advanced'] - 0.002) > 1e-9:
+        print(f"❌ Tempo da atualização incorreto: {refresher.last_elapsed}")
+        return False
+    print("✅ Aba atualizada ao ser selecionada, com o tempo medido: OK")
+    
+    # A aba inteira cobre chaves avulsas; abas sem handler (estilos) são ignoradas
+    refresher.invalidate('widgets', ['cpu'])
+    refresher.invalidate('widgets')
+    refresher.invalidate('widgets', ['clock'])
+    refresher.invalidate('widgets', [])
+    refresher.invalidate('styles')
+    visible['tab'] = 'styles'
+    if refresher.flush() != 0.0:
+        print("❌ Aba sem handler não deveria ser atualizada")
+        return False
+    calls.clear()
+    refresher.flush('widgets')
+    refresher.invalidate('advanced', [])
+    if calls != [('widgets', {ALL})] or refresher.is_dirty('advanced'):
+        print(f"❌ Pendências da aba inteira incorretas: {calls}")
+        return False
+    
+    calls.clear()
+    refresher.invalidate_all()
+    visible['tab'] = 'preview'
+    refresher.flush()
+    if calls != [('preview', {ALL})] or refresher.pending_tabs() != {'widgets', 'advanced', 'styles'}:
+        print(f"❌ Atualização completa incorreta: {calls}")
+        return False
+    print("✅ Pendências agrupadas por aba: OK")
+    
+    return True
+
+
+def test_status_queue():
+    """Testa a fila de mensagens da barra de status."""
+    print("\n=== Testando fila de status ===")
+    
+    import threading
+    from status_queue import StatusQueue
+    
+    pending = []
+    shown = []
+    status = StatusQueue(lambda delay, callback: pending.append(callback) or len(pending),
+                         lambda text, messages: shown.append((text, [m.text for m in messages])),
+                         history_size=5, clock=lambda: 100.0)
+    
+    # Um laço de mensagens vira uma única exibição, com a última mensagem
+    for i in range(10):
+        status.post(f"Widget {i} removido")
+    if len(pending) != 1 or shown:
+        print(f"❌ Exibição deveria ser agendada uma única vez: {len(pending)}")
+        return False
+    pending.pop()()
+    if shown != [("Widget 9 removido", [f"Widget {i} removido" for i in range(10)])]:
+        print(f"❌ Exibição agrupada incorreta: {shown}")
+        return False
+    recent = status.recent()
+    if [m.text for m in recent] != [f"Widget {i} removido" for i in range(5, 10)] or recent[0].time != 100.0:
+        print(f"❌ Histórico incorreto: {recent}")
+        return False
+    print("✅ Mensagens agrupadas por quadro, com histórico limitado: OK")
+    
+    # Threads só avançam contadores e enfileiram; quem agenda e exibe é a interface
+    shown.clear()
+    job = status.start_job("Folha de contatos", 4)
+    pending.pop()()
+    
+    def worker():
+        for _ in range(3):
+            job.advance()
+        status.post("Bloco pronto")
+    
+    thread = threading.Thread(target=worker)
+    thread.start()
+    thread.join()
+    if len(pending) != 1:
+        print("❌ O progresso deveria manter um único quadro agendado")
+        return False
+    pending.pop()()
+    if shown[-1] != ("Bloco pronto | Folha de contatos: 3/4 (75%)", ["Bloco pronto"]):
+        print(f"❌ Progresso exibido incorreto: {shown}")
+        return False
+    job.advance(5)
+    job.finish("Folha de contatos salva")
+    pending.pop()()
+    if shown[-1][0] != "Folha de contatos salva" or status.jobs or pending:
+        print(f"❌ Fim do trabalho incorreto: {shown[-1]}")
+        return False
+    print("✅ Progresso de trabalhos longos sem Tk nas threads: OK")
+    
+    # Progresso da folha de contatos
+    from contact_sheet import build_contact_sheet
+    tiles = []
+    build_contact_sheet({'bars': {'yasb-bar': {}}}, [320, 640], max_workers=1,
+                        progress=lambda: tiles.append(1))
+    if len(tiles) != 2:
+        print(f"❌ Progresso da folha de contatos incorreto: {len(tiles)}")
+        return False
+    print("✅ Progresso da folha de contatos: OK")
+    
+    return True
+
+
 def run_all_tests():
     """Executa todos os testes."""
     print("🧪 INICIANDO TESTES DO PAINEL DE CONTROLE YASB")
@@ -282,7 +1841,30 @@ def run_all_tests():
         test_config_validation,
         test_widget_operations,
         test_style_operations,
-        test_file_operations
+        test_file_operations,
+        test_command_profiler,
+        test_preview_ticker,
+        test_label_templates,
+        test_preview_canvas_cache,
+        test_preview_layout,
+        test_bar_renderer,
+        test_bar_index,
+        test_bulk_widget_operations,
+        test_widget_duplication,
+        test_undo_history,
+        test_change_journal,
+        test_atomic_save,
+        test_streaming_yaml,
+        test_file_watcher,
+        test_three_way_merge,
+        test_config_diff,
+        test_snapshot_store,
+        test_autosave,
+        test_batch_cli,
+        test_config_store,
+        test_variable_bindings,
+        test_tab_refresh,
+        test_status_queue
     ]
     
     passed = 0
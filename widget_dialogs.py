@@ -2,10 +2,16 @@
 Módulo para diálogos de edição e criação de widgets.
 """
 
+import time
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, simpledialog
 from typing import Dict, Any, Optional, List
 
+from config_diff import diff_configs, format_entry, summarize
+from config_merge import MISSING, describe_path
+from label_templates import LABEL_OPTIONS, validate_label
+from snapshot_store import DEFAULT_MAX_AGE_DAYS, DEFAULT_MAX_SNAPSHOTS
+
 
 class WidgetDialog:
     """Diálogo base para edição de widgets."""
@@ -278,6 +284,19 @@ class WidgetDialog:
             messagebox.showerror("Erro", "Tipo do widget é obrigatório.")
             return False
         
+        # Validar os rótulos contra os campos do tipo de widget
+        errors = []
+        option_vars = getattr(self, 'option_vars', {})
+        for option_name in LABEL_OPTIONS:
+            if option_name in option_vars:
+                label = str(option_vars[option_name].get())
+                errors.extend(f"{option_name}: {error}" for error in validate_label(label, self.type_var.get()))
+        if errors:
+            return messagebox.askyesno("Rótulo Inválido", 
+                                       "Problemas encontrados nos rótulos:\n" +
+                                       "\n".join(f"• {error}" for error in errors) +
+                                       "\n\nDeseja salvar mesmo assim?")
+        
         return True
     
     def ok(self):
@@ -561,3 +580,324 @@ class StyleEditorDialog:
         self.dialog.wait_window()
         return self.result
 
+
+
+class MergeConflictDialog:
+    """Diálogo para resolver conflitos entre o painel e o arquivo no disco."""
+    
+    def __init__(self, parent, conflicts: List[Any]):
+        self.parent = parent
+        self.result = None
+        self.conflicts = conflicts
+        self.use_theirs = [False] * len(conflicts)
+        
+        # Criar janela
+        self.dialog = tk.Toplevel(parent)
+        self.dialog.title("Conflitos de Mesclagem")
+        self.dialog.geometry("800x450")
+        self.dialog.resizable(True, True)
+        self.dialog.transient(parent)
+        self.dialog.grab_set()
+        
+        # Configurar interface
+        self.setup_ui()
+    
+    def setup_ui(self):
+        """Configura a interface do diálogo."""
+        main_frame = ttk.Frame(self.dialog, padding="10")
+        main_frame.pack(fill=tk.BOTH, expand=True)
+        
+        ttk.Label(main_frame, text="O arquivo foi alterado fora do painel. As alterações sem conflito "
+                                   "já foram combinadas; escolha a versão de cada item abaixo.",
+                 wraplength=760).pack(anchor=tk.W, pady=(0, 10))
+        
+        tree_frame = ttk.Frame(main_frame)
+        tree_frame.pack(fill=tk.BOTH, expand=True)
+        
+        self.tree = ttk.Treeview(tree_frame, columns=('ours', 'theirs', 'choice'), show='tree headings')
+        self.tree.heading('#0', text='Chave')
+        self.tree.heading('ours', text='Painel')
+        self.tree.heading('theirs', text='Disco')
+        self.tree.heading('choice', text='Usar')
+        self.tree.column('#0', width=250)
+        self.tree.column('ours', width=220)
+        self.tree.column('theirs', width=220)
+        self.tree.column('choice', width=70)
+        
+        scrollbar = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        
+        for index, conflict in enumerate(self.conflicts):
+            self.tree.insert('', 'end', iid=str(index), text=describe_path(conflict.path),
+                           values=(self.describe_value(conflict.ours), 
+                                   self.describe_value(conflict.theirs), "Painel"))
+        
+        # Botões de escolha
+        choice_frame = ttk.Frame(main_frame)
+        choice_frame.pack(fill=tk.X, pady=(10, 0))
+        
+        ttk.Button(choice_frame, text="Usar Painel", 
+                  command=lambda: self.choose(False)).pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Button(choice_frame, text="Usar Disco", 
+                  command=lambda: self.choose(True)).pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Button(choice_frame, text="Todos do Disco", 
+                  command=lambda: self.choose(True, all_items=True)).pack(side=tk.LEFT)
+        
+        ttk.Button(choice_frame, text="Cancelar", command=self.cancel).pack(side=tk.RIGHT)
+        ttk.Button(choice_frame, text="Aplicar", command=self.ok).pack(side=tk.RIGHT, padx=(0, 5))
+    
+    def describe_value(self, value) -> str:
+        """Resumo de um valor para exibição (chaves removidas aparecem como tal)."""
+        if value is MISSING:
+            return "(removido)"
+        text = str(value)
+        return text if len(text) <= 60 else text[:57] + "..."
+    
+    def choose(self, theirs: bool, all_items: bool = False):
+        """Escolhe a versão dos itens selecionados (ou de todos)."""
+        items = self.tree.get_children() if all_items else self.tree.selection()
+        for item in items:
+            self.use_theirs[int(item)] = theirs
+            self.tree.set(item, 'choice', "Disco" if theirs else "Painel")
+    
+    def ok(self):
+        """Callback para o botão Aplicar."""
+        self.result = list(self.use_theirs)
+        self.dialog.destroy()
+    
+    def cancel(self):
+        """Callback para o botão Cancelar."""
+        self.result = None
+        self.dialog.destroy()
+    
+    def show(self) -> Optional[List[bool]]:
+        """Mostra o diálogo e retorna, para cada conflito, se a versão do disco foi escolhida."""
+        self.dialog.wait_window()
+        return self.result
+
+
+class ConfigDiffDialog:
+    """Janela (não modal) com as diferenças entre o disco e o painel."""
+    
+    # Diferenças inseridas por vez no texto, para não travar a interface
+    CHUNK_SIZE = 500
+    
+    def __init__(self, parent, entries: List[Any], title: str = "Diferenças"):
+        self.parent = parent
+        self.entries = entries
+        self.rendered = 0
+        self.current = -1
+        
+        # Criar janela
+        self.dialog = tk.Toplevel(parent)
+        self.dialog.title(title)
+        self.dialog.geometry("900x550")
+        self.dialog.resizable(True, True)
+        self.dialog.transient(parent)
+        
+        # Configurar interface
+        self.setup_ui()
+        self.render_chunk()
+    
+    def setup_ui(self):
+        """Configura a interface do diálogo."""
+        main_frame = ttk.Frame(self.dialog, padding="10")
+        main_frame.pack(fill=tk.BOTH, expand=True)
+        
+        top_frame = ttk.Frame(main_frame)
+        top_frame.pack(fill=tk.X, pady=(0, 10))
+        
+        self.summary_label = ttk.Label(top_frame, text=summarize(self.entries) if self.entries 
+                                       else "Nenhuma diferença: o painel e o disco estão iguais.")
+        self.summary_label.pack(side=tk.LEFT)
+        
+        ttk.Button(top_frame, text="Fechar", command=self.dialog.destroy).pack(side=tk.RIGHT)
+        ttk.Button(top_frame, text="Próxima ▼", 
+                  command=lambda: self.navigate(1)).pack(side=tk.RIGHT, padx=(0, 5))
+        ttk.Button(top_frame, text="▲ Anterior", 
+                  command=lambda: self.navigate(-1)).pack(side=tk.RIGHT, padx=(0, 5))
+        self.position_label = ttk.Label(top_frame, text="")
+        self.position_label.pack(side=tk.RIGHT, padx=(0, 10))
+        
+        text_frame = ttk.Frame(main_frame)
+        text_frame.pack(fill=tk.BOTH, expand=True)
+        
+        self.text = tk.Text(text_frame, wrap=tk.NONE, font=('Consolas', 10))
+        scrollbar = ttk.Scrollbar(text_frame, orient=tk.VERTICAL, command=self.text.yview)
+        self.text.configure(yscrollcommand=scrollbar.set)
+        self.text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        
+        self.text.tag_configure('added', foreground='#2e7d32')
+        self.text.tag_configure('removed', foreground='#c62828')
+        self.text.tag_configure('changed', foreground='#1565c0')
+        self.text.tag_configure('current', background='#fff59d')
+    
+    def render_chunk(self):
+        """Insere o próximo lote de diferenças e agenda o seguinte."""
+        if not self.dialog.winfo_exists():
+            return
+        end = min(self.rendered + self.CHUNK_SIZE, len(self.entries))
+        for index in range(self.rendered, end):
+            self.text.mark_set(f"diff{index}", tk.END + "-1c")
+            self.text.mark_gravity(f"diff{index}", tk.LEFT)
+            for line, tag in format_entry(self.entries[index]):
+                self.text.insert(tk.END, line, tag)
+        self.rendered = end
+        
+        if self.rendered < len(self.entries):
+            self.position_label.config(text=f"Carregando {self.rendered}/{len(self.entries)}...")
+            self.dialog.after(1, self.render_chunk)
+        else:
+            self.text.config(state=tk.DISABLED)
+            self.update_position()
+    
+    def navigate(self, step: int):
+        """Vai para a diferença anterior ou seguinte."""
+        if not self.rendered:
+            return
+        self.current = max(0, min(self.rendered - 1, self.current + step))
+        start = f"diff{self.current}"
+        end = f"diff{self.current + 1}" if self.current + 1 < self.rendered else tk.END
+        self.text.tag_remove('current', '1.0', tk.END)
+        self.text.tag_add('current', start, end)
+        self.text.see(start)
+        self.update_position()
+    
+    def update_position(self):
+        """Mostra qual diferença está destacada."""
+        if self.rendered < len(self.entries):
+            return
+        current = self.current + 1 if self.current >= 0 else 0
+        self.position_label.config(text=f"{current}/{len(self.entries)}")
+
+
+class SnapshotBrowserDialog:
+    """Diálogo para navegar, comparar e restaurar versões salvas."""
+    
+    def __init__(self, parent, store, current_config: Dict[str, Any]):
+        self.parent = parent
+        self.result = None
+        self.store = store
+        self.current_config = current_config
+        
+        # Criar janela
+        self.dialog = tk.Toplevel(parent)
+        self.dialog.title("Versões Salvas")
+        self.dialog.geometry("700x450")
+        self.dialog.resizable(True, True)
+        self.dialog.transient(parent)
+        self.dialog.grab_set()
+        
+        # Configurar interface
+        self.setup_ui()
+        self.refresh_list()
+    
+    def setup_ui(self):
+        """Configura a interface do diálogo."""
+        main_frame = ttk.Frame(self.dialog, padding="10")
+        main_frame.pack(fill=tk.BOTH, expand=True)
+        
+        tree_frame = ttk.Frame(main_frame)
+        tree_frame.pack(fill=tk.BOTH, expand=True)
+        
+        self.tree = ttk.Treeview(tree_frame, columns=('date', 'label', 'objects'), show='tree headings',
+                                 selectmode='browse')
+        self.tree.heading('#0', text='Versão')
+        self.tree.heading('date', text='Data')
+        self.tree.heading('label', text='Descrição')
+        self.tree.heading('objects', text='Objetos Novos')
+        self.tree.column('#0', width=70)
+        self.tree.column('date', width=150)
+        self.tree.column('label', width=300)
+        self.tree.column('objects', width=100)
+        
+        scrollbar = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.bind('<Double-1>', lambda event: self.show_diff())
+        
+        self.usage_label = ttk.Label(main_frame, text="")
+        self.usage_label.pack(anchor=tk.W, pady=(5, 0))
+        
+        # Botões
+        button_frame = ttk.Frame(main_frame)
+        button_frame.pack(fill=tk.X, pady=(10, 0))
+        
+        ttk.Button(button_frame, text="🔍 Diferenças", command=self.show_diff).pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Button(button_frame, text="♻️ Restaurar", command=self.restore).pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Button(button_frame, text="🧹 Limpar Antigas", 
+                  command=self.collect_garbage).pack(side=tk.LEFT)
+        ttk.Button(button_frame, text="Fechar", command=self.dialog.destroy).pack(side=tk.RIGHT)
+    
+    def refresh_list(self):
+        """Recarrega a lista de versões."""
+        self.tree.delete(*self.tree.get_children())
+        snapshots = self.store.list()
+        for info in snapshots:
+            date = time.strftime('%d/%m/%Y %H:%M:%S', time.localtime(info.created))
+            self.tree.insert('', 'end', iid=str(info.snapshot_id), text=f"#{info.snapshot_id}",
+                           values=(date, info.label, info.new_objects))
+        self.usage_label.config(text=f"{len(snapshots)} versão(ões), "
+                                     f"{self.store.disk_usage() / 1024:.1f} KB em disco")
+    
+    def selected_snapshot(self) -> Optional[int]:
+        """Versão selecionada na lista."""
+        selection = self.tree.selection()
+        if not selection:
+            messagebox.showwarning("Aviso", "Selecione uma versão.", parent=self.dialog)
+            return None
+        return int(selection[0])
+    
+    def show_diff(self):
+        """Mostra as diferenças entre a versão selecionada e o painel."""
+        snapshot_id = self.selected_snapshot()
+        if snapshot_id is None:
+            return
+        try:
+            snapshot = self.store.load(snapshot_id)
+        except (OSError, ValueError, KeyError) as e:
+            messagebox.showerror("Erro", f"Erro ao ler a versão: {str(e)}", parent=self.dialog)
+            return
+        ConfigDiffDialog(self.dialog, diff_configs(snapshot, self.current_config), 
+                         title=f"Diferenças: versão #{snapshot_id} → painel")
+    
+    def restore(self):
+        """Restaura a versão selecionada no painel."""
+        snapshot_id = self.selected_snapshot()
+        if snapshot_id is None:
+            return
+        if not messagebox.askyesno("Confirmar", f"Restaurar a versão #{snapshot_id} no painel?\n"
+                                   "A alteração pode ser desfeita.", parent=self.dialog):
+            return
+        try:
+            self.result = (snapshot_id, self.store.load(snapshot_id))
+        except (OSError, ValueError, KeyError) as e:
+            messagebox.showerror("Erro", f"Erro ao ler a versão: {str(e)}", parent=self.dialog)
+            return
+        self.dialog.destroy()
+    
+    def collect_garbage(self):
+        """Descarta versões antigas (por quantidade e idade)."""
+        max_count = simpledialog.askinteger("Limpar Versões", "Manter no máximo quantas versões?",
+                                            initialvalue=DEFAULT_MAX_SNAPSHOTS, minvalue=1, 
+                                            parent=self.dialog)
+        if max_count is None:
+            return
+        max_age = simpledialog.askinteger("Limpar Versões", "Descartar versões com mais de quantos dias?",
+                                          initialvalue=DEFAULT_MAX_AGE_DAYS, minvalue=1, 
+                                          parent=self.dialog)
+        if max_age is None:
+            return
+        removed, objects = self.store.collect_garbage(max_count, max_age)
+        self.refresh_list()
+        messagebox.showinfo("Limpar Versões", f"{removed} versão(ões) e {objects} objeto(s) removidos.",
+                            parent=self.dialog)
+    
+    def show(self):
+        """Mostra o diálogo e retorna (versão, configuração) a restaurar, ou None."""
+        self.dialog.wait_window()
+        return self.result
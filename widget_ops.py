@@ -0,0 +1,92 @@
+"""
+Módulo com operações em lote sobre os widgets da configuração.
+
+Cada função aplica a operação a todos os widgets selecionados de uma vez
+(uma transação sobre config_data e o BarIndex), para que a interface
+precise de uma única atualização ao final, mesmo com milhares de itens.
+"""
+
+import copy
+from typing import Container, Dict, Any, Iterable, List, Optional
+
+from config_index import BarIndex
+
+
+class NameAllocator:
+    """Gera nomes livres para cópias ("nome_copy", "nome_copy_1", ...).
+
+    Guarda, para cada nome base, o próximo sufixo a testar, então duplicar
+    o mesmo widget n vezes custa O(n) no total em vez de O(n²).
+    """
+
+    def __init__(self):
+        self.counters: Dict[str, int] = {}
+
+    def allocate(self, base: str, taken: Container[str]) -> str:
+        """Retorna o primeiro nome de cópia de base que não está em taken."""
+        counter = self.counters.get(base, 0)
+        while True:
+            name = f"{base}_copy" if counter == 0 else f"{base}_copy_{counter}"
+            counter += 1
+            if name not in taken:
+                break
+        self.counters[base] = counter
+        return name
+
+    def reset(self):
+        """Esquece os contadores (ao carregar outra configuração)."""
+        self.counters.clear()
+
+
+def existing_widgets(config_data: Dict[str, Any], widget_names: Iterable[str]) -> List[str]:
+    """Filtra os nomes que existem em widgets, sem repetições e na ordem dada."""
+    widgets = config_data.get('widgets') or {}
+    return [name for name in dict.fromkeys(widget_names) if name in widgets]
+
+
+def toggle_widgets(config_data: Dict[str, Any], widget_names: Iterable[str]) -> bool:
+    """Ativa ou desativa os widgets em conjunto.
+
+    Se todos estiverem ativos eles são desativados; caso contrário, todos
+    são ativados. Retorna o novo estado.
+    """
+    widgets = config_data.get('widgets') or {}
+    names = existing_widgets(config_data, widget_names)
+    enabled = not all(widgets[name].get('enabled', True) for name in names)
+    for name in names:
+        widgets[name]['enabled'] = enabled
+    return enabled
+
+
+def remove_widgets(config_data: Dict[str, Any], index: BarIndex,
+                   widget_names: Iterable[str]) -> List[str]:
+    """Remove os widgets da configuração e de todas as barras."""
+    widgets = config_data.get('widgets') or {}
+    names = existing_widgets(config_data, widget_names)
+    for name in names:
+        del widgets[name]
+    index.unplace_many(names)
+    return names
+
+
+def duplicate_widgets(config_data: Dict[str, Any], index: BarIndex, widget_names: Iterable[str],
+                      allocator: Optional[NameAllocator] = None) -> List[str]:
+    """Duplica os widgets nas mesmas barras e seções. Retorna os novos nomes."""
+    widgets = config_data.get('widgets') or {}
+    allocator = allocator or NameAllocator()
+    new_names = []
+    for widget_name in existing_widgets(config_data, widget_names):
+        new_name = allocator.allocate(widget_name, widgets)
+        widgets[new_name] = copy.deepcopy(widgets[widget_name])
+        for bar_name, section in list(index.bars_of(widget_name).items()):
+            index.place(new_name, bar_name, section)
+        new_names.append(new_name)
+    return new_names
+
+
+def move_widgets(config_data: Dict[str, Any], index: BarIndex, widget_names: Iterable[str],
+                 bar_name: str, section: str) -> List[str]:
+    """Move os widgets para uma seção da barra, mantendo a ordem da seleção."""
+    names = existing_widgets(config_data, widget_names)
+    index.move_many(names, bar_name, section)
+    return names
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Linha de comando do painel YASB para operar em lote, sem interface.
+
+Exemplos:
+    python yasb_cli.py validate maquinas/*.yaml
+    python yasb_cli.py lint config.yaml
+    python yasb_cli.py apply-theme --theme escuro.json maquinas/*.yaml
+    python yasb_cli.py set -o system.debug_mode=false -o bar.dimensions.height=32 *.yaml
+    python yasb_cli.py add --name relogio --type yasb.clock.ClockWidget --position right *.yaml
+    python yasb_cli.py remove --name relogio *.yaml
+    python yasb_cli.py toggle --name cpu --state disable *.yaml
+
+Os arquivos são processados em paralelo em um pool de processos. O resumo
+sai em JSON na saída padrão, e o código de saída é 1 se algum arquivo
+falhar.
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import yaml
+
+from config_checks import lint_config, validate_config
+from config_index import BarIndex, DEFAULT_BAR_NAME
+from config_io import canonical_hash, save_config
+from contact_sheet import load_theme_files
+from preview_layout import SECTIONS
+from widget_ops import existing_widgets, remove_widgets, toggle_widgets
+
+READ_ONLY_COMMANDS = ('validate', 'lint')
+
+
+def parse_assignment(text: str) -> Tuple[str, Any]:
+    """Interpreta "chave=valor"; o valor é lido como YAML (true, 32, texto)."""
+    key, separator, value = text.partition('=')
+    if not separator or not key.strip():
+        raise argparse.ArgumentTypeError(f"Use chave=valor: '{text}'")
+    try:
+        return key.strip(), yaml.safe_load(value) if value.strip() else ""
+    except yaml.YAMLError:
+        return key.strip(), value  # Texto que não é YAML válido, como "{%H:%M}"
+
+
+def parse_option(text: str) -> Tuple[str, Any]:
+    """Interpreta uma opção de set (system.* ou bar.*)."""
+    key, value = parse_assignment(text)
+    scope, _, rest = key.partition('.')
+    if scope not in ('system', 'bar') or not rest:
+        raise argparse.ArgumentTypeError(f"A opção deve começar com 'system.' ou 'bar.': '{key}'")
+    return key, value
+
+
+def set_path(target: Dict[str, Any], path: Sequence[str], value: Any):
+    """Define target[path[0]][path[1]]... = value, criando os níveis."""
+    for key in path[:-1]:
+        child = target.get(key)
+        if not isinstance(child, dict):
+            child = target[key] = {}
+        target = child
+    target[path[-1]] = value
+
+
+# Comandos de alteração: recebem a configuração e os parâmetros e retornam
+# avisos; um ValueError faz o arquivo falhar sem ser gravado.
+
+def apply_theme(config_data: Dict[str, Any], params: Dict[str, Any]) -> List[str]:
+    styles = config_data.setdefault('styles', {})
+    if not isinstance(styles.get('default'), dict):
+        styles['default'] = {}
+    styles['default'].update(params['theme'])
+    return []
+
+
+def set_options(config_data: Dict[str, Any], params: Dict[str, Any]) -> List[str]:
+    index = BarIndex(config_data)
+    for key, value in params['options']:
+        scope, path = key.split('.', 1)
+        if scope == 'system':
+            target = config_data.setdefault('system', {})
+        else:
+            if params['bar'] not in index.bars:
+                raise ValueError(f"Barra '{params['bar']}' não encontrada")
+            target = index.bar_config(params['bar'])
+        set_path(target, path.split('.'), value)
+    return []
+
+
+def add_widget(config_data: Dict[str, Any], params: Dict[str, Any]) -> List[str]:
+    name = params['name']
+    widgets = config_data.setdefault('widgets', {})
+    if name in widgets:
+        raise ValueError(f"Widget '{name}' já existe")
+    index = BarIndex(config_data)
+    if params['bar'] not in index.bars:
+        raise ValueError(f"Barra '{params['bar']}' não encontrada")
+    widgets[name] = {
+        'type': params['type'],
+        'enabled': params['enabled'],
+        'options': dict(params['options'])
+    }
+    index.place(name, params['bar'], params['position'])
+    return []
+
+
+def remove_widget(config_data: Dict[str, Any], params: Dict[str, Any]) -> List[str]:
+    removed = remove_widgets(config_data, BarIndex(config_data), params['names'])
+    return [f"Widget '{name}' não encontrado" for name in params['names'] if name not in removed]
+
+
+def toggle_widget(config_data: Dict[str, Any], params: Dict[str, Any]) -> List[str]:
+    names = existing_widgets(config_data, params['names'])
+    if params['state'] == 'toggle':
+        toggle_widgets(config_data, names)
+    else:
+        for name in names:
+            config_data['widgets'][name]['enabled'] = params['state'] == 'enable'
+    return [f"Widget '{name}' não encontrado" for name in params['names'] if name not in names]
+
+
+COMMANDS = {
+    'apply-theme': apply_theme,
+    'set': set_options,
+    'add': add_widget,
+    'remove': remove_widget,
+    'toggle': toggle_widget,
+}
+
+
+def process_file(job: Tuple[str, str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Processa um arquivo (executado nos processos do pool)."""
+    path, command, params = job
+    result = {'file': path, 'ok': True, 'changed': False, 'errors': [], 'warnings': []}
+    try:
+        with open(path, 'rb') as file:
+            config_data = yaml.safe_load(file) or {}
+    except (OSError, yaml.YAMLError) as e:
+        result.update(ok=False, errors=[f"Erro ao ler o arquivo: {e}"])
+        return result
+
+    if command in READ_ONLY_COMMANDS:
+        try:
+            result['errors'] = validate_config(config_data)
+            if command == 'lint':
+                result['warnings'] = lint_config(config_data)
+        except Exception as e:
+            # Uma estrutura inesperada falha só este arquivo, não o lote inteiro
+            result['errors'].append(f"Erro ao verificar o arquivo: {e}")
+        result['ok'] = not result['errors'] and not result['warnings']
+        return result
+
+    try:
+        before = canonical_hash(config_data)
+        result['warnings'] = COMMANDS[command](config_data, params)
+        result['changed'] = canonical_hash(config_data) != before
+    except Exception as e:
+        result.update(ok=False, errors=[str(e)])
+        return result
+
+    if result['changed'] and not params.get('dry_run'):
+        try:
+            save_config(path, config_data)
+        except OSError as e:
+            result.update(ok=False, errors=[f"Erro ao gravar o arquivo: {e}"])
+    return result
+
+
+def run(files: Sequence[str], command: str, params: Dict[str, Any],
+        max_workers: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Processa os arquivos, em paralelo quando houver mais de um."""
+    payload = [(path, command, params) for path in files]
+    if max_workers is None:
+        max_workers = min(len(payload), os.cpu_count() or 1)
+    if len(payload) <= 1 or max_workers <= 1:
+        return [process_file(job) for job in payload]
+
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        chunksize = max(1, len(payload) // (max_workers * 4))
+        return list(pool.map(process_file, payload, chunksize=chunksize))
+
+
+def summarize(command: str, results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Resumo legível por máquina do processamento."""
+    return {
+        'command': command,
+        'total': len(results),
+        'succeeded': sum(1 for result in results if result['ok']),
+        'failed': sum(1 for result in results if not result['ok']),
+        'changed': sum(1 for result in results if result['changed']),
+        'results': results
+    }
+
+
+def expand_files(patterns: Sequence[str]) -> List[str]:
+    """Expande curingas (o cmd do Windows não os expande) sem repetir arquivos."""
+    files = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+        files.extend(matches)
+    return list(dict.fromkeys(files))
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Cria o analisador de argumentos."""
+    parser = argparse.ArgumentParser(prog="yasb_cli",
+                                     description="Opera em lote sobre arquivos de configuração do YASB.")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    def add_command(name: str, help_text: str) -> argparse.ArgumentParser:
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument('files', nargs='+', help="Arquivos de configuração (aceita curingas)")
+        command.add_argument('-j', '--jobs', type=int, default=None, help="Processos em paralelo")
+        if name not in READ_ONLY_COMMANDS:
+            command.add_argument('--dry-run', action='store_true', help="Não grava os arquivos")
+        return command
+
+    add_command('validate', "Valida as configurações")
+    add_command('lint', "Valida e aponta inconsistências")
+
+    theme = add_command('apply-theme', "Aplica um tema JSON a styles.default")
+    theme.add_argument('--theme', required=True, help="Arquivo JSON do tema")
+
+    options = add_command('set', "Define opções de sistema ou da barra")
+    options.add_argument('-o', '--option', dest='options', action='append', type=parse_option,
+                         required=True, help="system.chave=valor ou bar.chave=valor (repetível)")
+    options.add_argument('--bar', default=DEFAULT_BAR_NAME, help="Barra das opções bar.*")
+
+    add = add_command('add', "Adiciona um widget")
+    add.add_argument('--name', required=True)
+    add.add_argument('--type', required=True)
+    add.add_argument('--position', choices=SECTIONS, default='left')
+    add.add_argument('--bar', default=DEFAULT_BAR_NAME)
+    add.add_argument('--option', dest='options', action='append', type=parse_assignment, default=[],
+                     help="Opção do widget chave=valor (repetível)")
+    add.add_argument('--disabled', action='store_true', help="Adiciona o widget desativado")
+
+    for name, help_text in (('remove', "Remove widgets"), ('toggle', "Ativa ou desativa widgets")):
+        command = add_command(name, help_text)
+        command.add_argument('--name', dest='names', action='append', required=True,
+                             help="Nome do widget (repetível)")
+        if name == 'toggle':
+            command.add_argument('--state', choices=('toggle', 'enable', 'disable'), default='toggle')
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Ponto de entrada. Retorna o código de saída."""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    params = {key: value for key, value in vars(args).items() if key not in ('command', 'files', 'jobs')}
+    if args.command == 'apply-theme':
+        try:
+            themes = load_theme_files([args.theme])
+        except (OSError, ValueError) as e:
+            parser.error(f"Erro ao carregar o tema: {e}")
+        params['theme'] = next(iter(themes.values()))
+        if not isinstance(params['theme'], dict):
+            parser.error("O tema deve ser um objeto JSON")
+    elif args.command == 'add':
+        params['enabled'] = not params.pop('disabled')
+
+    files = expand_files(args.files)
+    results = run(files, args.command, params, args.jobs)
+    summary = summarize(args.command, results)
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+    return 1 if summary['failed'] or not files else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())